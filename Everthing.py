@@ -1,11 +1,1659 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
 import subprocess
 import os
 import threading
+import asyncio
 import queue
+import json
+import re
+import calendar
+import itertools
+import selectors
+import shlex
+import sys
+import tarfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-import docker
+from qmp import QMPClient, QMPError, guest_ping
+from vmcore import (
+    APP_DIR, VM_PROFILES, VM_DISK_BUSES, VM_CACHE_MODES, VM_AIO_MODES, DISK_PREALLOCATION,
+    DISK_CLUSTER_SIZES, DISK_PROGRESS_INTERVAL, CONVERT_PROGRESS_RE, ADMISSION_CPU_OVERCOMMIT,
+    ADMISSION_HOST_RESERVE_MB, ADMISSION_MEMORY_OVERCOMMIT, AdmissionScheduler, allocate_qmp_address,
+    atomic_write_json, build_convert_command, build_disk_command, build_overlay_command, build_vm_command,
+    disk_size_bytes, format_command, qemu_img_info
+)
+
+# Imported in the background by DockerClientManager.connect so the window
+# does not wait for it
+docker = None
+
+# Set QEMU_MANAGER_STARTUP_TIMING=1 to report time to first window, tab build
+# times and the Docker connect time to the console
+STARTUP_TIMING_ENV = 'QEMU_MANAGER_STARTUP_TIMING'
+STARTUP_STARTED = time.perf_counter()
+# Set QEMU_MANAGER_PUMP_STATS=1 to report UI pump wakeups and the longest
+# drain to the console every PUMP_STATS_INTERVAL_MS
+PUMP_STATS_ENV = 'QEMU_MANAGER_PUMP_STATS'
+PUMP_STATS_INTERVAL_MS = 10000
+
+# Daemon events that change what the container and image tabs show
+CONTAINER_EVENTS = ['start', 'die', 'stop', 'destroy', 'rename', 'pause', 'unpause', 'health_status']
+IMAGE_EVENTS = ['pull', 'tag', 'untag', 'delete', 'import', 'load']
+CONTAINER_EVENT_REPLAY_WINDOW = 30
+CONTAINER_EVENT_MAX_BACKOFF = 30
+
+# Each call of a bulk container action gets this long on top of the stop
+# grace period; the bulk task checks for cancellation this often
+CONTAINER_ACTION_TIMEOUT = 30
+CONTAINER_ACTION_POLL_INTERVAL = 0.25
+
+# Virtual tables materialize the visible rows plus this many below them
+VIRTUAL_TABLE_OVERSCAN = 5
+
+# Output panes keep this many lines on screen; older lines spill to a rotating
+# file of LOG_SPILL_MAX_BYTES with LOG_SPILL_BACKUPS older generations
+LOG_VIEW_MAX_LINES = 5000
+LOG_SPILL_MAX_BYTES = 5 * 1024 * 1024
+LOG_SPILL_BACKUPS = 3
+LOG_SEARCH_MAX_RESULTS = 500
+
+# Child-process output is handed to the UI in batches at most this often
+PROCESS_OUTPUT_FLUSH_INTERVAL = 0.05
+PROCESS_OUTPUT_MAX_BATCH = 500
+
+# Docker Hub search: cache size/lifetime, typing debounce and result batch size
+HUB_SEARCH_CACHE_FILE = APP_DIR / 'hub_search_cache.json'
+HUB_SEARCH_CACHE_SIZE = 200
+HUB_SEARCH_CACHE_TTL = 3600
+HUB_SEARCH_DEBOUNCE_MS = 400
+HUB_SEARCH_MIN_CHARS = 2
+HUB_SEARCH_BATCH = 25
+
+# Container log pane: default tail length; lines waiting for the UI are capped
+# so a container logging faster than Tk can draw never grows memory
+CONTAINER_LOG_TAIL = 200
+CONTAINER_LOG_BUFFER = LOG_VIEW_MAX_LINES
+LOG_SINCE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def parse_log_since(text):
+    # "" -> None, "15m"/"2h"/"1d" -> that long ago, else a UTC "YYYY-MM-DD[THH:MM:SS]"
+    text = text.strip()
+    if not text:
+        return None
+    if text[-1] in LOG_SINCE_UNITS and text[:-1].isdigit():
+        return int(time.time()) - int(text[:-1]) * LOG_SINCE_UNITS[text[-1]]
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return calendar.timegm(time.strptime(text, fmt))
+        except ValueError:
+            pass
+    raise ValueError(f"Unrecognised time: {text}")
+
+# Docker Hub pull progress is redrawn at most this many times per second
+PULL_RENDER_FPS = 4
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(size) < 1024 or unit == 'TB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} B"
+        size /= 1024
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+# Build contexts are tarred into a pipe and sent in chunks of this size
+BUILD_CONTEXT_CHUNK = 64 * 1024
+
+def read_dockerignore(context_dir):
+    # Same parsing as docker-py/the CLI: one pattern per line, '#' comments
+    path = os.path.join(context_dir, '.dockerignore')
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [line.strip() for line in f.read().splitlines() if line.strip() and not line.strip().startswith('#')]
+
+def stream_build_context(context_dir, dockerfile, stats):
+    # Yields the build context as tar chunks. Paths matched by .dockerignore are
+    # skipped, and the tar is written into a pipe by a helper thread, so memory
+    # use stays at one chunk however large the context is.
+    paths = sorted(docker.utils.exclude_paths(context_dir, read_dockerignore(context_dir), dockerfile=dockerfile))
+    stats['files'] = len(paths)
+    read_fd, write_fd = os.pipe()
+
+    def write_tar():
+        try:
+            with os.fdopen(write_fd, 'wb') as out, tarfile.open(fileobj=out, mode='w|') as tar:
+                for path in paths:
+                    tar.add(os.path.join(context_dir, path), arcname=path, recursive=False)
+        except (BrokenPipeError, OSError) as e:
+            stats['error'] = e
+
+    threading.Thread(target=write_tar, daemon=True).start()
+    started = time.monotonic()
+    with os.fdopen(read_fd, 'rb') as source:
+        while chunk := source.read(BUILD_CONTEXT_CHUNK):
+            stats['bytes'] += len(chunk)
+            yield chunk
+    stats['seconds'] = time.monotonic() - started
+
+class PullProgress:
+    # Folds the JSON lines of api.pull(stream=True, decode=True) into one row
+    # per layer so the UI can redraw a small table instead of a line per event
+    DONE_PHASES = ('Download complete', 'Verifying Checksum', 'Extracting', 'Pull complete', 'Already exists')
+
+    def __init__(self, image_name):
+        self.image_name = image_name
+        self.layers = {}
+        self.messages = []
+        self.samples = deque(maxlen=20)
+
+    def update(self, event):
+        if 'error' in event:
+            raise RuntimeError(event['error'])
+        status = event.get('status', '')
+        layer_id = event.get('id')
+        detail = event.get('progressDetail')
+        if not layer_id or (detail is None and status.startswith('Pulling from')):
+            self.messages.append(f"{layer_id}: {status}" if layer_id else status)
+            return
+
+        layer = self.layers.setdefault(layer_id, {'phase': '', 'current': 0, 'total': 0})
+        layer['phase'] = status
+        if status == 'Downloading' and detail:
+            layer['current'] = detail.get('current', layer['current'])
+            layer['total'] = detail.get('total', layer['total'])
+        elif status in self.DONE_PHASES:
+            layer['current'] = layer['total']
+
+    def totals(self):
+        done = sum(layer['current'] for layer in self.layers.values())
+        total = sum(layer['total'] for layer in self.layers.values())
+        return done, total
+
+    def render(self):
+        now = time.monotonic()
+        done, total = self.totals()
+        self.samples.append((now, done))
+
+        lines = [f"Pulling {self.image_name}", "", f"{'Layer':<14}{'Phase':<22}Progress"]
+        for layer_id, layer in self.layers.items():
+            progress = f"{format_bytes(layer['current'])} / {format_bytes(layer['total'])}" if layer['total'] else ''
+            lines.append(f"{layer_id:<14}{layer['phase']:<22}{progress}")
+
+        # Throughput over the last few redraws rather than since the start
+        first_time, first_done = self.samples[0]
+        rate = (done - first_done) / (now - first_time) if now > first_time else 0
+        summary = f"Overall: {format_bytes(done)} / {format_bytes(total)}"
+        if total:
+            summary += f" ({done * 100 // total}%)"
+        summary += f"  {format_bytes(rate)}/s"
+        if rate > 0 and total > done:
+            summary += f"  ETA {format_duration((total - done) / rate)}"
+        lines += ["", summary]
+        lines += self.messages[-3:]
+        return "\n".join(lines)
+
+GOLDEN_LIBRARY_FILE = APP_DIR / 'golden_images.json'
+
+class GoldenImageLibrary:
+    # Base images and the linked clones (qcow2 overlays) created from them,
+    # persisted as JSON. Paths are stored absolute.
+    def __init__(self, path):
+        self.path = path
+        self.bases = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.bases = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def add(self, base, disk_format):
+        self.bases.setdefault(os.path.abspath(base), {'format': disk_format, 'clones': []})
+
+    def remove(self, base):
+        self.bases.pop(os.path.abspath(base), None)
+
+    def add_clone(self, base, clone):
+        clones = self.bases[os.path.abspath(base)]['clones']
+        clone = os.path.abspath(clone)
+        if clone not in clones:
+            clones.append(clone)
+
+    def remove_clone(self, clone):
+        clone = os.path.abspath(clone)
+        for entry in self.bases.values():
+            if clone in entry['clones']:
+                entry['clones'].remove(clone)
+
+    def children(self, base):
+        # Clones deleted outside the app no longer pin their base
+        entry = self.bases.get(os.path.abspath(base))
+        if not entry:
+            return []
+        entry['clones'] = [clone for clone in entry['clones'] if os.path.exists(clone)]
+        return list(entry['clones'])
+
+    def base_of(self, clone):
+        clone = os.path.abspath(clone)
+        for base, entry in self.bases.items():
+            if clone in entry['clones']:
+                return base
+        return None
+
+    def save(self):
+        try:
+            atomic_write_json(self.path, self.bases, indent=2)
+        except OSError:
+            pass
+
+class ProcessOutputReader:
+    # One thread services stdout/stderr of every registered process with a
+    # selector, so a quiet stream never stalls the other one and pipes are
+    # always drained. Lines are timestamped and passed to `sink` in batches of
+    # (timestamp, label, stream, line) tuples; `sink` must be thread-safe.
+    def __init__(self, sink):
+        self.sink = sink
+        self.lock = threading.Lock()
+        self.pending = []
+        self.thread = None
+        self.batch = []
+        self.exiting = []
+        self.last_flush = time.monotonic()
+        if os.name != 'nt':
+            self.selector = selectors.DefaultSelector()
+            self.wake_r, self.wake_w = os.pipe()
+            os.set_blocking(self.wake_r, False)
+            self.selector.register(self.wake_r, selectors.EVENT_READ, None)
+
+    def add(self, process, label, on_line=None, on_exit=None):
+        # Process must be started with stdout/stderr=PIPE in binary mode.
+        # on_line(stream, line) replaces the sink for this process; on_exit(code)
+        # runs once both pipes are closed and the process has exited. Both are
+        # called on the reader thread.
+        watch = {'process': process, 'label': label, 'on_line': on_line, 'on_exit': on_exit, 'open': 0}
+        if os.name == 'nt':
+            # Windows selectors only accept sockets: fall back to a thread per pipe
+            for stream, pipe in (('OUT', process.stdout), ('ERR', process.stderr)):
+                if pipe is not None:
+                    watch['open'] += 1
+                    threading.Thread(target=self.read_blocking, args=(watch, stream, pipe), daemon=True).start()
+            return
+        with self.lock:
+            self.pending.append(watch)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        os.write(self.wake_w, b'x')
+
+    def run(self):
+        while True:
+            timeout = PROCESS_OUTPUT_FLUSH_INTERVAL if self.batch or self.exiting else None
+            for key, _ in self.selector.select(timeout):
+                if key.data is None:
+                    self.register_pending()
+                else:
+                    self.read_ready(key)
+            self.reap()
+            self.flush()
+
+    def register_pending(self):
+        try:
+            while os.read(self.wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for watch in pending:
+            for stream, pipe in (('OUT', watch['process'].stdout), ('ERR', watch['process'].stderr)):
+                if pipe is not None:
+                    watch['open'] += 1
+                    self.selector.register(pipe.fileno(), selectors.EVENT_READ, (watch, stream, {'partial': ''}))
+
+    def read_ready(self, key):
+        watch, stream, buffer = key.data
+        data = os.read(key.fd, 65536)
+        if not data:
+            self.selector.unregister(key.fd)
+            if buffer['partial']:
+                self.emit(watch, stream, buffer['partial'])
+            self.close_stream(watch)
+            return
+        text = buffer['partial'] + data.decode(errors='replace')
+        lines = text.splitlines(keepends=True)
+        buffer['partial'] = '' if lines[-1].endswith(('\n', '\r')) else lines.pop()
+        for line in lines:
+            self.emit(watch, stream, line)
+
+    def read_blocking(self, watch, stream, pipe):
+        partial = ''
+        for data in iter(lambda: pipe.read1(65536), b''):
+            lines = (partial + data.decode(errors='replace')).splitlines(keepends=True)
+            partial = '' if lines[-1].endswith(('\n', '\r')) else lines.pop()
+            with self.lock:
+                for line in lines:
+                    self.emit(watch, stream, line)
+                self.flush()
+        with self.lock:
+            if partial:
+                self.emit(watch, stream, partial)
+            self.close_stream(watch)
+            last = watch['open'] == 0
+            self.flush()
+        if last:
+            # This thread serves nothing else, so it can block until the exit
+            watch['process'].wait()
+            with self.lock:
+                self.reap()
+                self.flush()
+
+    def emit(self, watch, stream, line):
+        line = line.rstrip('\r\n')
+        if not line:
+            return
+        if watch['on_line']:
+            watch['on_line'](stream, line)
+        else:
+            self.batch.append((time.strftime('%H:%M:%S'), watch['label'], stream, line))
+
+    def close_stream(self, watch):
+        watch['open'] -= 1
+        if watch['open'] == 0:
+            self.exiting.append(watch)
+            self.reap()
+
+    def reap(self):
+        # Pipes close just before the exit; a process that is still running is
+        # polled again on the next pass instead of blocking the other streams
+        for watch in list(self.exiting):
+            code = watch['process'].poll()
+            if code is None:
+                continue
+            self.exiting.remove(watch)
+            self.batch.append((time.strftime('%H:%M:%S'), watch['label'], 'EXIT', f"exited with code {code}"))
+            if watch['on_exit']:
+                watch['on_exit'](code)
+
+    def flush(self):
+        now = time.monotonic()
+        if self.batch and (now - self.last_flush >= PROCESS_OUTPUT_FLUSH_INTERVAL or len(self.batch) >= PROCESS_OUTPUT_MAX_BATCH):
+            batch, self.batch = self.batch, []
+            self.last_flush = now
+            self.sink(batch)
+
+class VirtualTable(ttk.Frame):
+    # Treeview front-end for large tables. All rows live in a Python-side model
+    # (key order + key -> values) and only the rows in the viewport are created
+    # as Tk items. Implements the subset of the Treeview API the tabs use:
+    # insert/item/delete/get_children/selection/heading/column.
+    def __init__(self, master, columns, selectmode='extended'):
+        super().__init__(master)
+        self.columns = list(columns)
+        self.order = []
+        self.rows = {}
+        self.selected = set()
+        self.offset = 0
+        self.visible_rows = 20
+        self.row_height = 20
+        self.header_height = 25
+        self.sort_state = (None, False)
+        self.sort_keys = {}
+        self.render_pending = False
+        self.shown = {}
+        self.select_callbacks = []
+        self.key_counter = itertools.count()
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show='headings', selectmode=selectmode)
+        self.scroll_y = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        scroll_x = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=scroll_x.set)
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.scroll_y.grid(row=0, column=1, sticky='ns')
+        scroll_x.grid(row=1, column=0, sticky='ew')
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        self.tree.bind('<Configure>', self.on_configure)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', -10 ** 6), ('<Next>', 10 ** 6)):
+            self.tree.bind(key, lambda e, s=step: self.move_focus(s, e.state & 0x1))
+        self.tree.bind('<Home>', lambda e: self.move_focus(-len(self.order), False))
+        self.tree.bind('<End>', lambda e: self.move_focus(len(self.order), False))
+
+    # --- Treeview-compatible model API ---
+    def heading(self, column, sort_key=None, **options):
+        # sort_key(row_key) overrides sorting on the displayed text
+        if sort_key is not None:
+            self.sort_keys[column] = sort_key
+        if 'command' not in options:
+            options['command'] = lambda c=column: self.sort_by(c)
+        return self.tree.heading(column, **options)
+
+    def column(self, column, **options):
+        return self.tree.column(column, **options)
+
+    def insert(self, parent, index, iid=None, values=()):
+        key = iid if iid is not None else f"row{next(self.key_counter)}"
+        if key not in self.rows:
+            self.order.append(key)
+        self.rows[key] = tuple(values)
+        self.schedule_render()
+        return key
+
+    def item(self, key, option=None, values=None):
+        if values is not None:
+            self.rows[key] = tuple(values)
+            self.schedule_render()
+        if option == 'values':
+            return self.rows[key]
+        return {'values': self.rows[key]}
+
+    def delete(self, *keys):
+        removed = set(keys) & self.rows.keys()
+        if not removed:
+            return
+        for key in removed:
+            del self.rows[key]
+        self.order = [key for key in self.order if key not in removed]
+        self.selected -= removed
+        self.schedule_render()
+
+    def get_children(self, parent=''):
+        return tuple(self.order)
+
+    def set_rows(self, rows):
+        # Replaces the model with (key, values) pairs, keeping surviving selection
+        self.order = [key for key, _ in rows]
+        self.rows = {key: tuple(values) for key, values in rows}
+        self.selected &= self.rows.keys()
+        self.schedule_render()
+
+    def selection(self):
+        return tuple(key for key in self.order if key in self.selected)
+
+    def selection_set(self, keys):
+        self.selected = set(keys) & self.rows.keys()
+        self.schedule_render()
+        self.notify_select()
+
+    def bind_select(self, callback):
+        self.select_callbacks.append(callback)
+
+    def see(self, key):
+        if key not in self.rows:
+            return
+        index = self.order.index(key)
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible_rows:
+            self.offset = index - self.visible_rows + 1
+        self.schedule_render()
+
+    def sort_by(self, column):
+        key, descending = self.sort_state
+        descending = not descending if key == column else False
+        self.sort_state = (column, descending)
+        self.resort()
+
+    def resort(self):
+        # Re-apply the current sort after values changed
+        column, descending = self.sort_state
+        if column is None:
+            return
+        position = self.columns.index(column)
+
+        def sort_key(row_key):
+            if column in self.sort_keys:
+                return (0, self.sort_keys[column](row_key), '')
+            value = self.rows[row_key][position]
+            try:
+                return (0, float(value), '')
+            except (TypeError, ValueError):
+                return (1, 0, str(value).lower())
+
+        self.order.sort(key=sort_key, reverse=descending)
+        self.schedule_render()
+
+    # --- Viewport ---
+    def schedule_render(self):
+        # Coalesce many model changes in one Tk callback into a single redraw
+        if not self.render_pending:
+            self.render_pending = True
+            self.after_idle(self.render)
+
+    def render(self):
+        self.render_pending = False
+        total = len(self.order)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        window = self.order[self.offset:self.offset + self.visible_rows + VIRTUAL_TABLE_OVERSCAN]
+
+        # Only touch the Tk items that changed: rows leaving the viewport are
+        # deleted, entering rows inserted, moved rows moved and rows whose
+        # values changed updated in place. shown mirrors the item values.
+        wanted = set(window)
+        leaving = [key for key in self.tree.get_children() if key not in wanted]
+        if leaving:
+            self.tree.delete(*leaving)
+            for key in leaving:
+                del self.shown[key]
+        current = list(self.tree.get_children())
+        for index, key in enumerate(window):
+            values = self.rows[key]
+            if key not in self.shown:
+                self.tree.insert('', index, iid=key, values=values)
+                current.insert(index, key)
+                self.shown[key] = values
+                continue
+            if current[index] != key:
+                self.tree.move(key, '', index)
+                current.remove(key)
+                current.insert(index, key)
+            if self.shown[key] != values:
+                self.tree.item(key, values=values)
+                self.shown[key] = values
+        shown = [key for key in window if key in self.selected]
+        if set(shown) != set(self.tree.selection()):
+            self.tree.selection_set(shown)
+
+        if total:
+            self.scroll_y.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scroll_y.set(0.0, 1.0)
+
+        if window:
+            bbox = self.tree.bbox(window[0])
+            if bbox:
+                self.header_height, self.row_height = bbox[1], max(1, bbox[3])
+
+    def on_configure(self, event):
+        visible = max(1, (event.height - self.header_height) // self.row_height)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self.schedule_render()
+
+    def yview(self, *args):
+        total = len(self.order)
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self.visible_rows if args[2] == 'pages' else 1)
+            self.offset += step
+        self.schedule_render()
+
+    def scroll(self, rows):
+        self.offset += rows
+        self.schedule_render()
+        return 'break'
+
+    def move_focus(self, step, extend):
+        if not self.order:
+            return 'break'
+        focus = self.tree.focus()
+        index = self.order.index(focus) if focus in self.rows else self.offset
+        if abs(step) == 10 ** 6:
+            step = self.visible_rows if step > 0 else -self.visible_rows
+        index = max(0, min(len(self.order) - 1, index + step))
+        key = self.order[index]
+        self.selected = self.selected | {key} if extend else {key}
+        self.see(key)
+        self.render()
+        self.tree.focus(key)
+        self.notify_select()
+        return 'break'
+
+    def on_tree_select(self, event):
+        materialized = set(self.tree.get_children())
+        self.selected = (self.selected - materialized) | set(self.tree.selection())
+        self.notify_select()
+
+    def notify_select(self):
+        for callback in self.select_callbacks:
+            callback(None)
+
+class LogView(ttk.Frame):
+    # Text pane bounded to max_lines. Lines scrolled out of the buffer are
+    # appended to APP_DIR/logs/<name>.log (rotated by size) and stay searchable.
+    def __init__(self, master, name=None, max_lines=LOG_VIEW_MAX_LINES, height=10,
+                 wrap=tk.NONE, font=('Courier New', 10)):
+        super().__init__(master)
+        self.max_lines = max_lines
+        self.line_count = 0
+        self.spill_path = APP_DIR / 'logs' / f"{name}.log" if name else None
+        self.spill_file = None
+
+        search_frame = ttk.Frame(self)
+        search_frame.pack(side=tk.TOP, fill=tk.X)
+        self.search_entry = ttk.Entry(search_frame, width=30)
+        self.search_entry.pack(side=tk.LEFT, padx=2, pady=2)
+        self.search_entry.bind("<Return>", lambda e: self.search())
+        ttk.Button(search_frame, text="Find", command=self.search).pack(side=tk.LEFT)
+        if self.spill_path:
+            ttk.Button(search_frame, text="Search History", command=self.search_history).pack(side=tk.LEFT, padx=2)
+
+        text_frame = ttk.Frame(self)
+        text_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.text = tk.Text(text_frame, height=height, wrap=wrap, font=font, state=tk.DISABLED)
+        scroll_y = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        scroll_x = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.config(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        self.text.grid(row=0, column=0, sticky='nsew')
+        scroll_y.grid(row=0, column=1, sticky='ns')
+        if wrap == tk.NONE:
+            scroll_x.grid(row=1, column=0, sticky='ew')
+        text_frame.grid_rowconfigure(0, weight=1)
+        text_frame.grid_columnconfigure(0, weight=1)
+        self.text.tag_config('match', background='yellow')
+
+    def tag_config(self, tag, **options):
+        self.text.tag_config(tag, **options)
+
+    def append(self, text, tag=None):
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(tk.END, text, tag)
+        self.line_count += text.count('\n')
+        # Trim with some slack so the delete is amortised over many appends
+        if self.line_count > self.max_lines + self.max_lines // 10:
+            excess = self.line_count - self.max_lines
+            self.spill(self.text.get('1.0', f'{excess + 1}.0'))
+            self.text.delete('1.0', f'{excess + 1}.0')
+            self.line_count -= excess
+        self.text.see(tk.END)
+        self.text.config(state=tk.DISABLED)
+
+    def set_text(self, text, tag=None):
+        # Replaces the visible content (used for redrawn views such as progress)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        self.text.config(state=tk.DISABLED)
+        self.line_count = 0
+        self.append(text, tag)
+
+    def clear(self):
+        self.set_text('')
+
+    def spill(self, text):
+        if self.spill_path is None:
+            return
+        if self.spill_file is None:
+            # Each session starts a fresh history for this view
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            for path in self.spill_files():
+                path.unlink()
+            self.spill_file = open(self.spill_path, 'w', encoding='utf-8')
+        self.spill_file.write(text)
+        self.spill_file.flush()
+        if self.spill_file.tell() > LOG_SPILL_MAX_BYTES:
+            self.rotate_spill()
+
+    def rotate_spill(self):
+        self.spill_file.close()
+        for index in range(LOG_SPILL_BACKUPS - 1, 0, -1):
+            source = self.spill_path.with_name(f"{self.spill_path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.spill_path.with_name(f"{self.spill_path.name}.{index + 1}"))
+        os.replace(self.spill_path, self.spill_path.with_name(f"{self.spill_path.name}.1"))
+        self.spill_file = open(self.spill_path, 'w', encoding='utf-8')
+
+    def spill_files(self):
+        # Oldest first
+        if self.spill_path is None:
+            return []
+        backups = [self.spill_path.with_name(f"{self.spill_path.name}.{i}") for i in range(LOG_SPILL_BACKUPS, 0, -1)]
+        return [path for path in backups + [self.spill_path] if path.exists()]
+
+    def search(self):
+        pattern = self.search_entry.get()
+        self.text.tag_remove('match', '1.0', tk.END)
+        if not pattern:
+            return
+        first = None
+        start = '1.0'
+        count = tk.IntVar()
+        while index := self.text.search(pattern, start, stopindex=tk.END, nocase=True, count=count):
+            end = f"{index}+{count.get()}c"
+            self.text.tag_add('match', index, end)
+            first = first or index
+            start = end
+        if first:
+            self.text.see(first)
+
+    def search_history(self):
+        pattern = self.search_entry.get().lower()
+        if not pattern:
+            return
+        results = []
+        for path in self.spill_files():
+            with open(path, encoding='utf-8', errors='replace') as f:
+                for number, line in enumerate(f, 1):
+                    if pattern in line.lower():
+                        results.append(f"{path.name}:{number}: {line.rstrip()}")
+                        if len(results) >= LOG_SEARCH_MAX_RESULTS:
+                            break
+            if len(results) >= LOG_SEARCH_MAX_RESULTS:
+                break
+
+        window = tk.Toplevel(self)
+        window.title(f"History matches for '{pattern}'")
+        view = LogView(window, max_lines=LOG_SEARCH_MAX_RESULTS + 1, height=20)
+        view.pack(fill=tk.BOTH, expand=True)
+        view.append("\n".join(results) if results else "No matches in spilled history")
+
+    def destroy(self):
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+        super().destroy()
+
+class SearchCache:
+    # LRU cache with a TTL, persisted as JSON between runs
+    def __init__(self, path, max_entries=HUB_SEARCH_CACHE_SIZE, ttl=HUB_SEARCH_CACHE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        try:
+            with open(path, encoding='utf-8') as f:
+                for query, (stored, results) in json.load(f).items():
+                    self.entries[query] = (stored, results)
+        except (OSError, ValueError, TypeError):
+            pass
+
+    def get(self, query):
+        entry = self.entries.get(query)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > self.ttl:
+            del self.entries[query]
+            return None
+        self.entries.move_to_end(query)
+        return entry[1]
+
+    def put(self, query, results):
+        self.entries[query] = (time.time(), results)
+        self.entries.move_to_end(query)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        try:
+            atomic_write_json(self.path, self.entries)
+        except OSError:
+            pass
+
+class ImageIndex:
+    # In-memory image inventory: built from one api.images() call and patched
+    # per image afterwards, so filtering and sorting never touch the daemon.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.images = {}
+
+    @staticmethod
+    def entry(image_id, tags, digests, created, size):
+        return {
+            'id': image_id,
+            'tags': [t for t in tags or [] if t != '<none>:<none>'],
+            'digests': [d for d in digests or [] if d != '<none>@<none>'],
+            'created': created,
+            'size': size
+        }
+
+    def refresh(self, api):
+        images = {
+            image['Id']: self.entry(image['Id'], image.get('RepoTags'), image.get('RepoDigests'),
+                                    int(image['Created']), image['Size'])
+            for image in api.images()
+        }
+        with self.lock:
+            self.images = images
+
+    def update(self, api, reference):
+        try:
+            attrs = api.inspect_image(reference)
+        except docker.errors.NotFound:
+            self.remove(reference)
+            return
+        created = calendar.timegm(time.strptime(attrs['Created'][:19], '%Y-%m-%dT%H:%M:%S'))
+        entry = self.entry(attrs['Id'], attrs.get('RepoTags'), attrs.get('RepoDigests'), created, attrs['Size'])
+        with self.lock:
+            # A tag moves between images: drop it from whichever image had it
+            for other in self.images.values():
+                if other['id'] != entry['id']:
+                    other['tags'] = [t for t in other['tags'] if t not in entry['tags']]
+            self.images[entry['id']] = entry
+
+    def remove(self, image_id):
+        with self.lock:
+            self.images.pop(image_id, None)
+
+    def contains(self, image_id):
+        return image_id in self.images
+
+    def name(self, image_id):
+        entry = self.images.get(image_id)
+        return entry['tags'][0] if entry and entry['tags'] else image_id
+
+    def row_count(self):
+        # Number of rows() without building them
+        with self.lock:
+            return sum(max(1, len(image['tags'])) for image in self.images.values())
+
+    def rows(self):
+        # One row per tag like `docker images`; untagged images get one <none> row
+        with self.lock:
+            images = list(self.images.values())
+        rows = []
+        for image in images:
+            references = image['tags'] or [d.split('@')[0] + ':<none>' for d in image['digests'][:1]] or ['<none>:<none>']
+            for reference in references:
+                repository, _, tag = reference.rpartition(':')
+                if '/' in tag:
+                    repository, tag = reference, '<none>'
+                rows.append({
+                    'key': f"{image['id']}|{reference}",
+                    'repository': repository,
+                    'tag': tag,
+                    'image_id': image['id'].split(':')[-1][:12],
+                    'created': image['created'],
+                    'size': image['size'],
+                    'digests': image['digests']
+                })
+        return rows
+
+    def query(self, pattern='', regex=False, sort_key='created', descending=True):
+        rows = self.rows()
+        if pattern:
+            if regex:
+                try:
+                    matcher = re.compile(pattern, re.IGNORECASE).search
+                except re.error:
+                    matcher = None
+            if not regex or matcher is None:
+                needle = pattern.lower()
+                matcher = lambda text: needle in text.lower()
+            rows = [row for row in rows if matcher(f"{row['repository']}:{row['tag']} {row['image_id']}")]
+        rows.sort(key=lambda row: row[sort_key], reverse=descending)
+        return rows
+
+VM_METRICS_INTERVAL = 2
+# A VM whose QMP socket is up but does not answer within this is marked
+# stale, so it cannot hold up the polling round of every other VM
+VM_POLL_TIMEOUT = 1.5
+# Queued launches are re-checked this often, since host memory also frees up
+# outside our own VMs
+ADMISSION_RECHECK_MS = 5000
+VM_QMP_CONNECT_TIMEOUT = 10
+VM_READY_TIMEOUT = 900
+VM_READY_PROBE_INTERVAL = 0.5
+VM_STATES_FILE = APP_DIR / 'vm_states.json'
+# Migration to a local file is not network bound; lift QEMU's default 128MiB/s cap
+VM_STATE_SAVE_BANDWIDTH = 8 * 1024 ** 3
+
+class VMStateLibrary:
+    # Saved VM states: internal snapshots (savevm tags inside a qcow2 disk) and
+    # external state files (migration streams). Each entry keeps the launch
+    # config so a new VM can be started with the same devices.
+    def __init__(self, path):
+        self.path = path
+        self.states = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.states = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def key(kind, disk, name):
+        return f"{kind}:{os.path.abspath(disk)}:{name}"
+
+    def add(self, kind, disk, name, config, **extra):
+        entry = {'kind': kind, 'disk': os.path.abspath(disk), 'name': name, 'config': config, 'created': time.time()}
+        entry.update(extra)
+        self.states[self.key(kind, disk, name)] = entry
+        return entry
+
+    def get(self, kind, disk, name):
+        return self.states.get(self.key(kind, disk, name))
+
+    def remove(self, kind, disk, name):
+        self.states.pop(self.key(kind, disk, name), None)
+
+    def for_disk(self, disk):
+        disk = os.path.abspath(disk)
+        return [entry for entry in self.states.values() if entry['disk'] == disk]
+
+    def save(self):
+        try:
+            atomic_write_json(self.path, self.states, indent=2)
+        except OSError:
+            pass
+
+class VMMonitor:
+    # One asyncio loop on a background thread holds a QMP connection per
+    # running VM and polls status, block stats and vCPUs every `interval`
+    # seconds. Results go to `sink` as (kind, vm_id, data) tuples, where kind
+    # is connected/metrics/stale/event/ready/error; `sink` must be thread-safe.
+    # Pass `loop` to share an already running loop instead of starting one.
+    def __init__(self, sink, interval=VM_METRICS_INTERVAL, loop=None):
+        self.sink = sink
+        self.interval = interval
+        self.clients = {}
+        self.samples = {}
+        self.loop = loop
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.poll_forever(), self.loop)
+
+    def add(self, vm_id, address, agent_address=None, incoming=False):
+        return asyncio.run_coroutine_threadsafe(self.attach(vm_id, address, agent_address, incoming), self.loop)
+
+    def remove(self, vm_id):
+        return asyncio.run_coroutine_threadsafe(self.detach(vm_id), self.loop)
+
+    async def attach(self, vm_id, address, agent_address=None, incoming=False):
+        # QEMU creates the socket shortly after start; retry until it does.
+        # `incoming` VMs were started with -incoming and are resumed once loaded.
+        deadline = time.monotonic() + VM_QMP_CONNECT_TIMEOUT
+        while True:
+            client = QMPClient(address, on_event=lambda event: self.sink(('event', vm_id, event)))
+            try:
+                await client.connect()
+                break
+            except (OSError, ValueError, asyncio.TimeoutError) as e:
+                if time.monotonic() > deadline:
+                    self.sink(('error', vm_id, f"QMP connection failed: {e}"))
+                    return
+                await asyncio.sleep(0.2)
+        self.clients[vm_id] = client
+        self.sink(('connected', vm_id, client.greeting['QMP'].get('version', {}).get('qemu', {})))
+        if incoming:
+            await self.resume_incoming(vm_id, client)
+        if agent_address:
+            asyncio.ensure_future(self.probe_ready(vm_id, agent_address))
+        await self.poll(vm_id, client)
+
+    async def resume_incoming(self, vm_id, client):
+        # migrate_to_file stops the guest before saving, so the loaded state is
+        # paused: wait for the incoming migration to finish, then continue
+        deadline = time.monotonic() + VM_READY_TIMEOUT
+        try:
+            while True:
+                status = (await client.execute('query-status'))['status']
+                if status != 'inmigrate':
+                    break
+                if time.monotonic() > deadline:
+                    self.sink(('error', vm_id, "Loading the saved state did not finish"))
+                    return
+                await asyncio.sleep(0.2)
+            if status != 'running':
+                await client.execute('cont')
+        except (ConnectionError, QMPError) as e:
+            self.sink(('error', vm_id, f"Resuming the saved state failed: {e}"))
+
+    async def probe_ready(self, vm_id, agent_address):
+        deadline = time.monotonic() + VM_READY_TIMEOUT
+        while vm_id in self.clients and time.monotonic() < deadline:
+            if await guest_ping(agent_address):
+                self.sink(('ready', vm_id, time.monotonic()))
+                return
+            await asyncio.sleep(VM_READY_PROBE_INTERVAL)
+
+    async def savevm(self, vm_id, tag):
+        # Internal snapshot of RAM, device and disk state into the qcow2 image(s)
+        client = self.clients.get(vm_id)
+        if client is None:
+            raise ConnectionError("VM has no QMP connection")
+        started = time.monotonic()
+        output = await client.execute('human-monitor-command', {'command-line': f'savevm {tag}'})
+        if output.strip():
+            raise RuntimeError(output.strip())
+        return time.monotonic() - started
+
+    async def migrate_to_file(self, vm_id, path):
+        # Pause, stream the full VM state to `path` and quit. The disk must stay
+        # untouched afterwards for the state to be resumable.
+        client = self.clients.get(vm_id)
+        if client is None:
+            raise ConnectionError("VM has no QMP connection")
+        started = time.monotonic()
+        try:
+            await client.execute('stop')
+            await client.execute('migrate-set-parameters', {'max-bandwidth': VM_STATE_SAVE_BANDWIDTH})
+            await client.execute('migrate', {'uri': f"exec:cat > {shlex.quote(path)}"})
+            while True:
+                info = await client.execute('query-migrate')
+                if info.get('status') in ('completed', 'failed', 'cancelled'):
+                    break
+                await asyncio.sleep(0.2)
+        except asyncio.CancelledError:
+            # Cancelled from the task list: abort the migration and keep the VM running
+            await client.execute('migrate_cancel')
+            await client.execute('cont')
+            raise
+        if info['status'] != 'completed':
+            await client.execute('cont')
+            raise RuntimeError(f"Saving state {info['status']}: {info.get('error-desc', '')}")
+        try:
+            await client.execute('quit')
+        except ConnectionError:
+            # QEMU may close the socket before the reply is read
+            pass
+        return time.monotonic() - started, info.get('ram', {}).get('transferred', 0)
+
+    async def detach(self, vm_id):
+        client = self.clients.pop(vm_id, None)
+        self.samples.pop(vm_id, None)
+        if client:
+            await client.close()
+
+    async def run_command(self, vm_id, command, arguments):
+        client = self.clients.get(vm_id)
+        if client is None:
+            raise ConnectionError("VM has no QMP connection")
+        result = await client.execute(command, arguments)
+        await self.poll(vm_id, client)
+        return result
+
+    async def poll_forever(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.gather(*(self.poll(vm_id, client) for vm_id, client in list(self.clients.items())))
+
+    async def poll(self, vm_id, client):
+        try:
+            status, blockstats, cpus = await asyncio.wait_for(asyncio.gather(
+                client.execute('query-status'),
+                client.execute('query-blockstats'),
+                client.execute('query-cpus-fast')
+            ), VM_POLL_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.sink(('stale', vm_id, VM_POLL_TIMEOUT))
+            return
+        except (ConnectionError, QMPError):
+            # The process watcher reports the exit; a failed query just skips a sample
+            return
+        now = time.monotonic()
+        totals = {
+            key: sum(device['stats'].get(key, 0) for device in blockstats)
+            for key in ('rd_bytes', 'wr_bytes', 'rd_operations', 'wr_operations')
+        }
+        rates = {}
+        previous = self.samples.get(vm_id)
+        if previous and now > previous[0]:
+            rates = {key: (totals[key] - previous[1][key]) / (now - previous[0]) for key in totals}
+        self.samples[vm_id] = (now, totals)
+        self.sink(('metrics', vm_id, {
+            'status': status['status'],
+            'vcpus': [(cpu['cpu-index'], cpu.get('thread-id')) for cpu in cpus],
+            'totals': totals,
+            'rates': rates
+        }))
+
+# Container stats: one sample per container every interval, fetched by a small
+# shared pool; each container keeps the last CONTAINER_STATS_HISTORY samples
+CONTAINER_STATS_INTERVAL = 2
+CONTAINER_STATS_WORKERS = 4
+CONTAINER_STATS_HISTORY = 60
+SPARKLINE_WIDTH = 20
+SPARKLINE_CHARS = '▁▂▃▄▅▆▇█'
+
+def sparkline(values, width=SPARKLINE_WIDTH):
+    values = list(values)[-width:]
+    if not values:
+        return ''
+    top = max(max(values), 1e-9)
+    return ''.join(SPARKLINE_CHARS[min(len(SPARKLINE_CHARS) - 1, int(v / top * len(SPARKLINE_CHARS)))] for v in values)
+
+class ContainerStatsCollector:
+    # Polls one-shot stats for every watched container from a single scheduler
+    # thread and a bounded pool, instead of one streaming connection (and
+    # thread) per container. CPU and I/O rates are computed from consecutive
+    # samples, so the daemon does not have to wait for its own second reading.
+    # After each round `sink` gets {container_id: latest sample}, where the
+    # sample carries a CPU sparkline over the ring buffer.
+    def __init__(self, api_getter, sink, interval=CONTAINER_STATS_INTERVAL,
+                 workers=CONTAINER_STATS_WORKERS, history=CONTAINER_STATS_HISTORY):
+        self.api_getter = api_getter
+        self.sink = sink
+        self.interval = interval
+        self.history = history
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='stats')
+        self.containers = frozenset()
+        self.samples = {}
+        self.counters = {}
+        self.one_shot = True
+        self.thread = None
+
+    def set_containers(self, container_ids):
+        self.containers = frozenset(container_ids)
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            started = time.monotonic()
+            api = self.api_getter()
+            containers = self.containers
+            if api is not None and containers:
+                self.collect(api, containers)
+            for gone in set(self.samples) - containers:
+                del self.samples[gone]
+                self.counters.pop(gone, None)
+            time.sleep(max(0, self.interval - (time.monotonic() - started)))
+
+    def collect(self, api, containers):
+        futures = {self.pool.submit(self.fetch, api, container_id): container_id for container_id in containers}
+        latest = {}
+        for future in as_completed(futures):
+            container_id = futures[future]
+            try:
+                sample = self.sample(container_id, future.result())
+            except Exception:
+                continue
+            if sample is not None:
+                buffer = self.samples.setdefault(container_id, deque(maxlen=self.history))
+                buffer.append(sample)
+                sample['trend'] = sparkline(s['cpu'] for s in buffer)
+                latest[container_id] = sample
+        if latest:
+            self.sink(latest)
+
+    def fetch(self, api, container_id):
+        if self.one_shot:
+            try:
+                return api.stats(container_id, stream=False, one_shot=True)
+            except docker.errors.InvalidVersion:
+                # API < 1.41: the daemon takes ~1s to produce a reading
+                self.one_shot = False
+        return api.stats(container_id, stream=False)
+
+    def sample(self, container_id, stats):
+        now = time.monotonic()
+        cpu = stats.get('cpu_stats', {})
+        memory = stats.get('memory_stats', {})
+        networks = stats.get('networks') or {}
+        blkio = stats.get('blkio_stats', {}).get('io_service_bytes_recursive') or []
+        counters = {
+            'cpu': cpu.get('cpu_usage', {}).get('total_usage', 0),
+            'system': cpu.get('system_cpu_usage', 0),
+            'rx': sum(n.get('rx_bytes', 0) for n in networks.values()),
+            'tx': sum(n.get('tx_bytes', 0) for n in networks.values()),
+            'read': sum(e.get('value', 0) for e in blkio if e.get('op', '').lower() == 'read'),
+            'write': sum(e.get('value', 0) for e in blkio if e.get('op', '').lower() == 'write'),
+            'time': now
+        }
+        previous = self.counters.get(container_id)
+        self.counters[container_id] = counters
+        if previous is None:
+            return None
+
+        elapsed = max(now - previous['time'], 1e-6)
+        system_delta = counters['system'] - previous['system']
+        online = cpu.get('online_cpus') or len(cpu.get('cpu_usage', {}).get('percpu_usage') or []) or 1
+        # Page cache is reclaimable; `docker stats` leaves it out as well
+        cache = memory.get('stats', {}).get('inactive_file', memory.get('stats', {}).get('cache', 0))
+        return {
+            'cpu': (counters['cpu'] - previous['cpu']) / system_delta * online * 100 if system_delta > 0 else 0.0,
+            'memory': max(0, memory.get('usage', 0) - cache),
+            'memory_limit': memory.get('limit', 0),
+            'rx': max(0, counters['rx'] - previous['rx']) / elapsed,
+            'tx': max(0, counters['tx'] - previous['tx']) / elapsed,
+            'read': max(0, counters['read'] - previous['read']) / elapsed,
+            'write': max(0, counters['write'] - previous['write']) / elapsed
+        }
+
+# Background operations run as tasks on one loop, with this many at once per category
+TASK_CATEGORY_LIMITS = {
+    'hub': 2,        # Docker Hub searches and pulls
+    'build': 16,     # image builds; the build queue applies its own limit below this
+    'docker': 4,     # image/container listings and bulk container actions
+    'container-action': 8,  # single stop/restart/kill/remove calls of a bulk action
+    'logs': 2,       # container log streams
+    'disk': 1,       # disk creation
+    'qemu-img': 4,   # snapshot, golden image and backing chain jobs
+    'convert': 2,    # disk conversions; they are I/O bound, more at once only fight over the disk
+    'qemu': 4        # VM starts, QMP commands, snapshot and state saves
+}
+TASK_QUERY_TIMEOUT = 60
+TASK_HISTORY = 200
+TASK_TICK_MS = 1000
+
+# Task categories that talk to the daemon. With the stats pool, the event
+# watch (its stream plus the lookups it makes while reading it) and the
+# health check they bound how many requests can be in flight, so the shared
+# client keeps that many pooled connections.
+DOCKER_TASK_CATEGORIES = ('hub', 'build', 'docker', 'logs', 'container-action')
+DOCKER_POOL_SIZE = CONTAINER_STATS_WORKERS + 3 + sum(TASK_CATEGORY_LIMITS[c] for c in DOCKER_TASK_CATEGORIES)
+DOCKER_HEALTH_INTERVAL = 5
+DOCKER_RECONNECT_MAX_BACKOFF = 30
+DOCKER_RETRY_ATTEMPTS = 3
+DOCKER_RETRY_WAIT = 15
+DOCKER_LATENCY_SMOOTHING = 0.2
+
+# Read-only API calls that are safe to send again after the connection
+# dropped. Streams (logs, pull, events, build) are left out since the caller
+# may already have consumed part of them, and so are state changes like stop,
+# whose retry would fail after the first attempt went through.
+DOCKER_IDEMPOTENT_CALLS = {
+    'ping', 'version', 'info', 'containers', 'images', 'inspect_container', 'inspect_image',
+    'stats', 'search'
+}
+# Calls that take as long as the work they start (an upload, a stream, a stop
+# grace period); they are never retried and stay out of the latency average
+DOCKER_LONG_CALLS = {'build', 'events', 'pull', 'push', 'logs', 'stop', 'restart', 'wait'}
+
+class RetryingDockerAPI:
+    # Stands in for docker's APIClient. Every method call goes through
+    # DockerClientManager.call, so callers always use the current client.
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.manager.call(name, *args, **kwargs)
+
+
+class DockerClientManager:
+    # Owns the docker client shared by every worker thread. A health thread
+    # pings the daemon and, when it stops answering, rebuilds the client with
+    # exponential backoff. Calls through `api` fail fast while disconnected,
+    # and idempotent ones that hit a dropped connection wait for the
+    # reconnect and are sent again. on_state(state, detail) is called from
+    # the health thread with 'connecting', 'connected' or 'unavailable'.
+    def __init__(self, on_state, pool_size=DOCKER_POOL_SIZE, health_interval=DOCKER_HEALTH_INTERVAL):
+        self.on_state = on_state
+        self.pool_size = pool_size
+        self.health_interval = health_interval
+        self.client = None
+        self.state = 'connecting'
+        self.connection_errors = ()
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.wake = threading.Event()
+        self.latency = None
+        self.requests = 0
+        self.api = RetryingDockerAPI(self)
+        self.thread = None
+
+    @property
+    def connected(self):
+        return self.client is not None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def reconnect(self):
+        # Cuts a reconnect backoff short, or runs a health check right away
+        self.wake.set()
+
+    def wait_connected(self, timeout=None):
+        return self.ready.wait(timeout)
+
+    def run(self):
+        backoff = 1
+        while True:
+            client = self.client
+            if client is None:
+                self.set_state('connecting')
+                try:
+                    self.client = self.connect()
+                except Exception as e:
+                    self.set_state('unavailable', f"{e} (retrying in {backoff}s)")
+                    backoff = 1 if self.wake.wait(backoff) else min(backoff * 2, DOCKER_RECONNECT_MAX_BACKOFF)
+                    self.wake.clear()
+                    continue
+                backoff = 1
+                self.ready.set()
+                self.set_state('connected')
+                continue
+            self.wake.wait(self.health_interval)
+            self.wake.clear()
+            if self.client is not client:
+                continue
+            try:
+                self.timed(client.api.ping)
+                self.set_state('connected')
+            except Exception as e:
+                self.drop(client, e)
+
+    def connect(self):
+        # docker pulls in requests/urllib3, so it is imported on this thread
+        # rather than at module load
+        global docker
+        import docker
+        import requests
+        self.connection_errors = (requests.exceptions.ConnectionError,)
+        client = docker.from_env(max_pool_size=self.pool_size)
+        try:
+            self.timed(client.api.ping)
+        except Exception:
+            client.close()
+            raise
+        return client
+
+    def drop(self, client, error):
+        with self.lock:
+            if self.client is not client:
+                return
+            self.client = None
+            self.ready.clear()
+        try:
+            client.close()
+        except Exception:
+            pass
+        self.set_state('unavailable', f"connection lost: {error}")
+        self.wake.set()
+
+    def set_state(self, state, detail=None):
+        self.state = state
+        self.on_state(state, detail)
+
+    def call(self, name, *args, **kwargs):
+        long_running = name in DOCKER_LONG_CALLS or kwargs.get('stream')
+        retry = name in DOCKER_IDEMPOTENT_CALLS and not long_running
+        attempts = DOCKER_RETRY_ATTEMPTS if retry else 1
+        for attempt in range(attempts):
+            client = self.client
+            if client is None and attempt and self.ready.wait(DOCKER_RETRY_WAIT):
+                client = self.client
+            if client is None:
+                raise ConnectionError("Docker connection not available")
+            method = getattr(client.api, name)
+            try:
+                # Their duration says nothing about how responsive the daemon is
+                if long_running:
+                    return method(*args, **kwargs)
+                return self.timed(method, *args, **kwargs)
+            except self.connection_errors as e:
+                self.drop(client, e)
+                if attempt + 1 == attempts:
+                    raise
+
+    def timed(self, method, *args, **kwargs):
+        started = time.perf_counter()
+        result = method(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.requests += 1
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.latency += (elapsed - self.latency) * DOCKER_LATENCY_SMOOTHING
+        return result
+
+    def summary(self):
+        if self.latency is None:
+            return "no requests yet"
+        return f"{self.latency * 1000:.1f} ms avg latency, {self.requests} requests"
+
+
+class TaskEngine:
+    # Runs Docker and QEMU operations as tasks on one asyncio loop in a
+    # background thread. A task waits for a slot in its category, then runs
+    # a coroutine function on the loop or a blocking function in the loop's
+    # executor, optionally under a timeout. Coroutines are cancelled
+    # outright; for blocking functions cancel/timeout calls the task's
+    # on_cancel hook (close a stream, terminate a process) and sets the flag
+    # read by cancelled(). The caller's future is resolved right away, but
+    # the slot stays taken until the function returns. sink(kind, task) gets ('update', copy) on every state change
+    # and ('removed', id) when old tasks are dropped; it must be thread-safe.
+    def __init__(self, sink, limits=TASK_CATEGORY_LIMITS, history=TASK_HISTORY):
+        self.sink = sink
+        self.history = history
+        self.tasks = OrderedDict()
+        self.futures = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.semaphores = {category: asyncio.Semaphore(limit) for category, limit in limits.items()}
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers=sum(limits.values()), thread_name_prefix='task'))
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def submit(self, category, label, func, *args, timeout=None, on_cancel=None):
+        # Returns a concurrent.futures.Future for the function's result; its
+        # task_id attribute identifies the task for cancel()
+        task = {
+            'id': next(self.ids),
+            'category': category,
+            'label': label,
+            'state': 'queued',
+            'created': time.monotonic(),
+            'started': None,
+            'finished': None,
+            'error': None,
+            'timeout': timeout,
+            'cancel_requested': False
+        }
+        with self.lock:
+            self.tasks[task['id']] = task
+        self.sink('update', dict(task))
+        future = asyncio.run_coroutine_threadsafe(self.run(task, func, args, on_cancel), self.loop)
+        future.task_id = task['id']
+        with self.lock:
+            if task['finished'] is None:
+                self.futures[task['id']] = future
+        return future
+
+    def cancel(self, task_id):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            future = self.futures.get(task_id)
+        if task is None or future is None:
+            return False
+        task['cancel_requested'] = True
+        future.cancel()
+        return True
+
+    def cancelled(self):
+        # For blocking task functions: True once their task was cancelled or timed out
+        task = getattr(self.local, 'task', None)
+        return task is not None and task['cancel_requested']
+
+    def state(self, task_id):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            return task['state'] if task else None
+
+    def snapshot(self):
+        with self.lock:
+            return [dict(task) for task in self.tasks.values()]
+
+    def clear_finished(self):
+        with self.lock:
+            finished = [task_id for task_id, task in self.tasks.items() if task['finished'] is not None]
+            for task_id in finished:
+                del self.tasks[task_id]
+        return finished
+
+    async def run(self, task, func, args, on_cancel):
+        semaphore = self.semaphores[task['category']]
+        try:
+            await semaphore.acquire()
+            release = True
+            try:
+                self.update(task, state='running', started=time.monotonic())
+                if asyncio.iscoroutinefunction(func):
+                    work = asyncio.ensure_future(func(*args))
+                else:
+                    work = self.loop.run_in_executor(None, self.call, task, func, args)
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(work), task['timeout'])
+                except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+                    task['cancel_requested'] = True
+                    self.update(task, state='cancelling')
+                    if on_cancel is not None:
+                        try:
+                            on_cancel()
+                        except Exception:
+                            pass
+                    if isinstance(work, asyncio.Task):
+                        # Coroutines unwind promptly (and may need to clean up)
+                        work.cancel()
+                        await asyncio.wait([work])
+                    elif not work.done():
+                        # A blocked thread cannot be interrupted: answer the caller
+                        # now and give the slot back when the function returns
+                        release = False
+                        work.add_done_callback(lambda f: self.release_slot(semaphore, f))
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.finish(task, 'timed out', f"no result after {task['timeout']}s")
+                        raise TimeoutError(f"{task['label']} timed out after {task['timeout']}s")
+                    self.finish(task, 'cancelled')
+                    raise
+            finally:
+                if release:
+                    semaphore.release()
+        except asyncio.CancelledError:
+            # Cancelled while still queued
+            if task['finished'] is None:
+                self.finish(task, 'cancelled')
+            raise
+        except Exception as e:
+            if task['finished'] is None:
+                self.finish(task, 'failed', str(e))
+            raise
+        self.finish(task, 'done')
+        return result
+
+    def release_slot(self, semaphore, work):
+        # Retrieve the abandoned result so it is not reported as never retrieved
+        if not work.cancelled():
+            work.exception()
+        semaphore.release()
+
+    def call(self, task, func, args):
+        self.local.task = task
+        try:
+            return func(*args)
+        finally:
+            self.local.task = None
+
+    def update(self, task, **changes):
+        task.update(changes)
+        self.sink('update', dict(task))
+
+    def finish(self, task, state, error=None):
+        with self.lock:
+            task.update(state=state, error=error, finished=time.monotonic())
+            self.futures.pop(task['id'], None)
+            finished = [task_id for task_id, t in self.tasks.items() if t['finished'] is not None]
+            dropped = finished[:max(0, len(finished) - self.history)]
+            for task_id in dropped:
+                del self.tasks[task_id]
+        self.sink('update', dict(task))
+        for task_id in dropped:
+            self.sink('removed', task_id)
+
+
+class UIEventPump:
+    # Single dispatcher for worker -> UI messages. Workers post() from any thread,
+    # the pump drains the shared queue on the Tk thread in time-budgeted batches
+    # and backs off towards idle_interval_ms when nothing is in flight.
+    def __init__(self, root, budget_ms=12, busy_interval_ms=5, idle_interval_ms=1000):
+        self.root = root
+        self.queue = queue.Queue()
+        self.handlers = {}
+        self.budget = budget_ms / 1000
+        self.busy_interval_ms = busy_interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.interval_ms = busy_interval_ms
+        self.idle = False
+        self.after_id = None
+
+        # Wakeups and the longest time spent in one drain, see take_stats()
+        self.wakeups = 0
+        self.max_frame_ms = 0.0
+
+        self.root.bind("<<UIPumpWake>>", self.on_wake)
+        self.schedule(busy_interval_ms)
+
+    def register(self, channel, handler):
+        self.handlers[channel] = handler
+
+    def take_stats(self):
+        # Counters since the previous call
+        stats = (self.wakeups, self.max_frame_ms)
+        self.wakeups = 0
+        self.max_frame_ms = 0.0
+        return stats
+
+    def post(self, channel, item=None):
+        self.queue.put((channel, item))
+        if self.idle:
+            self.idle = False
+            try:
+                self.root.event_generate("<<UIPumpWake>>", when='tail')
+            except (tk.TclError, RuntimeError):
+                # Mainloop not running (yet); the fallback timer picks it up
+                pass
+
+    def schedule(self, delay_ms):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+        self.after_id = self.root.after(delay_ms, self.pump)
+
+    def on_wake(self, event=None):
+        self.interval_ms = self.busy_interval_ms
+        self.schedule(0)
+
+    def pump(self):
+        self.after_id = None
+        self.wakeups += 1
+        start = time.perf_counter()
+        deadline = start + self.budget
+        handled = 0
+
+        while True:
+            try:
+                channel, item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self.handlers[channel](item)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+            handled += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        self.max_frame_ms = max(self.max_frame_ms, (time.perf_counter() - start) * 1000)
+
+        if not self.queue.empty():
+            # Budget exhausted: yield to Tk so it can redraw, then continue
+            self.interval_ms = self.busy_interval_ms
+            self.schedule(1)
+            return
+        if handled:
+            self.interval_ms = self.busy_interval_ms
+            self.schedule(self.busy_interval_ms)
+            return
+
+        # Nothing in flight: let post() wake us and back off the fallback timer.
+        # The queue is re-checked after raising the flag so a post racing with
+        # this branch is never left waiting for the slow timer.
+        self.idle = True
+        if not self.queue.empty():
+            self.idle = False
+            self.schedule(0)
+            return
+        self.interval_ms = min(self.interval_ms * 2, self.idle_interval_ms)
+        self.schedule(self.interval_ms)
 
 class QEMUManager:
     def __init__(self, root):
@@ -15,71 +1663,185 @@ class QEMUManager:
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(padx=10, pady=10, expand=True, fill='both')
 
+        # Worker -> UI message dispatch
+        self.ui_pump = UIEventPump(root)
+        self.ui_pump.register('build', self.handle_docker_output)
+        self.ui_pump.register('build_done', self.on_docker_build_complete)
+        self.ui_pump.register('hub_search', self.handle_docker_hub_search)
+        self.ui_pump.register('hub_pull', self.handle_docker_hub_pull)
+        self.ui_pump.register('containers', self.handle_container_message)
+        self.ui_pump.register('process_output', self.handle_process_output)
+        self.ui_pump.register('images', self.handle_images_changed)
+        self.ui_pump.register('container_stats', self.handle_container_stats)
+        self.ui_pump.register('container_logs', self.handle_container_logs)
+        self.ui_pump.register('disk', self.handle_disk_message)
+        self.ui_pump.register('golden', self.handle_golden_message)
+        self.ui_pump.register('convert', self.handle_convert_message)
+        self.ui_pump.register('vms', self.handle_vm_message)
+        self.ui_pump.register('vm_snapshots', self.handle_vm_snapshot_message)
+        self.ui_pump.register('docker', self.handle_docker_state)
+        self.ui_pump.register('tasks', self.handle_task_message)
+
+        self.golden_library = GoldenImageLibrary(GOLDEN_LIBRARY_FILE)
+
+        # One docker client for every worker thread, reconnected when the daemon restarts
+        self.docker_manager = DockerClientManager(lambda state, detail: self.ui_pump.post('docker', (state, detail)))
+        self.docker_error = None
+        self.docker_startup_reported = False
+
+        # Local image inventory shared by the image and container tabs
+        self.image_index = ImageIndex()
+
+        # Shared reader for the pipes of every launched child process
+        self.output_reader = ProcessOutputReader(lambda batch: self.ui_pump.post('process_output', batch))
+
+        # Docker and QEMU operations run as tracked tasks on one background loop
+        self.task_engine = TaskEngine(lambda kind, task: self.ui_pump.post('tasks', (kind, task)))
+        self.task_rows = {}
+        self.task_tick = None
+
+        # QMP connections to the VMs started from this window
+        self.vm_monitor = VMMonitor(lambda item: self.ui_pump.post('vms', item), loop=self.task_engine.loop)
+        self.running_vms = {}
+        self.vm_counter = 0
+        self.vm_states = VMStateLibrary(VM_STATES_FILE)
+        self.vm_ready_times = {'cold boot': [], 'snapshot': [], 'state file': []}
+        self.admission = AdmissionScheduler()
+        self.queued_launches = {}
+        self.admission_recheck = None
+
+        # Container rows shown, keyed by full container ID, and containers with
+        # a bulk action in flight (their events are not applied one by one
+        # since the action ends with a single resync)
+        self.container_rows = {}
+        self.container_bulk_ids = set()
+        self.container_event_thread = None
+
+        # Tabs are built the first time they are shown (or needed by another tab)
+        self.tab_builders = {}
+        self.notebook.bind('<<NotebookTabChanged>>', lambda e: self.ensure_tab(self.notebook.select()))
+
         # Docker Hub Tab
-        self.docker_hub_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.docker_hub_tab, text="Docker Hub")
-        self.create_docker_hub_ui()
+        self.docker_hub_tab = self.add_tab("Docker Hub", self.create_docker_hub_ui)
 
         # Virtual Disk Tab
-        self.disk_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.disk_tab, text="Create Virtual Disk")
-        self.create_disk_ui()
+        self.disk_tab = self.add_tab("Create Virtual Disk", self.create_disk_ui)
+
+        # Disk Conversion Tab
+        self.convert_tab = self.add_tab("Convert Disks", self.create_convert_ui)
 
         # Virtual Machine Tab
-        self.vm_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.vm_tab, text="Create Virtual Machine")
-        self.create_vm_ui()
+        self.vm_tab = self.add_tab("Create Virtual Machine", self.create_vm_ui)
+
+        # Running VMs Tab
+        self.running_vms_tab = self.add_tab("Running VMs", self.create_running_vms_ui)
+
+        # Golden Image Library Tab
+        self.golden_tab = self.add_tab("Golden Images", self.create_golden_ui)
 
         # Dockerfile Creator Tab
-        self.docker_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.docker_tab, text="Create Dockerfile")
-        self.create_docker_ui()
+        self.docker_tab = self.add_tab("Create Dockerfile", self.create_docker_ui)
 
         # Docker Image Builder Tab
-        self.docker_build_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.docker_build_tab, text="Build Docker Image")
-        self.create_docker_build_ui()
+        self.docker_build_tab = self.add_tab("Build Docker Image", self.create_docker_build_ui)
 
         # Docker Images Manager Tab
-        self.docker_images_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.docker_images_tab, text="Manage Docker Images")
-        self.create_docker_images_ui()
+        self.docker_images_tab = self.add_tab("Manage Docker Images", self.create_docker_images_ui)
 
         # Docker Containers Manager Tab
-        self.docker_containers_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.docker_containers_tab, text="Manage Containers")
-        self.create_docker_containers_ui()
+        self.docker_containers_tab = self.add_tab("Manage Containers", self.create_docker_containers_ui)
+
+        # Background Tasks Tab
+        self.tasks_tab = self.add_tab("Tasks", self.create_tasks_ui)
+
+        # Docker connection status
+        status_frame = ttk.Frame(root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 5))
+        self.docker_status_var = tk.StringVar()
+        ttk.Label(status_frame, textvariable=self.docker_status_var).pack(side=tk.LEFT)
+        self.docker_retry_button = ttk.Button(
+            status_frame, text="Reconnect", command=lambda: self.docker_manager.reconnect(), state=tk.DISABLED
+        )
+        self.docker_retry_button.pack(side=tk.LEFT, padx=5)
 
         # Console Output
-        self.console = tk.Text(root, height=10)
+        self.console = LogView(root, name='console', height=10)
         self.console.pack(padx=10, pady=5, fill='both')
 
-        # Threading and queue setup
-        self.docker_output_queue = queue.Queue()
-        self.build_thread = None
-        self.root.after(100, self.update_docker_output)
-        self.root.bind("<<DockerBuildComplete>>", self.on_docker_build_complete)
-
-        # Docker Hub queues
-        self.docker_hub_search_queue = queue.Queue()
-        self.docker_hub_pull_queue = queue.Queue()
-        self.root.after(100, self.process_docker_hub_search)
-        self.root.after(100, self.process_docker_hub_pull)
-
-        # Initialize Docker client
-        self.docker_client = None
-        self.initialize_docker_client()
-
-    def initialize_docker_client(self):
-        try:
-            self.docker_client = docker.from_env()
-            self.docker_client.ping()
-        except docker.errors.DockerException as e:
-            messagebox.showerror("Docker Error", f"Could not connect to Docker daemon:\n{e}")
-            self.docker_client = None
-        except Exception as e:
-            messagebox.showerror("Error", f"Unexpected error: {str(e)}")
-            self.docker_client = None
+        # Opt-in startup timing, reported to the console
+        self.startup_timing = os.environ.get(STARTUP_TIMING_ENV) == '1'
+        if self.startup_timing:
+            self.root.bind('<Map>', self.on_first_map, add='+')
+        if os.environ.get(PUMP_STATS_ENV) == '1':
+            self.root.after(PUMP_STATS_INTERVAL_MS, self.report_pump_stats)
+
+        self.ensure_tab(self.docker_hub_tab)
+
+        # The window comes up straight away; Docker is imported and connected in the background
+        self.docker_manager.start()
+
+    def add_tab(self, text, builder):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text=text)
+        self.tab_builders[str(tab)] = builder
+        return tab
+
+    def ensure_tab(self, tab):
+        builder = self.tab_builders.pop(str(tab), None)
+        if builder is None:
+            return
+        started = time.perf_counter()
+        builder()
+        if self.startup_timing:
+            self.console.append(
+                f"Startup: built {self.notebook.tab(tab, 'text')} tab in {(time.perf_counter() - started) * 1000:.0f} ms\n"
+            )
+
+    def tab_built(self, tab):
+        return str(tab) not in self.tab_builders
+
+    def report_pump_stats(self):
+        wakeups, max_frame_ms = self.ui_pump.take_stats()
+        self.console.append(
+            f"UI pump: {wakeups} wakeups in {PUMP_STATS_INTERVAL_MS / 1000:.0f}s, longest drain {max_frame_ms:.1f} ms\n"
+        )
+        self.root.after(PUMP_STATS_INTERVAL_MS, self.report_pump_stats)
+
+    def on_first_map(self, event):
+        if event.widget is not self.root:
+            return
+        self.root.unbind('<Map>')
+        self.console.append(
+            f"Startup: first window after {(time.perf_counter() - STARTUP_STARTED) * 1000:.0f} ms "
+            f"({self.docker_status_var.get()})\n"
+        )
+
+    # ----- Docker Connection -----
+    def handle_docker_state(self, item):
+        state, detail = item
+        if self.startup_timing and state != 'connecting' and not self.docker_startup_reported:
+            self.docker_startup_reported = True
+            self.console.append(
+                f"Startup: Docker {state} after {(time.perf_counter() - STARTUP_STARTED) * 1000:.0f} ms\n"
+            )
+        if state == 'connected':
+            self.docker_status_var.set(f"Docker: connected ({self.docker_manager.summary()})")
+            self.docker_retry_button.config(state=tk.DISABLED)
+            if self.docker_error is not None:
+                self.console.append("Reconnected to Docker daemon\n")
+            self.docker_error = None
+            if self.container_event_thread is None:
+                self.start_container_event_watch()
+        elif state == 'connecting':
+            self.docker_status_var.set("Docker: connecting...")
+        else:
+            self.docker_status_var.set(f"Docker: unavailable ({detail})")
+            self.docker_retry_button.config(state=tk.NORMAL)
+            # Backoff retries repeat the same error; log it once
+            error = detail.rsplit(' (retrying', 1)[0]
+            if error != self.docker_error:
+                self.console.append(f"Docker daemon not reachable: {error}\n")
+            self.docker_error = error
 
     # ----- Docker Hub Management Methods -----
     def create_docker_hub_ui(self):
@@ -93,6 +1855,7 @@ class QEMUManager:
         self.docker_hub_search_entry = ttk.Entry(search_frame, width=40)
         self.docker_hub_search_entry.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
         self.docker_hub_search_entry.bind("<Return>", lambda e: self.start_docker_hub_search())
+        self.docker_hub_search_entry.bind("<KeyRelease>", self.on_docker_hub_search_typed)
 
         self.docker_hub_search_button = ttk.Button(
             search_frame, text="Search", command=self.start_docker_hub_search
@@ -104,14 +1867,28 @@ class QEMUManager:
         )
         self.docker_hub_pull_button.pack(side=tk.LEFT)
 
+        # Client-side filters over the cached results
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill=tk.X, pady=2)
+
+        self.hub_official_only = tk.BooleanVar()
+        self.hub_automated_only = tk.BooleanVar()
+        self.hub_min_stars = tk.IntVar(value=0)
+        ttk.Checkbutton(filter_frame, text="Official only", variable=self.hub_official_only,
+                        command=self.render_docker_hub_results).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(filter_frame, text="Automated only", variable=self.hub_automated_only,
+                        command=self.render_docker_hub_results).pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Min Stars:").pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Spinbox(filter_frame, from_=0, to=100000, increment=10, width=7, textvariable=self.hub_min_stars,
+                    command=self.render_docker_hub_results).pack(side=tk.LEFT)
+
         # Results Treeview
         tree_frame = ttk.Frame(main_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.docker_hub_tree = ttk.Treeview(
+        self.docker_hub_tree = VirtualTable(
             tree_frame,
-            columns=('name', 'description', 'stars', 'official', 'automated'),
-            show='headings'
+            columns=('name', 'description', 'stars', 'official', 'automated')
         )
         
         columns = {
@@ -123,76 +1900,153 @@ class QEMUManager:
         }
 
         for col, (heading, width) in columns.items():
-            self.docker_hub_tree.heading(col, text=heading)
+            self.docker_hub_tree.heading(col, text=heading, command=lambda c=col: self.sort_docker_hub_results(c))
             self.docker_hub_tree.column(col, width=width, anchor='center' if col in ['stars', 'official', 'automated'] else 'w')
 
-        scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.docker_hub_tree.yview)
-        scroll_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.docker_hub_tree.xview)
-        self.docker_hub_tree.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        self.docker_hub_tree.pack(fill=tk.BOTH, expand=True)
 
-        self.docker_hub_tree.grid(row=0, column=0, sticky='nsew')
-        scroll_y.grid(row=0, column=1, sticky='ns')
-        scroll_x.grid(row=1, column=0, sticky='ew')
+        # Live pull progress is redrawn here, only shown while pulls are running,
+        # so the output console below keeps its history
+        self.docker_hub_pull_view = tk.Text(main_frame, height=8, wrap=tk.NONE, font=('Consolas', 10), state=tk.DISABLED)
+        self.hub_pulls = {}
 
         # Output Console
-        self.docker_hub_output = scrolledtext.ScrolledText(
-            main_frame, height=8, wrap=tk.WORD, state=tk.DISABLED, font=('Consolas', 10)
+        self.docker_hub_output = LogView(
+            main_frame, name='docker_hub', height=8, wrap=tk.WORD, font=('Consolas', 10)
         )
         self.docker_hub_output.pack(fill=tk.BOTH, expand=False, pady=5)
         self.docker_hub_output.tag_config('error', foreground='red')
         self.docker_hub_output.tag_config('success', foreground='green')
 
-        self.docker_hub_tree.bind('<<TreeviewSelect>>', self.on_docker_hub_select)
+        self.docker_hub_tree.bind_select(self.on_docker_hub_select)
+
+        # Current result set, the query it belongs to and the active sort
+        self.hub_search_cache = SearchCache(HUB_SEARCH_CACHE_FILE)
+        self.hub_results = []
+        self.hub_query = None
+        self.hub_search_generation = 0
+        self.hub_search_task = None
+        self.hub_search_after_id = None
+        self.hub_sort = (None, False)
 
     def on_docker_hub_select(self, event):
         selected = self.docker_hub_tree.selection()
         self.docker_hub_pull_button.config(state=tk.NORMAL if selected else tk.DISABLED)
 
-    def start_docker_hub_search(self):
+    def on_docker_hub_search_typed(self, event):
+        if event.keysym == 'Return':
+            return
+        if self.hub_search_after_id is not None:
+            self.root.after_cancel(self.hub_search_after_id)
+        self.hub_search_after_id = self.root.after(
+            HUB_SEARCH_DEBOUNCE_MS, lambda: self.start_docker_hub_search(from_typing=True)
+        )
+
+    def start_docker_hub_search(self, from_typing=False):
+        if self.hub_search_after_id is not None:
+            self.root.after_cancel(self.hub_search_after_id)
+            self.hub_search_after_id = None
         query = self.docker_hub_search_entry.get().strip()
+        if from_typing and (len(query) < HUB_SEARCH_MIN_CHARS or query == self.hub_query):
+            return
         if not query:
             messagebox.showwarning("Input Error", "Please enter a search query.")
             return
-        self.docker_hub_search_button.config(state=tk.DISABLED)
-        threading.Thread(target=self.search_docker_hub, args=(query,), daemon=True).start()
 
-    def search_docker_hub(self, query):
-        if not self.docker_client:
-            self.docker_hub_search_queue.put(('error', "Docker not connected."))
+        # Any search still in flight is superseded: its results are dropped
+        # and a search still waiting for a slot never runs
+        self.hub_search_generation += 1
+        if self.hub_search_task is not None:
+            self.task_engine.cancel(self.hub_search_task)
+            self.hub_search_task = None
+        self.hub_query = query
+        self.hub_results = []
+        self.render_docker_hub_results()
+
+        cached = self.hub_search_cache.get(query)
+        if cached is not None:
+            self.hub_results = cached
+            self.render_docker_hub_results()
+            return
+        self.hub_search_task = self.task_engine.submit(
+            'hub', f"Search Docker Hub: {query}", self.search_docker_hub, query, self.hub_search_generation,
+            timeout=TASK_QUERY_TIMEOUT
+        ).task_id
+
+    def search_docker_hub(self, query, generation):
+        if not self.docker_manager.connected:
+            self.ui_pump.post('hub_search', ('error', (generation, "Docker not connected.")))
             return
         try:
-            results = self.docker_client.images.search(query)
-            self.docker_hub_search_queue.put(('clear', None))
-            for img in results:
-                self.docker_hub_search_queue.put(('result', {
-                    'name': img.get('name', 'N/A'),
-                    'description': (img.get('description', '')[:100] + '...') if img.get('description') else '',
-                    'stars': img.get('star_count', 0),
-                    'official': 'Yes' if img.get('is_official') else 'No',
-                    'automated': 'Yes' if img.get('is_automated') else 'No'
-                }))
+            results = self.docker_manager.api.search(query)
+            if generation != self.hub_search_generation:
+                return
+            rows = [{
+                'name': img.get('name', 'N/A'),
+                'description': img.get('description') or '',
+                'stars': img.get('star_count', 0),
+                'official': bool(img.get('is_official')),
+                'automated': bool(img.get('is_automated'))
+            } for img in results]
+            for start in range(0, len(rows), HUB_SEARCH_BATCH):
+                self.ui_pump.post('hub_search', ('results', (generation, rows[start:start + HUB_SEARCH_BATCH])))
+            self.ui_pump.post('hub_search', ('done', (generation, query)))
         except Exception as e:
-            self.docker_hub_search_queue.put(('error', str(e)))
-        finally:
-            self.docker_hub_search_queue.put(('done', None))
+            self.ui_pump.post('hub_search', ('error', (generation, str(e))))
 
-    def process_docker_hub_search(self):
+    def handle_docker_hub_search(self, message):
+        task, (generation, data) = message
+        if generation != self.hub_search_generation:
+            return
+        if task == 'results':
+            self.hub_results.extend(data)
+            for row in self.filter_docker_hub_results(data):
+                self.insert_docker_hub_row(row)
+        elif task == 'error':
+            self.append_docker_hub_output(data, 'error')
+        elif task == 'done':
+            self.hub_search_cache.put(data, self.hub_results)
+            self.hub_search_cache.save()
+            if self.hub_sort[0]:
+                self.render_docker_hub_results()
+
+    def filter_docker_hub_results(self, rows):
         try:
-            while True:
-                task, data = self.docker_hub_search_queue.get_nowait()
-                if task == 'result':
-                    self.docker_hub_tree.insert('', 'end', values=(
-                        data['name'], data['description'], data['stars'], data['official'], data['automated']
-                    ))
-                elif task == 'error':
-                    self.append_docker_hub_output(data, 'error')
-                elif task == 'clear':
-                    self.docker_hub_tree.delete(*self.docker_hub_tree.get_children())
-                elif task == 'done':
-                    self.docker_hub_search_button.config(state=tk.NORMAL)
-        except queue.Empty:
-            pass
-        self.root.after(100, self.process_docker_hub_search)
+            min_stars = self.hub_min_stars.get()
+        except tk.TclError:
+            min_stars = 0
+        return [
+            row for row in rows
+            if row['stars'] >= min_stars
+            and (row['official'] or not self.hub_official_only.get())
+            and (row['automated'] or not self.hub_automated_only.get())
+        ]
+
+    def insert_docker_hub_row(self, row):
+        description = row['description']
+        self.docker_hub_tree.insert('', 'end', iid=row['name'], values=(
+            row['name'],
+            description[:100] + '...' if len(description) > 100 else description,
+            row['stars'],
+            'Yes' if row['official'] else 'No',
+            'Yes' if row['automated'] else 'No'
+        ))
+
+    def sort_docker_hub_results(self, column):
+        key, descending = self.hub_sort
+        # First click on a numeric/flag column sorts high to low
+        self.hub_sort = (column, not descending if key == column else column in ('stars', 'official', 'automated'))
+        self.render_docker_hub_results()
+
+    def render_docker_hub_results(self):
+        rows = self.filter_docker_hub_results(self.hub_results)
+        key, descending = self.hub_sort
+        if key:
+            rows.sort(key=lambda row: row[key], reverse=descending)
+        self.docker_hub_tree.set_rows([])
+        for row in rows:
+            self.insert_docker_hub_row(row)
+        self.on_docker_hub_select(None)
 
     def start_docker_hub_pull(self):
         selected = self.docker_hub_tree.selection()
@@ -200,52 +2054,63 @@ class QEMUManager:
             return
         image_name = self.docker_hub_tree.item(selected[0], 'values')[0]
         self.docker_hub_pull_button.config(state=tk.DISABLED)
-        threading.Thread(target=self.pull_docker_image, args=(image_name,), daemon=True).start()
+        self.task_engine.submit('hub', f"Pull {image_name}", self.pull_docker_image, image_name)
 
     def pull_docker_image(self, image_name):
-        if not self.docker_client:
-            self.docker_hub_pull_queue.put(('error', "Docker not connected."))
-            return
+        progress = PullProgress(image_name)
         try:
-            self.docker_hub_output.config(state=tk.NORMAL)
-            self.docker_hub_output.delete(1.0, tk.END)
-            self.docker_hub_output.insert(tk.END, f"Pulling {image_name}...\n")
-            self.docker_hub_output.config(state=tk.DISABLED)
-            for line in self.docker_client.api.pull(image_name, stream=True, decode=True):
-                self.docker_hub_pull_queue.put(line)
-            self.docker_hub_pull_queue.put(('success', f"Successfully pulled {image_name}"))
+            if not self.docker_manager.connected:
+                self.ui_pump.post('hub_pull', ('error', "Docker not connected."))
+                return
+            self.ui_pump.post('hub_pull', ('progress', (image_name, f"Pulling {image_name}...")))
+            last_render = 0
+            for line in self.docker_manager.api.pull(image_name, stream=True, decode=True):
+                if self.task_engine.cancelled():
+                    self.ui_pump.post('hub_pull', ('error', f"Pull of {image_name} cancelled"))
+                    return
+                progress.update(line)
+                if time.monotonic() - last_render >= 1 / PULL_RENDER_FPS:
+                    last_render = time.monotonic()
+                    self.ui_pump.post('hub_pull', ('progress', (image_name, progress.render())))
+            total = progress.totals()[1]
+            self.ui_pump.post('hub_pull', (
+                'success', f"Successfully pulled {image_name} ({format_bytes(total)} in {len(progress.layers)} layers)"
+            ))
         except Exception as e:
-            self.docker_hub_pull_queue.put(('error', str(e)))
+            self.ui_pump.post('hub_pull', ('error', str(e)))
         finally:
-            self.docker_hub_pull_queue.put(('done', None))
-
-    def process_docker_hub_pull(self):
-        try:
-            while True:
-                item = self.docker_hub_pull_queue.get_nowait()
-                if isinstance(item, dict):
-                    self.append_docker_hub_output(f"Status: {item.get('status', '')}")
-                    if 'progress' in item:
-                        self.append_docker_hub_output(f"Progress: {item['progress']}")
-                elif isinstance(item, tuple):
-                    status, msg = item
-                    self.append_docker_hub_output(msg, tag=status)
-                elif item == 'done':
-                    self.docker_hub_pull_button.config(state=tk.NORMAL)
-        except queue.Empty:
-            pass
-        self.root.after(100, self.process_docker_hub_pull)
+            self.ui_pump.post('hub_pull', ('done', image_name))
+
+    def handle_docker_hub_pull(self, item):
+        status, msg = item
+        if status == 'progress':
+            image_name, text = msg
+            self.hub_pulls[image_name] = text
+            self.render_docker_hub_pulls()
+        elif status == 'done':
+            self.hub_pulls.pop(msg, None)
+            self.render_docker_hub_pulls()
+            self.docker_hub_pull_button.config(state=tk.NORMAL)
+        else:
+            self.append_docker_hub_output(msg, tag=status)
+
+    def render_docker_hub_pulls(self):
+        if not self.hub_pulls:
+            self.docker_hub_pull_view.pack_forget()
+            return
+        if not self.docker_hub_pull_view.winfo_manager():
+            self.docker_hub_pull_view.pack(fill=tk.X, pady=(5, 0), before=self.docker_hub_output)
+        self.docker_hub_pull_view.config(state=tk.NORMAL)
+        self.docker_hub_pull_view.delete('1.0', tk.END)
+        self.docker_hub_pull_view.insert('1.0', "\n\n".join(self.hub_pulls.values()))
+        self.docker_hub_pull_view.config(state=tk.DISABLED)
 
     def append_docker_hub_output(self, text, tag=None):
-        self.docker_hub_output.config(state=tk.NORMAL)
-        self.docker_hub_output.insert(tk.END, text + "\n", tag)
-        self.docker_hub_output.see(tk.END)
-        self.docker_hub_output.config(state=tk.DISABLED)
+        self.docker_hub_output.append(text + "\n", tag)
 
     # ----- Original Disk Management Methods -----
     def create_disk_ui(self):
         formats = ['qcow2', 'raw', 'vdi', 'vmdk']
-        allocation_types = ['Dynamic', 'Fixed']
 
         ttk.Label(self.disk_tab, text="Filename:").grid(row=0, column=0, padx=5, pady=5)
         self.disk_filename = ttk.Entry(self.disk_tab, width=30)
@@ -261,16 +2126,56 @@ class QEMUManager:
         self.size_unit.grid(row=1, column=1, padx=5, pady=5, sticky='e')
 
         ttk.Label(self.disk_tab, text="Format:").grid(row=2, column=0, padx=5, pady=5)
-        self.disk_format = ttk.Combobox(self.disk_tab, values=formats)
+        self.disk_format = ttk.Combobox(self.disk_tab, values=formats, state='readonly')
         self.disk_format.set('qcow2')
         self.disk_format.grid(row=2, column=1, padx=5, pady=5, sticky='w')
-
-        ttk.Label(self.disk_tab, text="Allocation:").grid(row=3, column=0, padx=5, pady=5)
-        self.allocation_type = ttk.Combobox(self.disk_tab, values=allocation_types)
-        self.allocation_type.set('Dynamic')
-        self.allocation_type.grid(row=3, column=1, padx=5, pady=5, sticky='w')
-
-        ttk.Button(self.disk_tab, text="Create Disk", command=self.create_disk).grid(row=4, column=1, padx=5, pady=10)
+        self.disk_format.bind('<<ComboboxSelected>>', lambda e: self.update_disk_options())
+
+        ttk.Label(self.disk_tab, text="Preallocation:").grid(row=3, column=0, padx=5, pady=5)
+        self.disk_preallocation = ttk.Combobox(self.disk_tab, state='readonly')
+        self.disk_preallocation.grid(row=3, column=1, padx=5, pady=5, sticky='w')
+
+        # qcow2-only tuning
+        ttk.Label(self.disk_tab, text="Cluster Size:").grid(row=4, column=0, padx=5, pady=5)
+        self.disk_cluster_size = ttk.Combobox(self.disk_tab, values=DISK_CLUSTER_SIZES, width=6, state='readonly')
+        self.disk_cluster_size.set('64K')
+        self.disk_cluster_size.grid(row=4, column=1, padx=5, pady=5, sticky='w')
+
+        qcow2_frame = ttk.Frame(self.disk_tab)
+        qcow2_frame.grid(row=5, column=1, padx=5, pady=5, sticky='w')
+        self.disk_lazy_refcounts = tk.BooleanVar()
+        self.disk_extended_l2 = tk.BooleanVar()
+        self.disk_qcow2_options = [
+            self.disk_cluster_size,
+            ttk.Checkbutton(qcow2_frame, text="Lazy refcounts", variable=self.disk_lazy_refcounts),
+            ttk.Checkbutton(qcow2_frame, text="Extended L2", variable=self.disk_extended_l2)
+        ]
+        for checkbox in self.disk_qcow2_options[1:]:
+            checkbox.pack(side=tk.LEFT, padx=(0, 5))
+
+        button_frame = ttk.Frame(self.disk_tab)
+        button_frame.grid(row=6, column=1, padx=5, pady=10)
+        self.disk_create_button = ttk.Button(button_frame, text="Create Disk", command=self.create_disk)
+        self.disk_create_button.pack(side=tk.LEFT, padx=5)
+        self.disk_cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_disk_creation, state=tk.DISABLED)
+        self.disk_cancel_button.pack(side=tk.LEFT, padx=5)
+
+        self.disk_progress = ttk.Progressbar(self.disk_tab, length=250)
+        self.disk_progress.grid(row=7, column=1, padx=5, pady=5, sticky='w')
+        self.disk_status = tk.StringVar()
+        ttk.Label(self.disk_tab, textvariable=self.disk_status).grid(row=8, column=0, columnspan=3, padx=5, pady=5, sticky='w')
+
+        self.disk_process = None
+        self.update_disk_options()
+
+    def update_disk_options(self):
+        modes = DISK_PREALLOCATION[self.disk_format.get()]
+        self.disk_preallocation['values'] = modes
+        if self.disk_preallocation.get() not in modes:
+            self.disk_preallocation.set('off')
+        state = ['!disabled'] if self.disk_format.get() == 'qcow2' else ['disabled']
+        for widget in self.disk_qcow2_options:
+            widget.state(state)
 
     def validate_disk_size(self, value):
         if value == "": return True
@@ -291,35 +2196,355 @@ class QEMUManager:
         size = self.disk_size.get()
         unit = self.size_unit.get()
         format = self.disk_format.get()
-        allocation = self.allocation_type.get()
+        preallocation = self.disk_preallocation.get()
 
         try:
             if not all([filename, size, format]) or float(size) <= 0:
                 raise ValueError
-        except ValueError:
+            size_bytes = disk_size_bytes(size, unit)
+        except (ValueError, KeyError):
             messagebox.showerror("Error", "Invalid disk parameters")
             return
 
-        allocation_map = {
-            'qcow2': {'Dynamic': 'preallocation=off', 'Fixed': 'preallocation=metadata'},
-            'raw': {'Dynamic': '', 'Fixed': ''},
-            'vdi': {'Dynamic': '', 'Fixed': ''},
-            'vmdk': {'Dynamic': '', 'Fixed': ''}
+        if os.path.exists(filename) and not messagebox.askyesno("Confirm", f"{filename} already exists. Overwrite it?"):
+            return
+
+        qcow2 = format == 'qcow2'
+        cmd = build_disk_command(
+            filename, size_bytes, format, preallocation,
+            cluster_size=self.disk_cluster_size.get() if qcow2 else None,
+            lazy_refcounts=qcow2 and self.disk_lazy_refcounts.get(),
+            extended_l2=qcow2 and self.disk_extended_l2.get()
+        )
+
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        except OSError as e:
+            self.console.append(f"Error creating disk:\n{e}\n")
+            return
+
+        process.cancelled = False
+        self.disk_process = process
+        self.disk_create_button.config(state=tk.DISABLED)
+        self.disk_cancel_button.config(state=tk.NORMAL)
+        # Only a fully written image grows on disk in a measurable way
+        if preallocation == 'full':
+            self.disk_progress.config(mode='determinate', maximum=100, value=0)
+        else:
+            self.disk_progress.config(mode='indeterminate')
+            self.disk_progress.start(50)
+        self.disk_status.set(f"Creating {Path(filename).name} ({format_bytes(size_bytes)}, preallocation={preallocation})...")
+        self.console.append(f"Creating disk: {format_command(cmd)}\n")
+
+        self.task_engine.submit(
+            'disk', f"Create disk {Path(filename).name}", self.watch_disk_creation,
+            process, cmd, filename, size_bytes, preallocation == 'full',
+            on_cancel=lambda: self.abort_disk_process(process)
+        )
+
+    def watch_disk_creation(self, process, cmd, filename, size_bytes, track_progress):
+        start = time.monotonic()
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=DISK_PROGRESS_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if track_progress:
+                try:
+                    written = os.stat(filename).st_blocks * 512
+                except (OSError, AttributeError):
+                    continue
+                self.ui_pump.post('disk', ('progress', min(100, written * 100 / size_bytes)))
+
+        elapsed = time.monotonic() - start
+        if process.cancelled:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            self.ui_pump.post('disk', ('cancelled', f"Disk creation cancelled, removed {filename}"))
+        elif process.returncode == 0:
+            self.ui_pump.post('disk', ('success', f"Disk created in {elapsed:.1f}s: {format_command(cmd)}\n{stdout}"))
+        else:
+            self.ui_pump.post('disk', ('error', f"Error creating disk:\n{stderr}"))
+
+    def cancel_disk_creation(self):
+        if self.disk_process and self.disk_process.poll() is None:
+            self.abort_disk_process(self.disk_process)
+            self.disk_cancel_button.config(state=tk.DISABLED)
+            self.disk_status.set("Cancelling...")
+
+    def abort_disk_process(self, process):
+        # Also the task's cancel hook, so it must not touch widgets
+        if process.poll() is None:
+            process.cancelled = True
+            process.terminate()
+
+    def handle_disk_message(self, item):
+        status, value = item
+        if status == 'progress':
+            self.disk_progress.config(value=value)
+            self.disk_status.set(f"Writing image... {value:.0f}%")
+            return
+        self.disk_process = None
+        self.disk_progress.stop()
+        self.disk_progress.config(mode='determinate', value=100 if status == 'success' else 0)
+        self.disk_create_button.config(state=tk.NORMAL)
+        self.disk_cancel_button.config(state=tk.DISABLED)
+        self.disk_status.set(value.splitlines()[0])
+        self.console.append(value.rstrip("\n") + "\n")
+
+    # ----- Disk Conversion Methods -----
+    def create_convert_ui(self):
+        ttk.Label(self.convert_tab, text="Source Image:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        self.convert_source = ttk.Entry(self.convert_tab, width=50)
+        self.convert_source.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        ttk.Button(self.convert_tab, text="Browse", command=self.browse_convert_source).grid(row=0, column=2, padx=5, pady=5)
+
+        ttk.Label(self.convert_tab, text="Output Image:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
+        self.convert_target = ttk.Entry(self.convert_tab, width=50)
+        self.convert_target.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
+        ttk.Button(self.convert_tab, text="Browse", command=self.browse_convert_target).grid(row=1, column=2, padx=5, pady=5)
+
+        ttk.Label(self.convert_tab, text="Output Format:").grid(row=2, column=0, padx=5, pady=5, sticky='w')
+        self.convert_format = ttk.Combobox(self.convert_tab, values=['qcow2', 'raw', 'vdi', 'vmdk'], state='readonly', width=8)
+        self.convert_format.set('qcow2')
+        self.convert_format.grid(row=2, column=1, padx=5, pady=5, sticky='w')
+        self.convert_format.bind('<<ComboboxSelected>>', lambda e: self.update_convert_target_suffix())
+
+        options_frame = ttk.Frame(self.convert_tab)
+        options_frame.grid(row=3, column=1, columnspan=2, padx=5, pady=5, sticky='w')
+        self.convert_compress = tk.BooleanVar()
+        self.convert_sparse = tk.BooleanVar(value=True)
+        self.convert_out_of_order = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Compress (qcow2)", variable=self.convert_compress).pack(side=tk.LEFT)
+        ttk.Checkbutton(options_frame, text="Sparsify zeroes", variable=self.convert_sparse).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Checkbutton(options_frame, text="Out-of-order writes", variable=self.convert_out_of_order).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Label(options_frame, text="Coroutines:").pack(side=tk.LEFT, padx=(10, 2))
+        self.convert_coroutines = tk.IntVar(value=8)
+        ttk.Spinbox(options_frame, from_=1, to=16, width=4, textvariable=self.convert_coroutines).pack(side=tk.LEFT)
+
+        convert_controls = ttk.Frame(self.convert_tab)
+        convert_controls.grid(row=4, column=0, columnspan=3, pady=10)
+        ttk.Button(convert_controls, text="Queue Conversion", command=self.queue_conversion).pack(side=tk.LEFT, padx=5)
+        ttk.Label(
+            convert_controls, text=f"Runs {TASK_CATEGORY_LIMITS['convert']} at once, the rest wait in the task list"
+        ).pack(side=tk.LEFT, padx=(15, 0))
+        ttk.Button(convert_controls, text="Cancel Selected", command=self.cancel_conversion).pack(side=tk.LEFT, padx=15)
+        ttk.Button(convert_controls, text="Clear Finished", command=self.clear_finished_conversions).pack(side=tk.LEFT)
+
+        self.convert_jobs_tree = ttk.Treeview(
+            self.convert_tab,
+            columns=('job', 'source', 'target', 'state', 'progress', 'sizes', 'duration'),
+            show='headings',
+            selectmode='browse'
+        )
+        columns = {
+            'job': ('Job', 40),
+            'source': ('Source', 200),
+            'target': ('Output', 200),
+            'state': ('State', 80),
+            'progress': ('Progress', 70),
+            'sizes': ('Disk Usage', 150),
+            'duration': ('Duration', 70)
         }
+        for col, (heading, width) in columns.items():
+            self.convert_jobs_tree.heading(col, text=heading)
+            self.convert_jobs_tree.column(col, width=width, anchor='w')
+        self.convert_jobs_tree.grid(row=5, column=0, columnspan=3, sticky='nsew', padx=5, pady=5)
+
+        self.convert_tab.grid_rowconfigure(5, weight=1)
+        self.convert_tab.grid_columnconfigure(1, weight=1)
 
-        cmd = f'qemu-img create -f {format}'
-        if options := allocation_map.get(format, {}).get(allocation):
-            cmd += f' -o {options}'
-        cmd += f' {filename} {size}{unit}'
+        self.convert_jobs = {}
+        self.convert_job_counter = 0
 
-        try:    
-            result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
-            self.console.insert(tk.END, f"Disk created: {cmd}\n{result.stdout}\n")
-        except subprocess.CalledProcessError as e:
-            error_msg = f"Error creating disk:\n{e.stderr}\n"
-            if "preallocation=full" in error_msg and format == 'raw':
-                error_msg += "\nTIP: Raw format doesn't support full preallocation. Use Dynamic allocation instead."
-            self.console.insert(tk.END, error_msg)
+    def browse_convert_source(self):
+        filename = filedialog.askopenfilename(
+            filetypes=[("QEMU Disk Images", "*.qcow2 *.raw *.img *.vdi *.vmdk"), ("All Files", "*.*")]
+        )
+        if filename:
+            self.convert_source.delete(0, tk.END)
+            self.convert_source.insert(0, filename)
+            self.convert_target.delete(0, tk.END)
+            self.convert_target.insert(0, str(Path(filename).with_name(f"{Path(filename).stem}-converted")))
+            self.update_convert_target_suffix()
+
+    def browse_convert_target(self):
+        filename = filedialog.asksaveasfilename(
+            defaultextension=f".{self.convert_format.get()}",
+            filetypes=[("QEMU Disk Images", "*.qcow2 *.raw *.vdi *.vmdk"), ("All Files", "*.*")]
+        )
+        if filename:
+            self.convert_target.delete(0, tk.END)
+            self.convert_target.insert(0, filename)
+
+    def update_convert_target_suffix(self):
+        target = self.convert_target.get()
+        if target:
+            self.convert_target.delete(0, tk.END)
+            self.convert_target.insert(0, str(Path(target).with_suffix(f".{self.convert_format.get()}")))
+
+    def queue_conversion(self):
+        source = self.convert_source.get()
+        target = self.convert_target.get()
+        if not source or not target or not os.path.exists(source):
+            messagebox.showerror("Error", "Invalid source or output image")
+            return
+        if os.path.abspath(source) == os.path.abspath(target):
+            messagebox.showerror("Error", "Output must be a different file than the source")
+            return
+        if any(job['target'] == target and job['state'] in ('queued', 'running') for job in self.convert_jobs.values()):
+            messagebox.showerror("Error", "Another job is already writing that output image")
+            return
+        if os.path.exists(target) and not messagebox.askyesno("Confirm", f"{target} already exists. Overwrite it?"):
+            return
+        try:
+            coroutines = min(16, max(1, self.convert_coroutines.get()))
+        except tk.TclError:
+            coroutines = 8
+
+        self.convert_job_counter += 1
+        job_id = self.convert_job_counter
+        job = {
+            'id': job_id,
+            'source': source,
+            'target': target,
+            'cmd': build_convert_command(
+                source, target, self.convert_format.get(),
+                compress=self.convert_compress.get(),
+                sparse_size='4k' if self.convert_sparse.get() else '0',
+                coroutines=coroutines,
+                out_of_order=self.convert_out_of_order.get()
+            ),
+            'state': 'queued',
+            'progress': 0.0,
+            'process': None,
+            'errors': [],
+            'started': None,
+            'finished': None
+        }
+        self.convert_jobs[job_id] = job
+        self.convert_jobs_tree.insert('', tk.END, iid=str(job_id))
+        self.update_convert_job_row(job)
+        future = self.task_engine.submit(
+            'convert', f"Convert {Path(source).name} to {Path(target).name}", self.run_conversion, job,
+            on_cancel=lambda: self.abort_conversion(job)
+        )
+        job['task_id'] = future.task_id
+        future.add_done_callback(lambda f: self.post_conversion_result(f, job_id))
+
+    def run_conversion(self, job):
+        # Task thread: holds a 'convert' slot until qemu-img exits and returns its exit code
+        exited = Future()
+        job['process'] = subprocess.Popen(job['cmd'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if self.task_engine.cancelled():
+            job['process'].terminate()
+        self.ui_pump.post('convert', (job['id'], 'started', time.monotonic()))
+        self.output_reader.add(
+            job['process'], f"convert #{job['id']}",
+            on_line=lambda stream, line: self.on_convert_output(job['id'], stream, line),
+            on_exit=exited.set_result
+        )
+        code = exited.result()
+        if self.task_engine.cancelled():
+            # Only now has qemu-img stopped writing: drop the partial output
+            try:
+                os.remove(job['target'])
+            except OSError:
+                pass
+        return code
+
+    def abort_conversion(self, job):
+        # The task's cancel hook; a queued job has no process yet
+        process = job['process']
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def post_conversion_result(self, future, job_id):
+        if future.cancelled():
+            self.ui_pump.post('convert', (job_id, 'cancelled', None))
+        elif future.exception():
+            self.ui_pump.post('convert', (job_id, 'error', str(future.exception())))
+        else:
+            self.ui_pump.post('convert', (job_id, 'exit', future.result()))
+
+    def on_convert_output(self, job_id, stream, line):
+        # Reader thread: only forward whole-percent changes and real messages
+        match = CONVERT_PROGRESS_RE.search(line)
+        if match:
+            percent = float(match.group(1))
+            job = self.convert_jobs.get(job_id)
+            if job is not None and int(percent) != int(job['progress']):
+                self.ui_pump.post('convert', (job_id, 'progress', percent))
+        else:
+            self.ui_pump.post('convert', (job_id, 'output', line))
+
+    def handle_convert_message(self, item):
+        job_id, kind, value = item
+        job = self.convert_jobs.get(job_id)
+        if job is None:
+            return
+        if kind == 'started':
+            job['started'] = value
+            if job['state'] == 'queued':
+                job['state'] = 'running'
+            self.console.append(f"Converting: {format_command(job['cmd'])}\n")
+        elif kind == 'progress':
+            job['progress'] = value
+        elif kind == 'output':
+            job['errors'].append(value)
+            self.console.append(f"convert #{job_id}: {value}\n")
+        else:
+            job['finished'] = time.monotonic()
+            if kind == 'cancelled':
+                # A job that got to run removes its partial output once qemu-img exits
+                job['state'] = 'cancelled'
+            elif kind == 'error':
+                job['state'] = 'failed'
+                job['errors'].append(value)
+            elif value == 0:
+                job['state'] = 'done'
+                job['progress'] = 100.0
+            else:
+                job['state'] = 'failed'
+            job['process'] = None
+            self.console.append(f"Conversion #{job_id} {job['state']}: {value if kind == 'error' else job['target']}\n")
+        self.update_convert_job_row(job)
+
+    def update_convert_job_row(self, job):
+        duration = ''
+        if job['started'] is not None:
+            duration = f"{(job['finished'] or time.monotonic()) - job['started']:.1f}s"
+        sizes = ''
+        if job['state'] == 'done':
+            # Allocated blocks, not apparent size, so sparse output shows its savings
+            try:
+                before = os.stat(job['source']).st_blocks * 512
+                after = os.stat(job['target']).st_blocks * 512
+                sizes = f"{format_bytes(before)} -> {format_bytes(after)}"
+            except (OSError, AttributeError):
+                pass
+        self.convert_jobs_tree.item(str(job['id']), values=(
+            job['id'], Path(job['source']).name, Path(job['target']).name,
+            job['state'], f"{job['progress']:.0f}%", sizes, duration
+        ))
+
+    def cancel_conversion(self):
+        selected = self.convert_jobs_tree.selection()
+        if not selected:
+            return
+        job = self.convert_jobs[int(selected[0])]
+        if job['state'] in ('queued', 'running') and self.task_engine.cancel(job['task_id']):
+            job['state'] = 'cancelling'
+            self.update_convert_job_row(job)
+
+    def clear_finished_conversions(self):
+        for job_id, job in list(self.convert_jobs.items()):
+            if job['state'] in ('done', 'failed', 'cancelled'):
+                self.convert_jobs_tree.delete(str(job_id))
+                del self.convert_jobs[job_id]
 
     # ----- Original VM Management Methods -----
     def create_vm_ui(self):
@@ -348,7 +2573,83 @@ class QEMUManager:
         self.iso_path.grid(row=4, column=1, padx=5, pady=5)
         ttk.Button(self.vm_tab, text="Browse", command=self.browse_iso).grid(row=4, column=2, padx=5, pady=5)
 
-        ttk.Button(self.vm_tab, text="Create VM", command=self.create_vm).grid(row=5, column=1, padx=5, pady=10)
+        # Launch profile and the individual settings it fills in
+        ttk.Label(self.vm_tab, text="Profile:").grid(row=5, column=0, padx=5, pady=5)
+        self.vm_profile = ttk.Combobox(self.vm_tab, values=list(VM_PROFILES), state='readonly')
+        self.vm_profile.grid(row=5, column=1, padx=5, pady=5)
+        self.vm_profile.bind('<<ComboboxSelected>>', lambda e: self.apply_vm_profile())
+
+        ttk.Label(self.vm_tab, text="Disk Bus:").grid(row=6, column=0, padx=5, pady=5)
+        self.vm_disk_bus = ttk.Combobox(self.vm_tab, values=VM_DISK_BUSES, state='readonly')
+        self.vm_disk_bus.grid(row=6, column=1, padx=5, pady=5)
+
+        ttk.Label(self.vm_tab, text="Disk Cache:").grid(row=7, column=0, padx=5, pady=5)
+        self.vm_disk_cache = ttk.Combobox(self.vm_tab, values=VM_CACHE_MODES, state='readonly')
+        self.vm_disk_cache.grid(row=7, column=1, padx=5, pady=5)
+
+        ttk.Label(self.vm_tab, text="Disk AIO:").grid(row=8, column=0, padx=5, pady=5)
+        self.vm_disk_aio = ttk.Combobox(self.vm_tab, values=VM_AIO_MODES, state='readonly')
+        self.vm_disk_aio.grid(row=8, column=1, padx=5, pady=5)
+
+        options_frame = ttk.Frame(self.vm_tab)
+        options_frame.grid(row=9, column=1, padx=5, pady=5, sticky='w')
+        self.vm_cpu_host = tk.BooleanVar()
+        self.vm_iothread = tk.BooleanVar()
+        self.vm_hugepages = tk.BooleanVar()
+        ttk.Checkbutton(options_frame, text="Host CPU", variable=self.vm_cpu_host,
+                        command=self.update_vm_command_preview).pack(side=tk.LEFT)
+        ttk.Checkbutton(options_frame, text="IOThread", variable=self.vm_iothread,
+                        command=self.update_vm_command_preview).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(options_frame, text="Huge Pages", variable=self.vm_hugepages,
+                        command=self.update_vm_command_preview).pack(side=tk.LEFT)
+
+        ttk.Label(self.vm_tab, text="Command:").grid(row=10, column=0, padx=5, pady=5, sticky='n')
+        self.vm_command_preview = tk.Text(self.vm_tab, height=6, width=70, wrap=tk.WORD, state=tk.DISABLED)
+        self.vm_command_preview.grid(row=10, column=1, columnspan=2, padx=5, pady=5, sticky='ew')
+
+        ttk.Button(self.vm_tab, text="Create VM", command=self.create_vm).grid(row=11, column=1, padx=5, pady=10)
+
+        for widget in (self.vm_cpu, self.vm_memory, self.vm_disk_path, self.iso_path):
+            widget.bind('<KeyRelease>', lambda e: self.update_vm_command_preview())
+        for widget in (self.vm_disk_format, self.vm_disk_bus, self.vm_disk_cache, self.vm_disk_aio):
+            widget.bind('<<ComboboxSelected>>', lambda e: self.update_vm_command_preview(), add='+')
+
+        self.vm_profile.set('Balanced')
+        self.apply_vm_profile()
+
+    def apply_vm_profile(self):
+        profile = VM_PROFILES[self.vm_profile.get()]
+        self.vm_disk_bus.set(profile['disk_bus'])
+        self.vm_disk_cache.set(profile['cache'])
+        self.vm_disk_aio.set(profile['aio'])
+        self.vm_cpu_host.set(profile['cpu_host'])
+        self.vm_iothread.set(profile['iothread'])
+        self.vm_hugepages.set(profile['hugepages'])
+        self.update_vm_command_preview()
+
+    def get_vm_settings(self):
+        return {
+            'cpu_host': self.vm_cpu_host.get(),
+            'disk_bus': self.vm_disk_bus.get(),
+            'iothread': self.vm_iothread.get(),
+            'cache': self.vm_disk_cache.get(),
+            'aio': self.vm_disk_aio.get(),
+            'hugepages': self.vm_hugepages.get()
+        }
+
+    def update_vm_command_preview(self):
+        memory = self.vm_memory.get()
+        cmd, notes = build_vm_command(
+            self.vm_cpu.get() or '<cpus>', int(memory) if memory.isdigit() else 0,
+            self.vm_disk_path.get() or '<disk>', self.vm_disk_format.get(),
+            self.iso_path.get(), self.get_vm_settings()
+        )
+        self.vm_command_preview.config(state=tk.NORMAL)
+        self.vm_command_preview.delete('1.0', tk.END)
+        self.vm_command_preview.insert(tk.END, format_command(cmd))
+        for note in notes:
+            self.vm_command_preview.insert(tk.END, f"\n# {note}")
+        self.vm_command_preview.config(state=tk.DISABLED)
 
     def validate_numeric_input(self, value):
         if value == "": return True
@@ -388,40 +2689,817 @@ class QEMUManager:
         disk_format = self.vm_disk_format.get()
         iso_path = self.iso_path.get()
 
-        if not all([disk_path, iso_path]) or not os.path.exists(disk_path) or not os.path.exists(iso_path):
+        if not disk_path or not os.path.exists(disk_path) or (iso_path and not os.path.exists(iso_path)):
             messagebox.showerror("Error", "Invalid disk or ISO path")
             return
 
-        cmd = (
-            f'qemu-system-x86_64 -smp {cpu} -m {memory} '
-            f'-drive file="{disk_path}",format={disk_format} '
-            f'-cdrom "{iso_path}" -boot menu=on '
-            f'-display gtk -machine type=q35 -usbdevice tablet'
+        if os.path.abspath(disk_path) in self.golden_library.bases:
+            clones = len(self.golden_library.children(disk_path))
+            messagebox.showerror(
+                "Error",
+                f"This disk is a read-only golden image with {clones} linked clone(s). "
+                "Create a linked clone from the Golden Images tab and boot that instead."
+            )
+            return
+
+        config = {
+            'cpu': cpu,
+            'memory': memory,
+            'disk_path': disk_path,
+            'disk_format': disk_format,
+            'iso_path': iso_path,
+            'settings': self.get_vm_settings()
+        }
+        self.launch_vm(config, 'cold boot')
+
+    def launch_vm(self, config, mode, extra_args=()):
+        # mode is 'cold boot', 'snapshot' (-loadvm) or 'state file' (-incoming)
+        self.vm_counter += 1
+        vm_id = self.vm_counter
+        name = f"{Path(config['disk_path']).stem}-{vm_id}"
+        self.ensure_tab(self.running_vms_tab)
+
+        decision, reason = self.admission.request(vm_id, config['cpu'], config['memory'])
+        if decision == 'reject':
+            self.console.append(f"VM {name} rejected: {reason}\n")
+            messagebox.showerror("Launch Rejected", f"{name} cannot start on this host: {reason}")
+            return
+        if decision == 'queue':
+            self.queued_launches[vm_id] = (name, config, mode, list(extra_args))
+            self.running_vms_tree.insert('', tk.END, iid=str(vm_id), values=(name, '', 'queued', mode))
+            self.console.append(f"VM {name} queued: {reason}\n")
+            self.update_admission_status()
+            self.schedule_admission_recheck()
+            return
+        self.start_vm(vm_id, name, config, mode, extra_args)
+
+    def start_vm(self, vm_id, name, config, mode, extra_args):
+        qmp_address = allocate_qmp_address(name)
+        agent_address = qmp_address.replace('.sock', '.qga.sock') if isinstance(qmp_address, str) else None
+        cmd, notes = build_vm_command(**config, name=name, qmp_address=qmp_address, agent_address=agent_address)
+        cmd += list(extra_args)
+        for note in notes:
+            self.console.append(f"Note: {note}\n")
+        self.console.append(f"Starting VM: {format_command(cmd)}\n")
+
+        self.running_vms[vm_id] = {
+            'name': name,
+            'process': None,
+            'config': config,
+            'mode': mode,
+            'qmp_address': qmp_address,
+            'agent_address': agent_address,
+            'started': time.monotonic(),
+            'ready_at': None,
+            'saved_state': None,
+            'status': 'starting',
+            'metrics': None
+        }
+        if not self.running_vms_tree.exists(str(vm_id)):
+            self.running_vms_tree.insert('', tk.END, iid=str(vm_id))
+        self.update_running_vm_row(vm_id)
+        self.update_admission_status()
+        future = self.task_engine.submit(
+            'qemu', f"Start VM {name}", self.spawn_vm, vm_id, name, cmd, qmp_address, agent_address, mode == 'state file'
+        )
+        future.add_done_callback(
+            lambda f: (f.cancelled() or f.exception()) and self.ui_pump.post(
+                'vms', ('start failed', vm_id, "cancelled" if f.cancelled() else str(f.exception()))
+            )
+        )
+
+    def spawn_vm(self, vm_id, name, cmd, qmp_address, agent_address, incoming):
+        # Task thread: the process is handed to the UI before its exit can be reported
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.ui_pump.post('vms', ('spawned', vm_id, process))
+        self.output_reader.add(
+            process, f"VM {name}",
+            on_exit=lambda code: self.ui_pump.post('vms', ('exit', vm_id, code))
+        )
+        self.vm_monitor.add(vm_id, qmp_address, agent_address, incoming)
+
+    # ----- Running VM Methods -----
+    def create_running_vms_ui(self):
+        main_frame = ttk.Frame(self.running_vms_tab)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        control_frame = ttk.Frame(main_frame)
+        control_frame.pack(fill=tk.X, pady=5)
+        actions = [
+            ("Pause", 'stop'),
+            ("Resume", 'cont'),
+            ("Power Down", 'system_powerdown'),
+            ("Reset", 'system_reset'),
+            ("Force Quit", 'quit')
+        ]
+        for text, command in actions:
+            ttk.Button(
+                control_frame, text=text,
+                command=lambda c=command: self.send_vm_command(c)
+            ).pack(side=tk.LEFT, padx=2)
+        ttk.Button(control_frame, text="Save Snapshot", command=self.save_vm_snapshot).pack(side=tk.LEFT, padx=(15, 2))
+        ttk.Button(control_frame, text="Save State && Quit", command=self.save_vm_state).pack(side=tk.LEFT, padx=2)
+
+        # Admission policy for new launches
+        admission_frame = ttk.Frame(main_frame)
+        admission_frame.pack(fill=tk.X, pady=5)
+        self.admission_memory_overcommit = tk.DoubleVar(value=ADMISSION_MEMORY_OVERCOMMIT)
+        self.admission_cpu_overcommit = tk.DoubleVar(value=ADMISSION_CPU_OVERCOMMIT)
+        self.admission_host_reserve = tk.IntVar(value=ADMISSION_HOST_RESERVE_MB)
+        for text, variable, low, high, step in (
+            ("Memory Overcommit:", self.admission_memory_overcommit, 0.5, 4, 0.1),
+            ("CPU Overcommit:", self.admission_cpu_overcommit, 1, 16, 0.5),
+            ("Host Reserve (MB):", self.admission_host_reserve, 0, 65536, 256)
+        ):
+            ttk.Label(admission_frame, text=text).pack(side=tk.LEFT, padx=(0, 2))
+            ttk.Spinbox(
+                admission_frame, from_=low, to=high, increment=step, width=6, textvariable=variable,
+                command=self.apply_admission_policy
+            ).pack(side=tk.LEFT, padx=(0, 10))
+        self.admission_status = tk.StringVar()
+        ttk.Label(admission_frame, textvariable=self.admission_status).pack(side=tk.LEFT, padx=5)
+
+        self.running_vms_tree = ttk.Treeview(
+            main_frame,
+            columns=('name', 'pid', 'status', 'mode', 'ready', 'vcpus', 'read', 'write', 'iops', 'uptime'),
+            show='headings',
+            selectmode='extended'
+        )
+        columns = {
+            'name': ('Name', 180),
+            'pid': ('PID', 70),
+            'status': ('Status', 100),
+            'mode': ('Started From', 90),
+            'ready': ('Time to Ready', 90),
+            'vcpus': ('vCPU Threads', 150),
+            'read': ('Disk Read', 100),
+            'write': ('Disk Write', 100),
+            'iops': ('IOPS (r/w)', 100),
+            'uptime': ('Uptime', 80)
+        }
+        for col, (heading, width) in columns.items():
+            self.running_vms_tree.heading(col, text=heading)
+            self.running_vms_tree.column(col, width=width, anchor='w')
+        self.running_vms_tree.pack(fill=tk.BOTH, expand=True)
+
+        self.running_vms_status = tk.StringVar(value="No VMs running")
+        ttk.Label(main_frame, textvariable=self.running_vms_status).pack(anchor='w', pady=5)
+
+        # Saved states of one disk: internal snapshots plus external state files
+        states_frame = ttk.LabelFrame(main_frame, text="Saved States")
+        states_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        disk_frame = ttk.Frame(states_frame)
+        disk_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(disk_frame, text="Disk:").pack(side=tk.LEFT)
+        self.snapshot_disk_entry = ttk.Entry(disk_frame, width=50)
+        self.snapshot_disk_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        ttk.Button(disk_frame, text="Browse", command=self.browse_snapshot_disk).pack(side=tk.LEFT, padx=2)
+        ttk.Button(disk_frame, text="List", command=self.list_vm_snapshots).pack(side=tk.LEFT, padx=2)
+        ttk.Button(disk_frame, text="Start From Selected", command=self.start_from_snapshot).pack(side=tk.LEFT, padx=(15, 2))
+        ttk.Button(disk_frame, text="Delete Selected", command=self.delete_vm_snapshot).pack(side=tk.LEFT, padx=2)
+
+        self.snapshots_tree = ttk.Treeview(
+            states_frame,
+            columns=('kind', 'name', 'size', 'date', 'clock'),
+            show='headings',
+            height=5,
+            selectmode='browse'
         )
+        columns = {
+            'kind': ('Type', 80),
+            'name': ('Tag / File', 300),
+            'size': ('State Size', 100),
+            'date': ('Saved', 150),
+            'clock': ('Guest Uptime', 100)
+        }
+        for col, (heading, width) in columns.items():
+            self.snapshots_tree.heading(col, text=heading)
+            self.snapshots_tree.column(col, width=width, anchor='w')
+        self.snapshots_tree.pack(fill=tk.BOTH, expand=True, padx=5)
+
+        self.vm_ready_summary = tk.StringVar(value="Time to ready: no measurements yet (needs qemu-guest-agent in the guest)")
+        ttk.Label(states_frame, textvariable=self.vm_ready_summary).pack(anchor='w', padx=5, pady=5)
+        self.snapshot_disk = None
+        self.update_admission_status()
 
+    def apply_admission_policy(self):
         try:
-            process = subprocess.Popen(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+            self.admission.memory_overcommit = max(0.1, self.admission_memory_overcommit.get())
+            self.admission.cpu_overcommit = max(0.1, self.admission_cpu_overcommit.get())
+            self.admission.host_reserve_mb = max(0, self.admission_host_reserve.get())
+        except tk.TclError:
+            return
+        self.admit_queued_vms()
+
+    def update_admission_status(self):
+        self.admission_status.set(self.admission.summary())
+
+    def schedule_admission_recheck(self):
+        if self.admission_recheck is None and self.queued_launches:
+            self.admission_recheck = self.root.after(ADMISSION_RECHECK_MS, self.recheck_admission)
+
+    def recheck_admission(self):
+        self.admission_recheck = None
+        self.admit_queued_vms()
+        self.schedule_admission_recheck()
+
+    def admit_queued_vms(self):
+        admitted, rejected = self.admission.admit_queued()
+        for vm_id, reason in rejected:
+            name = self.queued_launches.pop(vm_id)[0]
+            self.running_vms_tree.delete(str(vm_id))
+            self.console.append(f"Queued VM {name} rejected: {reason}\n")
+        for vm_id in admitted:
+            name, config, mode, extra_args = self.queued_launches.pop(vm_id)
+            self.console.append(f"Queued VM {name} admitted\n")
+            self.start_vm(vm_id, name, config, mode, extra_args)
+        self.update_admission_status()
+
+    def cancel_queued_launch(self, vm_id):
+        name = self.queued_launches.pop(vm_id)[0]
+        self.admission.release(vm_id)
+        self.running_vms_tree.delete(str(vm_id))
+        self.console.append(f"Queued VM {name} cancelled\n")
+        self.admit_queued_vms()
+
+    def selected_running_vm(self):
+        selection = self.running_vms_tree.selection()
+        if len(selection) != 1 or int(selection[0]) not in self.running_vms:
+            messagebox.showerror("Error", "Select one running VM")
+            return None
+        return int(selection[0])
+
+    def save_vm_snapshot(self):
+        vm_id = self.selected_running_vm()
+        if vm_id is None:
+            return
+        tag = simpledialog.askstring("Save Snapshot", "Snapshot tag:", initialvalue=time.strftime('snap-%Y%m%d-%H%M%S'))
+        if not tag:
+            return
+        vm = self.running_vms[vm_id]
+        self.console.append(f"VM {vm['name']}: saving snapshot {tag}...\n")
+        future = self.task_engine.submit('qemu', f"Save snapshot {tag} of {vm['name']}", self.vm_monitor.savevm, vm_id, tag)
+        future.add_done_callback(lambda f: self.post_vm_save_result(
+            f, vm_id, lambda elapsed: ('internal', tag, elapsed), "savevm failed"
+        ))
+
+    def save_vm_state(self):
+        vm_id = self.selected_running_vm()
+        if vm_id is None:
+            return
+        if os.name == 'nt':
+            messagebox.showerror("Error", "Saving to a state file needs exec: migration, which QEMU does not support on Windows")
+            return
+        vm = self.running_vms[vm_id]
+        path = filedialog.asksaveasfilename(
+            initialdir=os.path.dirname(os.path.abspath(vm['config']['disk_path'])),
+            initialfile=f"{vm['name']}.state",
+            defaultextension=".state",
+            filetypes=[("VM State Files", "*.state"), ("All Files", "*.*")]
+        )
+        if not path:
+            return
+        self.console.append(f"VM {vm['name']}: saving state to {path}...\n")
+        future = self.task_engine.submit(
+            'qemu', f"Save state of {vm['name']}", self.vm_monitor.migrate_to_file, vm_id, path
+        )
+        future.add_done_callback(lambda f: self.post_vm_save_result(
+            f, vm_id, lambda result: ('external', path, result[0]), "Saving state failed"
+        ))
+
+    def post_vm_save_result(self, future, vm_id, saved, failure):
+        if future.cancelled():
+            self.ui_pump.post('vm_snapshots', ('error', vm_id, f"{failure}: cancelled"))
+        elif future.exception():
+            self.ui_pump.post('vm_snapshots', ('error', vm_id, f"{failure}: {future.exception()}"))
+        else:
+            self.ui_pump.post('vm_snapshots', ('saved', vm_id, saved(future.result())))
+
+    def browse_snapshot_disk(self):
+        filename = filedialog.askopenfilename(
+            filetypes=[("QEMU Disk Images", "*.qcow2 *.raw *.vdi *.vmdk"), ("All Files", "*.*")]
+        )
+        if filename:
+            self.snapshot_disk_entry.delete(0, tk.END)
+            self.snapshot_disk_entry.insert(0, filename)
+            self.list_vm_snapshots()
+
+    def list_vm_snapshots(self):
+        disk = self.snapshot_disk_entry.get()
+        if not disk or not os.path.exists(disk):
+            messagebox.showerror("Error", "Invalid disk path")
+            return
+        self.snapshot_disk = os.path.abspath(disk)
+        external = [entry for entry in self.vm_states.for_disk(disk) if entry['kind'] == 'external']
+
+        def worker():
+            rows = []
+            try:
+                for snapshot in qemu_img_info(disk).get('snapshots', []):
+                    rows.append(('internal', snapshot['name'], format_bytes(snapshot.get('vm-state-size', 0)),
+                                 time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot.get('date-sec', 0))),
+                                 format_duration(snapshot.get('vm-clock-sec', 0))))
+            except (OSError, ValueError, subprocess.CalledProcessError) as e:
+                self.ui_pump.post('vm_snapshots', ('error', None, f"Cannot list snapshots: {getattr(e, 'stderr', None) or e}"))
+            for entry in external:
+                if os.path.exists(entry['name']):
+                    rows.append(('external', entry['name'], format_bytes(os.path.getsize(entry['name'])),
+                                 time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['created'])), ''))
+            self.ui_pump.post('vm_snapshots', ('list', None, (self.snapshot_disk, rows)))
+
+        self.task_engine.submit(
+            'qemu-img', f"List snapshots of {Path(disk).name}", worker, timeout=TASK_QUERY_TIMEOUT
+        )
+
+    def disk_in_use(self, disk):
+        disk = os.path.abspath(disk)
+        return any(os.path.abspath(vm['config']['disk_path']) == disk for vm in self.running_vms.values())
+
+    def selected_snapshot(self):
+        selection = self.snapshots_tree.selection()
+        if not selection or not self.snapshot_disk:
+            messagebox.showerror("Error", "Select a saved state first")
+            return None, None
+        kind, name = self.snapshots_tree.item(selection[0], 'values')[:2]
+        return kind, name
+
+    def start_from_snapshot(self):
+        kind, name = self.selected_snapshot()
+        if kind is None:
+            return
+        disk = self.snapshot_disk
+        if self.disk_in_use(disk):
+            messagebox.showerror("Error", "The disk is in use by a running VM")
+            return
+        entry = self.vm_states.get(kind, disk, name)
+        if entry:
+            config = entry['config']
+        else:
+            # Snapshot taken outside this app: use the VM tab's settings
+            self.ensure_tab(self.vm_tab)
+            try:
+                config = {
+                    'cpu': int(self.vm_cpu.get()),
+                    'memory': int(self.vm_memory.get()),
+                    'disk_path': disk,
+                    'disk_format': 'qcow2',
+                    'iso_path': '',
+                    'settings': self.get_vm_settings()
+                }
+            except ValueError:
+                messagebox.showerror("Error", "Set CPU and memory in the VM tab to match the saved VM")
+                return
+
+        if kind == 'internal':
+            self.launch_vm(config, 'snapshot', ['-loadvm', name])
+            return
+
+        if not os.path.exists(name):
+            messagebox.showerror("Error", f"State file {name} no longer exists")
+            return
+        # RAM state only matches the disk it was saved with
+        disk_mtime = entry and entry.get('disk_mtime')
+        if disk_mtime and os.stat(disk).st_mtime != disk_mtime and not messagebox.askyesno(
+            "Confirm", "The disk changed after this state was saved; resuming may corrupt the guest. Continue?"
+        ):
+            return
+        self.launch_vm(config, 'state file', ['-incoming', f"exec:cat {shlex.quote(name)}"])
+
+    def delete_vm_snapshot(self):
+        kind, name = self.selected_snapshot()
+        if kind is None:
+            return
+        disk = self.snapshot_disk
+        if not messagebox.askyesno("Confirm", f"Delete {kind} state {name}?"):
+            return
+        if kind == 'external':
+            try:
+                os.remove(name)
+            except OSError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            self.vm_states.remove(kind, disk, name)
+            self.vm_states.save()
+            self.list_vm_snapshots()
+            return
+        if self.disk_in_use(disk):
+            messagebox.showerror("Error", "The disk is in use by a running VM")
+            return
+
+        def worker():
+            try:
+                subprocess.run(['qemu-img', 'snapshot', '-d', name, disk], check=True, capture_output=True, text=True)
+                self.vm_states.remove(kind, disk, name)
+                self.vm_states.save()
+            except (OSError, subprocess.CalledProcessError) as e:
+                self.ui_pump.post('vm_snapshots', ('error', None, f"Deleting snapshot failed: {getattr(e, 'stderr', None) or e}"))
+            self.ui_pump.post('vm_snapshots', ('deleted', None, name))
+
+        self.task_engine.submit('qemu-img', f"Delete snapshot {name}", worker)
+
+    def handle_vm_snapshot_message(self, item):
+        kind, vm_id, data = item
+        if kind == 'list':
+            disk, rows = data
+            if disk != self.snapshot_disk:
+                return
+            self.snapshots_tree.delete(*self.snapshots_tree.get_children())
+            for row in rows:
+                self.snapshots_tree.insert('', tk.END, values=row)
+        elif kind == 'saved':
+            state_kind, name, elapsed = data
+            vm = self.running_vms.get(vm_id)
+            if vm is None:
+                return
+            disk = vm['config']['disk_path']
+            self.vm_states.add(state_kind, disk, name, vm['config'])
+            self.vm_states.save()
+            if state_kind == 'external':
+                vm['saved_state'] = name
+            self.console.append(f"VM {vm['name']}: saved {state_kind} state {name} in {elapsed:.1f}s\n")
+            if self.snapshot_disk == os.path.abspath(disk):
+                self.list_vm_snapshots()
+        elif kind == 'deleted':
+            self.list_vm_snapshots()
+        else:
+            self.console.append(data + "\n")
+
+    def update_vm_ready_summary(self):
+        parts = []
+        for mode, times in self.vm_ready_times.items():
+            if times:
+                parts.append(f"{mode}: avg {sum(times) / len(times):.1f}s, best {min(times):.1f}s ({len(times)} runs)")
+        self.vm_ready_summary.set("Time to ready - " + "; ".join(parts))
+
+    def send_vm_command(self, command):
+        for iid in self.running_vms_tree.selection():
+            vm_id = int(iid)
+            if vm_id in self.queued_launches:
+                # Force Quit on a launch that has not started yet just drops it
+                if command == 'quit':
+                    self.cancel_queued_launch(vm_id)
+                continue
+            vm = self.running_vms.get(vm_id)
+            if vm is None:
+                continue
+            future = self.task_engine.submit(
+                'qemu', f"{command} {vm['name']}", self.vm_monitor.run_command, vm_id, command, None,
+                timeout=TASK_QUERY_TIMEOUT
             )
-            self.console.insert(tk.END, f"Starting VM: {cmd}\n")
-            
-            def read_output():
-                while True:
-                    output = process.stdout.readline()
-                    error = process.stderr.readline()
-                    if not output and not error and process.poll() is not None:
-                        break
-                    if output: self.console.insert(tk.END, f"OUT: {output}")
-                    if error: self.console.insert(tk.END, f"ERR: {error}")
-                    self.console.see(tk.END)
-
-            threading.Thread(target=read_output, daemon=True).start()
-        except Exception as e:
-            self.console.insert(tk.END, f"VM Error: {str(e)}\n")
+            future.add_done_callback(
+                lambda f, vm_id=vm_id: not f.cancelled() and f.exception() and self.ui_pump.post(
+                    'vms', ('error', vm_id, f"{command} failed: {f.exception()}")
+                )
+            )
+
+    def update_running_vm_row(self, vm_id):
+        vm = self.running_vms[vm_id]
+        metrics = vm['metrics']
+        read = write = iops = vcpus = ''
+        if metrics:
+            vcpus = ", ".join(str(thread) for _, thread in metrics['vcpus'])
+            rates = metrics['rates']
+            if rates:
+                read = f"{format_bytes(rates['rd_bytes'])}/s"
+                write = f"{format_bytes(rates['wr_bytes'])}/s"
+                iops = f"{rates['rd_operations']:.0f}/{rates['wr_operations']:.0f}"
+        ready = f"{vm['ready_at'] - vm['started']:.1f}s" if vm['ready_at'] else ''
+        self.running_vms_tree.item(str(vm_id), values=(
+            vm['name'], vm['process'].pid if vm['process'] else '', vm['status'], vm['mode'], ready, vcpus, read, write, iops,
+            format_duration(time.monotonic() - vm['started'])
+        ))
+
+    def handle_vm_message(self, item):
+        kind, vm_id, data = item
+        vm = self.running_vms.get(vm_id)
+        if vm is None:
+            return
+        if kind == 'spawned':
+            vm['process'] = data
+        elif kind == 'start failed':
+            if vm['process'] is not None:
+                # Cancelled after QEMU was already spawned: stop it, the exit cleans up
+                vm['process'].terminate()
+                return
+            self.console.append(f"VM {vm['name']} failed to start: {data}\n")
+            self.running_vms_tree.delete(str(vm_id))
+            del self.running_vms[vm_id]
+            self.admission.release(vm_id)
+            self.admit_queued_vms()
+            self.update_running_vms_status()
+            return
+        elif kind == 'connected':
+            vm['status'] = 'connected'
+            version = '.'.join(str(data.get(part, '?')) for part in ('major', 'minor', 'micro'))
+            self.console.append(f"VM {vm['name']}: QMP connected (QEMU {version})\n")
+        elif kind == 'metrics':
+            vm['metrics'] = data
+            vm['status'] = data['status']
+        elif kind == 'stale':
+            # Keeps the last metrics; the next answered poll clears it
+            vm['status'] = 'not responding'
+        elif kind == 'event':
+            # STOP/RESUME/POWERDOWN etc. arrive before the next poll
+            self.console.append(f"VM {vm['name']}: {data['event']}\n")
+            if data['event'] == 'STOP':
+                vm['status'] = 'paused'
+            elif data['event'] == 'RESUME':
+                vm['status'] = 'running'
+            elif data['event'] == 'POWERDOWN':
+                vm['status'] = 'powering down'
+        elif kind == 'ready':
+            vm['ready_at'] = data
+            elapsed = data - vm['started']
+            self.vm_ready_times[vm['mode']].append(elapsed)
+            self.console.append(f"VM {vm['name']}: guest agent ready {elapsed:.1f}s after start ({vm['mode']})\n")
+            self.update_vm_ready_summary()
+        elif kind == 'error':
+            self.console.append(f"VM {vm['name']}: {data}\n")
+        elif kind == 'exit':
+            self.vm_monitor.remove(vm_id)
+            for address in (vm['qmp_address'], vm['agent_address']):
+                if isinstance(address, str):
+                    try:
+                        os.remove(address)
+                    except OSError:
+                        pass
+            if vm['saved_state']:
+                # Remember the disk as QEMU left it so a later resume can detect changes
+                entry = self.vm_states.get('external', vm['config']['disk_path'], vm['saved_state'])
+                if entry:
+                    try:
+                        entry['disk_mtime'] = os.stat(vm['config']['disk_path']).st_mtime
+                    except OSError:
+                        pass
+                    self.vm_states.save()
+            self.running_vms_tree.delete(str(vm_id))
+            del self.running_vms[vm_id]
+            self.admission.release(vm_id)
+            self.admit_queued_vms()
+            self.update_running_vms_status()
+            return
+        self.update_running_vm_row(vm_id)
+        self.update_running_vms_status()
+
+    def update_running_vms_status(self):
+        if not self.running_vms:
+            self.running_vms_status.set("No VMs running")
+            return
+        states = {}
+        for vm in self.running_vms.values():
+            states[vm['status']] = states.get(vm['status'], 0) + 1
+        self.running_vms_status.set(
+            f"{len(self.running_vms)} VM(s): " + ", ".join(f"{count} {state}" for state, count in sorted(states.items()))
+        )
+
+    def handle_process_output(self, batch):
+        self.console.append("".join(
+            f"[{timestamp}] {label} {stream}: {line}\n" for timestamp, label, stream, line in batch
+        ))
+
+    # ----- Golden Image Library Methods -----
+    def create_golden_ui(self):
+        main_frame = ttk.Frame(self.golden_tab)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        control_frame = ttk.Frame(main_frame)
+        control_frame.pack(fill=tk.X, pady=5)
+        buttons = [
+            ("Add Golden Image", self.add_golden_image),
+            ("Create Linked Clone", self.create_linked_clone),
+            ("Flatten", self.flatten_linked_clone),
+            ("Commit to Base", self.commit_linked_clone),
+            ("Remove", self.remove_golden_entry),
+            ("Use in VM Tab", self.use_golden_entry),
+            ("Refresh", self.refresh_golden_library)
+        ]
+        for text, command in buttons:
+            ttk.Button(control_frame, text=text, command=command).pack(side=tk.LEFT, padx=2)
+
+        self.golden_tree = ttk.Treeview(main_frame, columns=('format', 'virtual', 'actual'), selectmode='browse')
+        self.golden_tree.heading('#0', text='Image')
+        self.golden_tree.column('#0', width=400)
+        for col, heading in (('format', 'Format'), ('virtual', 'Virtual Size'), ('actual', 'Disk Usage')):
+            self.golden_tree.heading(col, text=heading)
+            self.golden_tree.column(col, width=100, anchor='w')
+        self.golden_tree.pack(fill=tk.BOTH, expand=True)
+        self.golden_tree.bind('<<TreeviewSelect>>', lambda e: self.show_backing_chain())
+
+        ttk.Label(main_frame, text="Backing Chain:").pack(anchor='w', pady=(5, 0))
+        self.golden_chain = LogView(main_frame, height=6)
+        self.golden_chain.pack(fill=tk.X)
+
+        self.golden_status = tk.StringVar()
+        ttk.Label(main_frame, textvariable=self.golden_status).pack(anchor='w', pady=5)
+
+        self.refresh_golden_library()
+
+    def selected_golden_path(self):
+        selection = self.golden_tree.selection()
+        return selection[0] if selection else None
+
+    def run_golden_job(self, description, job):
+        # Run a qemu-img step off the UI thread and refresh the tree afterwards
+        def worker():
+            start = time.monotonic()
+            try:
+                message = job()
+                self.ui_pump.post('golden', ('success', f"{message} ({(time.monotonic() - start) * 1000:.0f} ms)"))
+            except subprocess.CalledProcessError as e:
+                self.ui_pump.post('golden', ('error', f"{description} failed: {e.stderr.strip()}"))
+            except (OSError, ValueError) as e:
+                self.ui_pump.post('golden', ('error', f"{description} failed: {e}"))
+            self.load_golden_tree()
+
+        self.golden_status.set(f"{description}...")
+        self.task_engine.submit('qemu-img', description, worker)
+
+    def add_golden_image(self):
+        path = filedialog.askopenfilename(
+            filetypes=[("QEMU Disk Images", "*.qcow2 *.raw *.vdi *.vmdk"), ("All Files", "*.*")]
+        )
+        if not path:
+            return
+
+        def job():
+            info = qemu_img_info(path)
+            if info.get('backing-filename'):
+                raise ValueError("image has a backing file; flatten it before using it as a base")
+            # Bases must never change under their clones
+            os.chmod(path, 0o444)
+            self.golden_library.add(path, info['format'])
+            self.golden_library.save()
+            return f"Added golden image {path} (now read-only)"
+
+        self.run_golden_job("Add golden image", job)
+
+    def create_linked_clone(self):
+        base = self.selected_golden_path()
+        if base not in self.golden_library.bases:
+            messagebox.showerror("Error", "Select a golden image first")
+            return
+        stem = Path(base).stem
+        clone = filedialog.asksaveasfilename(
+            initialdir=os.path.dirname(base),
+            initialfile=f"{stem}-clone-{len(self.golden_library.children(base)) + 1}.qcow2",
+            defaultextension=".qcow2",
+            filetypes=[("QCOW2 Images", "*.qcow2")]
+        )
+        if not clone:
+            return
+        base_format = self.golden_library.bases[base]['format']
+
+        def job():
+            subprocess.run(build_overlay_command(base, base_format, clone), check=True, capture_output=True, text=True)
+            self.golden_library.add_clone(base, clone)
+            self.golden_library.save()
+            return f"Created linked clone {clone}"
+
+        self.run_golden_job("Create linked clone", job)
+
+    def flatten_linked_clone(self):
+        clone = self.selected_golden_path()
+        if not clone or not self.golden_library.base_of(clone):
+            messagebox.showerror("Error", "Select a linked clone first")
+            return
+        if not messagebox.askyesno("Confirm", f"Copy all base data into {Path(clone).name} and detach it from its base?"):
+            return
+
+        def job():
+            # Safe-mode rebase onto nothing copies every backing cluster into the overlay
+            subprocess.run(['qemu-img', 'rebase', '-f', 'qcow2', '-b', '', clone], check=True, capture_output=True, text=True)
+            self.golden_library.remove_clone(clone)
+            self.golden_library.save()
+            return f"Flattened {clone}; it no longer depends on a base image"
+
+        self.run_golden_job("Flatten", job)
+
+    def commit_linked_clone(self):
+        clone = self.selected_golden_path()
+        base = clone and self.golden_library.base_of(clone)
+        if not base:
+            messagebox.showerror("Error", "Select a linked clone first")
+            return
+        siblings = [c for c in self.golden_library.children(base) if c != os.path.abspath(clone)]
+        if siblings:
+            messagebox.showerror(
+                "Error",
+                f"{Path(base).name} still has {len(siblings)} other linked clone(s). "
+                "Committing would change the data they see; flatten or delete them first."
+            )
+            return
+        if not messagebox.askyesno("Confirm", f"Write the changes in {Path(clone).name} into {Path(base).name}?"):
+            return
+
+        def job():
+            os.chmod(base, 0o644)
+            try:
+                subprocess.run(['qemu-img', 'commit', clone], check=True, capture_output=True, text=True)
+            finally:
+                os.chmod(base, 0o444)
+            return f"Committed {clone} into {base}"
+
+        self.run_golden_job("Commit", job)
+
+    def remove_golden_entry(self):
+        path = self.selected_golden_path()
+        if not path:
+            return
+        if path in self.golden_library.bases:
+            children = self.golden_library.children(path)
+            if children:
+                messagebox.showerror("Error", f"{Path(path).name} still has {len(children)} linked clone(s)")
+                return
+            if not messagebox.askyesno("Confirm", f"Remove {Path(path).name} from the library? The file is kept."):
+                return
+            self.golden_library.remove(path)
+            try:
+                os.chmod(path, 0o644)
+            except OSError:
+                pass
+        else:
+            if not messagebox.askyesno("Confirm", f"Delete linked clone {path}?"):
+                return
+            try:
+                os.remove(path)
+            except OSError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            self.golden_library.remove_clone(path)
+        self.golden_library.save()
+        self.refresh_golden_library()
+
+    def use_golden_entry(self):
+        path = self.selected_golden_path()
+        if not path:
+            return
+        if path in self.golden_library.bases:
+            messagebox.showerror("Error", "Golden images are read-only; create a linked clone and boot that")
+            return
+        self.ensure_tab(self.vm_tab)
+        self.vm_disk_path.delete(0, tk.END)
+        self.vm_disk_path.insert(0, path)
+        self.vm_disk_format.set('qcow2')
+        self.update_vm_command_preview()
+        self.notebook.select(self.vm_tab)
+
+    def refresh_golden_library(self):
+        self.golden_status.set("Reading image info...")
+        self.task_engine.submit('qemu-img', "Read golden image info", self.load_golden_tree, timeout=TASK_QUERY_TIMEOUT)
+
+    def load_golden_tree(self):
+        def describe(path):
+            try:
+                info = qemu_img_info(path)
+                return (info['format'], format_bytes(info['virtual-size']), format_bytes(info.get('actual-size', 0)))
+            except (OSError, ValueError, KeyError, subprocess.CalledProcessError):
+                return ('missing' if not os.path.exists(path) else '?', '', '')
+
+        rows = []
+        for base in list(self.golden_library.bases):
+            rows.append((base, describe(base), [(clone, describe(clone)) for clone in self.golden_library.children(base)]))
+        self.ui_pump.post('golden', ('tree', rows))
+
+    def show_backing_chain(self):
+        path = self.selected_golden_path()
+        if not path:
+            return
+
+        def worker():
+            try:
+                chain = qemu_img_info(path, backing_chain=True)
+                lines = [
+                    f"{'  ' * depth}{'└─ ' if depth else ''}{layer['filename']} "
+                    f"({layer['format']}, {format_bytes(layer.get('actual-size', 0))} used)"
+                    for depth, layer in enumerate(chain)
+                ]
+                self.ui_pump.post('golden', ('chain', "\n".join(lines)))
+            except (OSError, ValueError, subprocess.CalledProcessError) as e:
+                self.ui_pump.post('golden', ('chain', f"Cannot read backing chain: {getattr(e, 'stderr', None) or e}"))
+
+        self.task_engine.submit(
+            'qemu-img', f"Backing chain of {Path(path).name}", worker, timeout=TASK_QUERY_TIMEOUT
+        )
+
+    def handle_golden_message(self, item):
+        status, value = item
+        if status == 'tree':
+            selected = self.selected_golden_path()
+            self.golden_tree.delete(*self.golden_tree.get_children())
+            for base, values, clones in value:
+                self.golden_tree.insert('', tk.END, iid=base, text=base, values=values, open=True)
+                for clone, clone_values in clones:
+                    self.golden_tree.insert(base, tk.END, iid=clone, text=clone, values=clone_values)
+            if selected and self.golden_tree.exists(selected):
+                self.golden_tree.selection_set(selected)
+            if self.golden_status.get().endswith("..."):
+                self.golden_status.set(f"{len(value)} golden image(s), {sum(len(c) for _, _, c in value)} linked clone(s)")
+        elif status == 'chain':
+            self.golden_chain.set_text(value + "\n")
+        else:
+            self.golden_status.set(value)
+            self.console.append(value + "\n")
 
     # ----- Original Docker Management Methods -----
     def create_docker_ui(self):
@@ -501,31 +3579,75 @@ CMD ["python", "app.py"]"""
         self.image_entry = ttk.Entry(self.docker_build_tab, width=50)
         self.image_entry.grid(row=1, column=1, columnspan=2, padx=5, pady=5, sticky='ew')
 
+        # Optional build settings
+        ttk.Label(self.docker_build_tab, text="Target Stage:").grid(row=2, column=0, padx=5, pady=5, sticky='w')
+        self.build_target_entry = ttk.Entry(self.docker_build_tab, width=50)
+        self.build_target_entry.grid(row=2, column=1, columnspan=2, padx=5, pady=5, sticky='ew')
+
+        ttk.Label(self.docker_build_tab, text="Cache From:").grid(row=3, column=0, padx=5, pady=5, sticky='w')
+        self.build_cache_from_entry = ttk.Entry(self.docker_build_tab, width=50)
+        self.build_cache_from_entry.grid(row=3, column=1, columnspan=2, padx=5, pady=5, sticky='ew')
+
+        ttk.Label(self.docker_build_tab, text="Build Args:").grid(row=4, column=0, padx=5, pady=5, sticky='w')
+        self.build_args_entry = ttk.Entry(self.docker_build_tab, width=50)
+        self.build_args_entry.grid(row=4, column=1, columnspan=2, padx=5, pady=5, sticky='ew')
+
+        build_controls = ttk.Frame(self.docker_build_tab)
+        build_controls.grid(row=5, column=0, columnspan=3, pady=10)
+
         self.docker_build_button = ttk.Button(
-            self.docker_build_tab,
-            text="Build Image",
+            build_controls,
+            text="Queue Build",
             command=self.start_docker_build_thread
         )
-        self.docker_build_button.grid(row=2, column=1, pady=10)
+        self.docker_build_button.pack(side=tk.LEFT, padx=5)
 
-        self.docker_output_text = tk.Text(
-            self.docker_build_tab,
-            wrap=tk.NONE,
-            font=('Courier New', 10),
-            state=tk.DISABLED
-        )
-        self.docker_output_text.grid(row=3, column=0, columnspan=3, sticky='nsew', padx=5, pady=5)
+        ttk.Label(build_controls, text="Parallel Builds:").pack(side=tk.LEFT, padx=(15, 2))
+        self.build_parallelism = tk.IntVar(value=2)
+        ttk.Spinbox(
+            build_controls, from_=1, to=TASK_CATEGORY_LIMITS['build'], width=4, textvariable=self.build_parallelism,
+            command=self.start_queued_builds
+        ).pack(side=tk.LEFT)
 
-        scroll_y = ttk.Scrollbar(self.docker_build_tab, orient=tk.VERTICAL, command=self.docker_output_text.yview)
-        scroll_y.grid(row=3, column=3, sticky='ns')
+        ttk.Button(build_controls, text="Clear Finished", command=self.clear_finished_builds).pack(side=tk.LEFT, padx=15)
 
-        scroll_x = ttk.Scrollbar(self.docker_build_tab, orient=tk.HORIZONTAL, command=self.docker_output_text.xview)
-        scroll_x.grid(row=4, column=0, columnspan=3, sticky='ew')
+        # Build queue
+        self.build_jobs_tree = ttk.Treeview(
+            self.docker_build_tab,
+            columns=('job', 'image', 'state', 'duration'),
+            show='headings',
+            height=5,
+            selectmode='browse'
+        )
+        columns = {
+            'job': ('Job', 50),
+            'image': ('Image', 250),
+            'state': ('State', 100),
+            'duration': ('Duration', 100)
+        }
+        for col, (heading, width) in columns.items():
+            self.build_jobs_tree.heading(col, text=heading)
+            self.build_jobs_tree.column(col, width=width, anchor='w')
+        self.build_jobs_tree.grid(row=6, column=0, columnspan=3, sticky='nsew', padx=5, pady=5)
+        self.build_jobs_tree.bind('<<TreeviewSelect>>', self.on_build_job_select)
+
+        # One log pane per build job
+        self.build_logs_notebook = ttk.Notebook(self.docker_build_tab)
+        self.build_logs_notebook.grid(row=7, column=0, columnspan=3, sticky='nsew', padx=5, pady=5)
+
+        self.build_status_var = tk.StringVar()
+        ttk.Label(self.docker_build_tab, textvariable=self.build_status_var, relief=tk.SUNKEN).grid(
+            row=8, column=0, columnspan=3, sticky='ew'
+        )
 
-        self.docker_output_text.config(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
-        self.docker_build_tab.grid_rowconfigure(3, weight=1)
+        self.docker_build_tab.grid_rowconfigure(7, weight=1)
         self.docker_build_tab.grid_columnconfigure(1, weight=1)
 
+        self.build_jobs = {}
+        self.build_queue = deque()
+        self.build_running = 0
+        self.build_job_counter = 0
+
     def browse_dockerfile(self):
         file_path = filedialog.askopenfilename(
             title="Select Dockerfile",
@@ -543,69 +3665,177 @@ CMD ["python", "app.py"]"""
             messagebox.showerror("Error", "Invalid Dockerfile path or image name")
             return
 
-        self.docker_output_text.config(state=tk.NORMAL)
-        self.docker_output_text.delete(1.0, tk.END)
-        self.docker_output_text.insert(tk.END, "Starting build...\n")
-        self.docker_output_text.config(state=tk.DISABLED)
-        self.docker_build_button.config(state=tk.DISABLED)
-
-        self.build_thread = threading.Thread(
-            target=self.build_docker_image,
-            args=(dockerfile_path, image_name),
-            daemon=True
-        )
-        self.build_thread.start()
-
-    def build_docker_image(self, dockerfile_path, image_name):
         try:
-            build_context = str(Path(dockerfile_path).parent)
-            command = [
-                'docker', 'build',
-                '-f', dockerfile_path,
-                '-t', image_name,
-                build_context
-            ]
+            options = self.get_build_options()
+        except ValueError:
+            messagebox.showerror("Error", "Build args must be KEY=VALUE pairs separated by spaces")
+            return
 
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
+        self.build_job_counter += 1
+        job_id = self.build_job_counter
+        job = {
+            'id': job_id,
+            'dockerfile': dockerfile_path,
+            'image': image_name,
+            'options': options,
+            'state': 'queued',
+            'started': None,
+            'finished': None,
+            'log': self.create_build_log_pane(job_id, image_name)
+        }
+        self.build_jobs[job_id] = job
+        self.build_queue.append(job_id)
+        self.build_jobs_tree.insert('', tk.END, iid=str(job_id), values=(job_id, image_name, 'queued', ''))
+        self.start_queued_builds()
+
+    def create_build_log_pane(self, job_id, image_name):
+        view = LogView(self.build_logs_notebook, name=f"build-{job_id}")
+        self.build_logs_notebook.add(view, text=f"#{job_id} {image_name}")
+        return view
+
+    def start_queued_builds(self):
+        # More than the engine's 'build' slots would only count waiting builds as running
+        try:
+            limit = min(TASK_CATEGORY_LIMITS['build'], max(1, self.build_parallelism.get()))
+        except tk.TclError:
+            limit = 1
+        while self.build_queue and self.build_running < limit:
+            job = self.build_jobs[self.build_queue.popleft()]
+            job['state'] = 'running'
+            job['started'] = time.monotonic()
+            self.build_running += 1
+            self.update_build_job_row(job)
+            self.append_build_log(job['id'], "Starting build...\n")
+            future = self.task_engine.submit(
+                'build', f"Build {job['image']} (#{job['id']})", self.build_docker_image,
+                job['id'], job['dockerfile'], job['image'], job['options']
             )
+            # Also runs when the task is cancelled before it starts, so the slot is always freed
+            future.add_done_callback(lambda f, job_id=job['id']: self.post_build_result(f, job_id))
+
+    def post_build_result(self, future, job_id):
+        if future.cancelled():
+            self.ui_pump.post('build', (job_id, "\nBuild cancelled\n"))
+            succeeded = False
+        elif future.exception():
+            self.ui_pump.post('build', (job_id, f"\nError: {future.exception()}\n"))
+            succeeded = False
+        else:
+            succeeded = future.result()
+        self.ui_pump.post('build_done', (job_id, succeeded))
+
+    def update_build_job_row(self, job):
+        duration = ''
+        if job['started'] is not None:
+            duration = f"{(job['finished'] or time.monotonic()) - job['started']:.1f}s"
+        self.build_jobs_tree.item(str(job['id']), values=(job['id'], job['image'], job['state'], duration))
+
+    def on_build_job_select(self, event):
+        selected = self.build_jobs_tree.selection()
+        if selected and int(selected[0]) in self.build_jobs:
+            self.build_logs_notebook.select(self.build_jobs[int(selected[0])]['log'])
+
+    def clear_finished_builds(self):
+        for job_id, job in list(self.build_jobs.items()):
+            if job['state'] in ('succeeded', 'failed'):
+                self.build_logs_notebook.forget(job['log'])
+                job['log'].destroy()
+                self.build_jobs_tree.delete(str(job_id))
+                del self.build_jobs[job_id]
+        self.update_build_summary()
+
+    def update_build_summary(self):
+        finished = [job for job in self.build_jobs.values() if job['finished'] is not None]
+        if not finished:
+            self.build_status_var.set("")
+            return
+        # Sum of job durations vs. wall-clock span shows the parallel speedup
+        busy = sum(job['finished'] - job['started'] for job in finished)
+        wall = max(job['finished'] for job in finished) - min(job['started'] for job in finished)
+        summary = f"{len(finished)} finished: {busy:.1f}s of build time in {wall:.1f}s wall clock"
+        if wall > 0:
+            summary += f" (speedup {busy / wall:.2f}x)"
+        self.build_status_var.set(summary)
+
+    def get_build_options(self):
+        build_args = {}
+        for pair in self.build_args_entry.get().split():
+            key, value = pair.split('=', 1)
+            build_args[key] = value
+        return {
+            'target': self.build_target_entry.get().strip() or None,
+            'cache_from': [c.strip() for c in self.build_cache_from_entry.get().split(',') if c.strip()] or None,
+            'buildargs': build_args or None
+        }
 
-            for line in iter(process.stdout.readline, ''):
-                self.docker_output_queue.put(line)
-
-            process.stdout.close()
-            return_code = process.wait()
+    def build_docker_image(self, job_id, dockerfile_path, image_name, options):
+        # Returns whether the build succeeded; post_build_result reports it
+        if not self.docker_manager.connected:
+            self.ui_pump.post('build', (job_id, "\nError: Docker not connected.\n"))
+            return False
+        try:
+            context_dir = str(Path(dockerfile_path).parent)
+            dockerfile = Path(dockerfile_path).name
+            stats = {'bytes': 0, 'files': 0, 'seconds': 0}
+            started = time.monotonic()
+
+            output = self.docker_manager.api.build(
+                fileobj=stream_build_context(context_dir, dockerfile, stats),
+                custom_context=True,
+                dockerfile=dockerfile,
+                tag=image_name,
+                rm=True,
+                decode=True,
+                **options
+            )
 
-            if return_code == 0:
-                self.docker_output_queue.put("\nBuild successful!\n")
+            error = None
+            for chunk in output:
+                if self.task_engine.cancelled():
+                    # post_build_result has already reported the cancel
+                    error = "cancelled"
+                    break
+                if 'stream' in chunk:
+                    self.ui_pump.post('build', (job_id, chunk['stream']))
+                elif 'status' in chunk:
+                    self.ui_pump.post('build', (job_id, f"{chunk['status']} {chunk.get('progress', '')}\n"))
+                elif 'error' in chunk:
+                    error = chunk['error']
+                    self.ui_pump.post('build', (job_id, f"{chunk['error']}\n"))
+            failed = error is not None
+
+            self.ui_pump.post('build', (job_id,
+                f"\nContext: {format_bytes(stats['bytes'])} in {stats['files']} files, "
+                f"sent in {stats['seconds']:.2f}s; total {time.monotonic() - started:.1f}s\n"
+            ))
+            if failed:
+                self.ui_pump.post('build', (job_id, "Build failed\n"))
             else:
-                self.docker_output_queue.put(f"\nBuild failed (code {return_code})\n")
+                self.ui_pump.post('build', (job_id, "Build successful!\n"))
+            return not failed
 
         except Exception as e:
-            self.docker_output_queue.put(f"\nError: {str(e)}\n")
-        finally:
-            self.docker_output_queue.put(None)
-            self.root.event_generate("<<DockerBuildComplete>>")
+            self.ui_pump.post('build', (job_id, f"\nError: {str(e)}\n"))
+            return False
 
-    def update_docker_output(self):
-        try:
-            while True:
-                line = self.docker_output_queue.get_nowait()
-                if line is None: break
-                self.docker_output_text.config(state=tk.NORMAL)
-                self.docker_output_text.insert(tk.END, line)
-                self.docker_output_text.see(tk.END)
-                self.docker_output_text.config(state=tk.DISABLED)
-        except queue.Empty:
-            pass
-        self.root.after(100, self.update_docker_output)
+    def handle_docker_output(self, item):
+        self.append_build_log(*item)
 
-    def on_docker_build_complete(self, event):
-        self.docker_build_button.config(state=tk.NORMAL)
+    def append_build_log(self, job_id, line):
+        if job_id not in self.build_jobs:
+            return
+        self.build_jobs[job_id]['log'].append(line)
+
+    def on_docker_build_complete(self, item):
+        job_id, succeeded = item
+        self.build_running -= 1
+        if job_id in self.build_jobs:
+            job = self.build_jobs[job_id]
+            job['state'] = 'succeeded' if succeeded else 'failed'
+            job['finished'] = time.monotonic()
+            self.update_build_job_row(job)
+            self.update_build_summary()
+        self.start_queued_builds()
 
     def create_docker_images_ui(self):
         search_frame = ttk.Frame(self.docker_images_tab)
@@ -613,18 +3843,20 @@ CMD ["python", "app.py"]"""
 
         self.docker_search_entry = ttk.Entry(search_frame, width=40)
         self.docker_search_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        self.docker_search_entry.bind("<Return>", lambda e: self.list_docker_images())
+        self.docker_search_entry.bind("<KeyRelease>", lambda e: self.list_docker_images())
 
-        ttk.Button(search_frame, text="Search Images", command=self.list_docker_images).pack(side=tk.LEFT, padx=5)
+        self.docker_search_regex = tk.BooleanVar()
+        ttk.Checkbutton(search_frame, text="Regex", variable=self.docker_search_regex,
+                        command=self.list_docker_images).pack(side=tk.LEFT, padx=5)
         ttk.Button(search_frame, text="List All Images", command=self.show_all_docker_images).pack(side=tk.LEFT)
+        ttk.Button(search_frame, text="Reload", command=self.start_image_index_refresh).pack(side=tk.LEFT, padx=5)
 
         tree_frame = ttk.Frame(self.docker_images_tab)
         tree_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.docker_tree = ttk.Treeview(
+        self.docker_tree = VirtualTable(
             tree_frame,
-            columns=('repository', 'tag', 'image_id', 'created', 'size'),
-            show='headings'
+            columns=('repository', 'tag', 'image_id', 'created', 'size')
         )
 
         columns = {
@@ -636,51 +3868,73 @@ CMD ["python", "app.py"]"""
         }
 
         for col, (text, width) in columns.items():
-            self.docker_tree.heading(col, text=text)
+            self.docker_tree.heading(col, text=text, command=lambda c=col: self.sort_docker_images(c))
             self.docker_tree.column(col, width=width)
 
-        scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.docker_tree.yview)
-        scroll_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.docker_tree.xview)
-        self.docker_tree.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        self.docker_tree.pack(fill=tk.BOTH, expand=True)
 
-        self.docker_tree.grid(row=0, column=0, sticky='nsew')
-        scroll_y.grid(row=0, column=1, sticky='ns')
-        scroll_x.grid(row=1, column=0, sticky='ew')
-
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
+        self.docker_images_status_var = tk.StringVar()
+        ttk.Label(self.docker_images_tab, textvariable=self.docker_images_status_var, relief=tk.SUNKEN).pack(
+            side=tk.BOTTOM, fill=tk.X
+        )
+        self.docker_images_sort = ('created', True)
+        self.list_docker_images()
 
     def list_docker_images(self):
-        search_term = self.docker_search_entry.get().strip()
-        try:
-            cmd = ['docker', 'images', '--format', 'table {{.Repository}}\t{{.Tag}}\t{{.ID}}\t{{.CreatedSince}}\t{{.Size}}']
-            if search_term:
-                cmd.extend(['--filter', f'reference=*{search_term}*'])
-
-            result = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True)
-            self.update_docker_treeview(result)
-        except subprocess.CalledProcessError as e:
-            messagebox.showerror("Error", f"Failed to list images:\n{e.output or str(e)}")
-        except FileNotFoundError:
-            messagebox.showerror("Error", "Docker not found")
-        except Exception as e:
-            messagebox.showerror("Error", f"Unexpected error:\n{str(e)}")
+        # Filters the local index; no daemon call or process per keystroke
+        sort_key, descending = self.docker_images_sort
+        rows = self.image_index.query(
+            self.docker_search_entry.get().strip(),
+            regex=self.docker_search_regex.get(),
+            sort_key=sort_key,
+            descending=descending
+        )
+        self.update_docker_treeview(rows)
+        # Rows are tags; several tags can point at one image
+        shown = len({row['key'].split('|')[0] for row in rows})
+        self.docker_images_status_var.set(
+            f"{len(rows)} of {self.image_index.row_count()} tags, {shown} of {len(self.image_index.images)} images"
+        )
 
     def show_all_docker_images(self):
         self.docker_search_entry.delete(0, tk.END)
         self.list_docker_images()
 
-    def update_docker_treeview(self, content):
-        self.docker_tree.delete(*self.docker_tree.get_children())
-        for line in content.strip().split('\n')[1:]:
-            if parts := line.split(maxsplit=4):
-                self.docker_tree.insert('', tk.END, values=(
-                    parts[0], 
-                    parts[1] if len(parts) > 1 else '',
-                    parts[2] if len(parts) > 2 else '',
-                    parts[3] if len(parts) > 3 else '',
-                    parts[4] if len(parts) > 4 else ''
-                ))
+    def sort_docker_images(self, column):
+        key, descending = self.docker_images_sort
+        self.docker_images_sort = (column, not descending if key == column else column in ('created', 'size'))
+        self.list_docker_images()
+
+    def update_docker_treeview(self, rows):
+        self.docker_tree.set_rows([(row['key'], (
+            row['repository'],
+            row['tag'],
+            row['image_id'],
+            time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created'])),
+            format_bytes(row['size'])
+        )) for row in rows])
+
+    def start_image_index_refresh(self):
+        self.docker_images_status_var.set("Reloading images...")
+        self.task_engine.submit('docker', "Reload image list", self.refresh_image_index, timeout=TASK_QUERY_TIMEOUT)
+
+    def refresh_image_index(self):
+        if not self.docker_manager.connected:
+            self.ui_pump.post('images', "Docker connection not available")
+            return
+        try:
+            self.image_index.refresh(self.docker_manager.api)
+            self.ui_pump.post('images', None)
+        except Exception as e:
+            self.ui_pump.post('images', f"Error loading images: {e}")
+
+    def handle_images_changed(self, error):
+        if not self.tab_built(self.docker_images_tab):
+            return
+        if error:
+            self.docker_images_status_var.set(error)
+        else:
+            self.list_docker_images()
 
     # ----- Docker Containers Management Methods (Fixed) -----
     def create_docker_containers_ui(self):
@@ -697,22 +3951,36 @@ CMD ["python", "app.py"]"""
         )
         self.container_refresh_button.pack(side=tk.LEFT, padx=5)
 
-        self.container_stop_button = ttk.Button(
-            control_frame,
-            text="Stop Container",
-            command=self.start_container_stop_thread,
-            state=tk.DISABLED
-        )
-        self.container_stop_button.pack(side=tk.LEFT)
+        # Bulk actions on the selected rows
+        self.container_action_buttons = []
+        for action in ('stop', 'restart', 'kill', 'remove'):
+            button = ttk.Button(
+                control_frame,
+                text=action.capitalize(),
+                command=lambda a=action: self.start_container_bulk_action(a),
+                state=tk.DISABLED
+            )
+            button.pack(side=tk.LEFT, padx=2)
+            self.container_action_buttons.append(button)
+
+        ttk.Label(control_frame, text="Workers:").pack(side=tk.LEFT, padx=(15, 2))
+        self.container_pool_size = tk.IntVar(value=8)
+        ttk.Spinbox(
+            control_frame, from_=1, to=TASK_CATEGORY_LIMITS['container-action'], width=4,
+            textvariable=self.container_pool_size
+        ).pack(side=tk.LEFT)
+
+        ttk.Label(control_frame, text="Timeout (s):").pack(side=tk.LEFT, padx=(10, 2))
+        self.container_action_timeout = tk.IntVar(value=10)
+        ttk.Spinbox(control_frame, from_=0, to=300, width=4, textvariable=self.container_action_timeout).pack(side=tk.LEFT)
 
         tree_frame = ttk.Frame(main_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.container_tree = ttk.Treeview(
+        self.container_tree = VirtualTable(
             tree_frame,
-            columns=('id', 'name', 'status', 'image', 'ports', 'created'),
-            show='headings',
-            selectmode='browse'
+            columns=('id', 'name', 'status', 'image', 'ports', 'created', 'cpu', 'memory', 'net', 'block', 'trend'),
+            selectmode='extended'
         )
 
         columns = {
@@ -721,23 +3989,59 @@ CMD ["python", "app.py"]"""
             'status': ('Status', 100),
             'image': ('Image', 200),
             'ports': ('Ports', 150),
-            'created': ('Created', 150)
+            'created': ('Created', 150),
+            'cpu': ('CPU %', 70),
+            'memory': ('Memory', 140),
+            'net': ('Net rx/tx', 140),
+            'block': ('Block r/w', 140),
+            'trend': ('CPU Trend', 160)
         }
 
+        # Live usage columns sort on the raw numbers rather than the formatted text
+        stats_sort_keys = {
+            'cpu': lambda iid: self.container_stats.get(iid, {}).get('cpu', -1),
+            'memory': lambda iid: self.container_stats.get(iid, {}).get('memory', -1),
+            'net': lambda iid: sum(self.container_stats.get(iid, {}).get(k, 0) for k in ('rx', 'tx')),
+            'block': lambda iid: sum(self.container_stats.get(iid, {}).get(k, 0) for k in ('read', 'write')),
+            'trend': lambda iid: self.container_stats.get(iid, {}).get('cpu', -1)
+        }
         for col, (heading, width) in columns.items():
-            self.container_tree.heading(col, text=heading)
+            self.container_tree.heading(col, text=heading, sort_key=stats_sort_keys.get(col))
             self.container_tree.column(col, width=width, anchor='w')
 
-        scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.container_tree.yview)
-        scroll_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.container_tree.xview)
-        self.container_tree.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
-
-        self.container_tree.grid(row=0, column=0, sticky='nsew')
-        scroll_y.grid(row=0, column=1, sticky='ns')
-        scroll_x.grid(row=1, column=0, sticky='ew')
-
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
+        self.container_tree.pack(fill=tk.BOTH, expand=True)
+
+        # Logs of the selected container
+        logs_frame = ttk.LabelFrame(main_frame, text="Logs")
+        logs_frame.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+
+        logs_controls = ttk.Frame(logs_frame)
+        logs_controls.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Label(logs_controls, text="Tail:").pack(side=tk.LEFT)
+        self.container_log_tail = tk.IntVar(value=CONTAINER_LOG_TAIL)
+        ttk.Spinbox(logs_controls, from_=0, to=100000, increment=100, width=7,
+                    textvariable=self.container_log_tail).pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(logs_controls, text="Since:").pack(side=tk.LEFT)
+        self.container_log_since = ttk.Entry(logs_controls, width=20)
+        self.container_log_since.pack(side=tk.LEFT, padx=(2, 10))
+        self.container_log_follow = tk.BooleanVar(value=True)
+        ttk.Checkbutton(logs_controls, text="Follow", variable=self.container_log_follow).pack(side=tk.LEFT)
+        self.container_log_timestamps = tk.BooleanVar()
+        ttk.Checkbutton(logs_controls, text="Timestamps", variable=self.container_log_timestamps).pack(side=tk.LEFT, padx=5)
+        ttk.Label(logs_controls, text="Filter:").pack(side=tk.LEFT, padx=(10, 2))
+        self.container_log_filter_entry = ttk.Entry(logs_controls, width=25)
+        self.container_log_filter_entry.pack(side=tk.LEFT)
+        self.container_log_filter_entry.bind('<KeyRelease>', lambda e: self.update_container_log_filter())
+        self.container_log_regex = tk.BooleanVar()
+        ttk.Checkbutton(logs_controls, text="Regex", variable=self.container_log_regex,
+                        command=self.update_container_log_filter).pack(side=tk.LEFT, padx=5)
+        ttk.Button(logs_controls, text="Show Logs", command=self.start_container_logs).pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Button(logs_controls, text="Stop", command=self.stop_container_logs).pack(side=tk.LEFT)
+
+        self.container_log_view = LogView(logs_frame, name='container-logs', height=10)
+        self.container_log_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        self.container_log_session = None
+        self.container_log_matcher = None
 
         self.container_status_var = tk.StringVar()
         container_status_bar = ttk.Label(self.docker_containers_tab, 
@@ -745,103 +4049,583 @@ CMD ["python", "app.py"]"""
                                        relief=tk.SUNKEN)
         container_status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
-        self.container_tree.bind('<<TreeviewSelect>>', self.on_container_tree_select)
-        
-        # Container management queue setup
-        self.container_queue = queue.Queue()
-        self.root.after(100, self.process_container_queue)
-        
+        self.container_tree.bind_select(self.on_container_tree_select)
 
-    def process_container_queue(self):
-        try:
-            while True:
-                item = self.container_queue.get_nowait()
-                if item[0] == 'container':
-                    self.container_tree.insert('', tk.END, values=(
-                        item[1]['id'],
-                        item[1]['name'],
-                        item[1]['status'],
-                        item[1]['image'],
-                        item[1]['ports'],
-                        item[1]['created']
-                    ))
-                elif item[0] == 'error':
-                    messagebox.showerror("Error", item[1])
-                elif item[0] == 'success':
-                    self.container_status_var.set(item[1])
-                elif item[0] == 'refresh':
-                    self.start_container_refresh_thread()
-                elif item[0] == 'clear':
-                    self.container_tree.delete(*self.container_tree.get_children())
-                elif item[0] == 'done':
-                    self.container_refresh_button.config(state=tk.NORMAL)
-                    self.container_stop_button.config(state=tk.DISABLED)
-                    count = len(self.container_tree.get_children())
-                    self.container_status_var.set(f"Found {count} running containers")
-        except queue.Empty:
-            pass
-        self.root.after(100, self.process_container_queue)
+        # Latest usage sample per container from the shared stats collector
+        self.container_stats = {}
+        self.stats_collector = ContainerStatsCollector(
+            lambda: self.docker_manager.api if self.docker_manager.connected else None,
+            lambda latest: self.ui_pump.post('container_stats', latest)
+        )
+        self.stats_collector.start()
+
+        # Messages for this tab are dropped until it exists, so start from a fresh list
+        if self.docker_manager.connected:
+            self.start_container_refresh_thread()
+
+    def handle_container_message(self, item):
+        if item[0] == 'watch':
+            self.console.append(f"{item[1]}\n")
+            if self.tab_built(self.docker_containers_tab):
+                self.container_status_var.set(item[1])
+            return
+        if not self.tab_built(self.docker_containers_tab):
+            return
+        if item[0] == 'snapshot':
+            self.apply_container_snapshot(item[1])
+        elif item[0] == 'upsert':
+            self.upsert_container_row(*item[1])
+        elif item[0] == 'remove':
+            self.remove_container_row(item[1])
+        elif item[0] == 'patch':
+            self.patch_container_row(*item[1])
+        elif item[0] == 'error':
+            messagebox.showerror("Error", item[1])
+        elif item[0] == 'success':
+            self.container_status_var.set(item[1])
+        elif item[0] == 'bulk_done':
+            self.on_container_bulk_done(*item[1])
+        elif item[0] == 'done':
+            self.container_refresh_button.config(state=tk.NORMAL)
+            self.on_container_tree_select(None)
+            self.container_status_var.set(f"Found {len(self.container_rows)} running containers")
+
+    def apply_container_snapshot(self, rows):
+        # Rows are keyed by full container ID, which is also the Treeview iid, so
+        # only changed rows are touched and selection/scroll position survive.
+        stale = [iid for iid in self.container_rows if iid not in rows]
+        if stale:
+            self.container_tree.delete(*stale)
+        for iid, values in rows.items():
+            if iid not in self.container_rows:
+                self.container_tree.insert('', tk.END, iid=iid, values=values + self.container_stats_values(iid))
+            elif self.container_rows[iid] != values:
+                self.container_tree.item(iid, values=values + self.container_stats_values(iid))
+        self.container_rows = rows
+        self.stats_collector.set_containers(rows)
+
+    def upsert_container_row(self, iid, values):
+        if iid not in self.container_rows:
+            self.container_tree.insert('', tk.END, iid=iid, values=values + self.container_stats_values(iid))
+        elif self.container_rows[iid] != values:
+            self.container_tree.item(iid, values=values + self.container_stats_values(iid))
+        self.container_rows[iid] = values
+        self.stats_collector.set_containers(self.container_rows)
+
+    def remove_container_row(self, iid):
+        if self.container_rows.pop(iid, None) is not None:
+            self.container_tree.delete(iid)
+            self.container_stats.pop(iid, None)
+            self.stats_collector.set_containers(self.container_rows)
+
+    def container_stats_values(self, iid):
+        sample = self.container_stats.get(iid)
+        if sample is None:
+            return ('', '', '', '', '')
+        memory = format_bytes(sample['memory'])
+        if sample['memory_limit']:
+            memory += f" ({sample['memory'] / sample['memory_limit'] * 100:.0f}%)"
+        return (
+            f"{sample['cpu']:.1f}",
+            memory,
+            f"{format_bytes(sample['rx'])}/s / {format_bytes(sample['tx'])}/s",
+            f"{format_bytes(sample['read'])}/s / {format_bytes(sample['write'])}/s",
+            sample['trend']
+        )
+
+    def handle_container_stats(self, latest):
+        for iid, sample in latest.items():
+            if iid in self.container_rows:
+                self.container_stats[iid] = sample
+                self.container_tree.item(iid, values=self.container_rows[iid] + self.container_stats_values(iid))
+        if self.container_tree.sort_state[0] in self.container_tree.sort_keys:
+            self.container_tree.resort()
+
+    def patch_container_row(self, iid, column, value):
+        if iid not in self.container_rows:
+            return
+        values = list(self.container_rows[iid])
+        values[self.container_tree.columns.index(column)] = value
+        self.upsert_container_row(iid, tuple(values))
 
     def on_container_tree_select(self, event):
         selected = self.container_tree.selection()
-        self.container_stop_button.config(state=tk.NORMAL if selected else tk.DISABLED)
-
-    def get_selected_container_id(self):
+        state = tk.NORMAL if selected and not self.container_bulk_ids else tk.DISABLED
+        for button in self.container_action_buttons:
+            button.config(state=state)
+
+    # ----- Container Logs -----
+    def update_container_log_filter(self):
+        # Read by the log worker for every line, so the filter applies as lines arrive
+        pattern = self.container_log_filter_entry.get()
+        if not pattern:
+            self.container_log_matcher = None
+        elif self.container_log_regex.get():
+            try:
+                self.container_log_matcher = re.compile(pattern).search
+            except re.error:
+                return
+        else:
+            self.container_log_matcher = lambda line: pattern in line
+
+    def start_container_logs(self):
         selected = self.container_tree.selection()
-        return self.container_tree.item(selected[0], 'values')[0] if selected else None
+        if not selected:
+            messagebox.showerror("Error", "Select a container first")
+            return
+        if not self.docker_manager.connected:
+            messagebox.showerror("Error", "Docker connection not available")
+            return
+        try:
+            tail = max(0, self.container_log_tail.get())
+            since = parse_log_since(self.container_log_since.get())
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Invalid tail/since: {e}")
+            return
+
+        self.stop_container_logs()
+        container_id = selected[0]
+        name = self.container_rows.get(container_id, (container_id[:12], container_id[:12]))[1]
+        self.update_container_log_filter()
+        session = {
+            'container': container_id,
+            'lines': deque(maxlen=CONTAINER_LOG_BUFFER),
+            'dropped': 0,
+            'pending': False,
+            'lock': threading.Lock(),
+            'stream': None,
+            'stopped': False
+        }
+        self.container_log_session = session
+        self.container_log_view.clear()
+        self.container_log_view.append(
+            f"--- {name}: last {tail} lines" + (f" since {self.container_log_since.get().strip()}" if since else "")
+            + (", following" if self.container_log_follow.get() else "") + " ---\n"
+        )
+        self.task_engine.submit(
+            'logs', f"Logs of {name}", self.read_container_logs,
+            session, tail, since, self.container_log_follow.get(), self.container_log_timestamps.get(),
+            on_cancel=lambda: self.close_container_log_session(session)
+        )
+
+    def stop_container_logs(self):
+        session, self.container_log_session = self.container_log_session, None
+        if session is not None:
+            self.close_container_log_session(session)
+
+    def close_container_log_session(self, session):
+        session['stopped'] = True
+        stream = session['stream']
+        if stream is not None:
+            # Closing the response unblocks the worker's read
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def read_container_logs(self, session, tail, since, follow, timestamps):
+        partial = ''
+        try:
+            stream = self.docker_manager.api.logs(
+                session['container'], stream=True, follow=follow, tail=tail, since=since, timestamps=timestamps
+            )
+            session['stream'] = stream
+            if session['stopped']:
+                stream.close()
+                return
+            for chunk in stream:
+                lines = (partial + chunk.decode(errors='replace')).split('\n')
+                partial = lines.pop()
+                self.queue_container_log_lines(session, lines)
+                if session['stopped']:
+                    break
+            if partial:
+                self.queue_container_log_lines(session, [partial])
+            if not session['stopped']:
+                self.queue_container_log_lines(session, ["--- end of log stream ---"], filtered=False)
+        except Exception as e:
+            if not session['stopped']:
+                self.queue_container_log_lines(session, [f"--- error: {e} ---"], filtered=False)
+
+    def queue_container_log_lines(self, session, lines, filtered=True):
+        matcher = self.container_log_matcher if filtered else None
+        if matcher is not None:
+            lines = [line for line in lines if matcher(line)]
+        if not lines:
+            return
+        with session['lock']:
+            overflow = len(session['lines']) + len(lines) - CONTAINER_LOG_BUFFER
+            if overflow > 0:
+                session['dropped'] += overflow
+            session['lines'].extend(lines)
+            # One wake-up per drain, however many lines arrive in between
+            if session['pending']:
+                return
+            session['pending'] = True
+        self.ui_pump.post('container_logs', session)
+
+    def handle_container_logs(self, session):
+        with session['lock']:
+            lines = list(session['lines'])
+            session['lines'].clear()
+            dropped, session['dropped'] = session['dropped'], 0
+            session['pending'] = False
+        if session is not self.container_log_session:
+            return
+        if dropped:
+            self.container_log_view.append(f"--- {dropped} lines skipped (output faster than the display) ---\n")
+        self.container_log_view.append("".join(line.rstrip('\r') + "\n" for line in lines))
 
     def start_container_refresh_thread(self):
         self.container_refresh_button.config(state=tk.DISABLED)
         self.container_status_var.set("Refreshing container list...")
-        threading.Thread(target=self.refresh_containers, daemon=True).start()
+        self.task_engine.submit('docker', "Refresh container list", self.refresh_containers, timeout=TASK_QUERY_TIMEOUT)
 
     def refresh_containers(self):
-        if self.docker_client is None:
-            self.container_queue.put(('error', "Docker connection not available"))
-            return
-        try:
-            containers = self.docker_client.containers.list(filters={'status': 'running'})
-            self.container_queue.put(('clear', None))
-            
-            for container in containers:
-                attrs = container.attrs
-                self.container_queue.put(('container', {
-                    'id': container.short_id,
-                    'name': container.name,
-                    'status': container.status,
-                    'image': container.image.tags[0] if container.image.tags else container.image.id,
-                    'ports': "\n".join(attrs['NetworkSettings']['Ports'].keys()) if attrs['NetworkSettings']['Ports'] else "None",
-                    'created': attrs['Created'][:19]
-                }))
-                
+        if not self.docker_manager.connected:
+            self.ui_pump.post('containers', ('error', "Docker connection not available"))
+            return
+        try:
+            self.ui_pump.post('containers', ('snapshot', self.fetch_container_rows()))
         except docker.errors.APIError as e:
-            self.container_queue.put(('error', f"Docker API Error: {e}"))
+            self.ui_pump.post('containers', ('error', f"Docker API Error: {e}"))
         except Exception as e:
-            self.container_queue.put(('error', f"Error refreshing containers: {str(e)}"))
+            self.ui_pump.post('containers', ('error', f"Error refreshing containers: {str(e)}"))
         finally:
-            self.container_queue.put(('done', None))
+            self.ui_pump.post('containers', ('done', None))
+
+    def fetch_container_rows(self, filters=None):
+        # One bulk call; containers.list() would inspect every container and
+        # container.image would fetch every image on top of that
+        containers = self.docker_manager.api.containers(filters=filters or {'status': 'running'})
+        if not all(self.image_index.contains(c['ImageID']) for c in containers):
+            self.refresh_image_index()
+        return {c['Id']: self.container_row(c) for c in containers}
+
+    def container_row(self, container):
+        ports = dict.fromkeys(f"{p['PrivatePort']}/{p['Type']}" for p in container.get('Ports') or [])
+        return (
+            container['Id'][:12],
+            container['Names'][0].lstrip('/') if container.get('Names') else '',
+            container['State'],
+            self.image_index.name(container['ImageID']),
+            "\n".join(ports) if ports else "None",
+            time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(container['Created']))
+        )
+
+    def start_container_bulk_action(self, action):
+        container_ids = list(self.container_tree.selection())
+        if not container_ids:
+            return
+        if not messagebox.askyesno("Confirm", f"Are you sure you want to {action} {len(container_ids)} container(s)?"):
+            return
+        try:
+            workers = min(max(1, self.container_pool_size.get()), TASK_CATEGORY_LIMITS['container-action'])
+            timeout = max(0, self.container_action_timeout.get())
+        except tk.TclError:
+            messagebox.showerror("Error", "Workers and timeout must be numbers")
+            return
 
-    def start_container_stop_thread(self):
-        if (container_id := self.get_selected_container_id()):
-            if messagebox.askyesno("Confirm Stop", "Are you sure you want to stop this container?"):
-                self.container_stop_button.config(state=tk.DISABLED)
-                self.container_status_var.set(f"Stopping container {container_id}...")
-                threading.Thread(target=self.stop_container, args=(container_id,), daemon=True).start()
+        self.container_bulk_ids.update(container_ids)
+        self.on_container_tree_select(None)
+        self.container_status_var.set(f"Running {action} on {len(container_ids)} container(s)...")
+        self.task_engine.submit(
+            'docker', f"{action.capitalize()} {len(container_ids)} container(s)", self.run_container_bulk_action,
+            action, container_ids, workers, timeout
+        )
+
+    def run_container_bulk_action(self, action, container_ids, workers, timeout):
+        failed = []
+        if not self.docker_manager.connected:
+            self.ui_pump.post('containers', ('error', "Docker connection not available"))
+            failed = container_ids
+        else:
+            # Every action is a task of its own, so the engine's container-action
+            # limit applies; at most `workers` of them are submitted at a time
+            queued = list(container_ids)
+            futures = {}
+            done = 0
+            while queued or futures:
+                while queued and len(futures) < workers:
+                    container_id = queued.pop(0)
+                    name = self.container_rows.get(container_id, (container_id[:12], container_id[:12]))[1]
+                    limit = (timeout if action in ('stop', 'restart') else 0) + CONTAINER_ACTION_TIMEOUT
+                    future = self.task_engine.submit(
+                        'container-action', f"{action.capitalize()} {name}", self.run_container_action,
+                        action, container_id, timeout, timeout=limit
+                    )
+                    futures[future] = (container_id, name, limit, time.monotonic() + limit)
+                # Wake up regularly so a cancel takes effect while every call is still blocked
+                finished, _ = wait(futures, timeout=CONTAINER_ACTION_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                # A timed-out call keeps its slot until the daemon answers, so an
+                # action may never get one: give up on it after `limit` in the queue
+                now = time.monotonic()
+                for future, (container_id, name, limit, deadline) in futures.items():
+                    if now > deadline and self.task_engine.state(future.task_id) == 'queued':
+                        self.task_engine.cancel(future.task_id)
+                if self.task_engine.cancelled():
+                    # Actions already running finish; the rest are skipped
+                    for future in futures:
+                        if self.task_engine.state(future.task_id) == 'queued':
+                            self.task_engine.cancel(future.task_id)
+                    for container_id in queued:
+                        failed.append(container_id)
+                    queued = []
+                for future in finished:
+                    container_id, name, limit, deadline = futures.pop(future)
+                    done += 1
+                    try:
+                        future.result()
+                        result = "OK"
+                    except CancelledError:
+                        failed.append(container_id)
+                        if self.task_engine.cancelled():
+                            result = "skipped (cancelled)"
+                        else:
+                            result = f"timed out after {limit}s waiting for a free slot"
+                    except TimeoutError:
+                        failed.append(container_id)
+                        result = f"timed out after {limit}s"
+                    except Exception as e:
+                        failed.append(container_id)
+                        result = f"failed: {e}"
+                    self.ui_pump.post('containers', (
+                        'success', f"[{done}/{len(container_ids)}] {action} {name}: {result}"
+                    ))
 
-    def stop_container(self, container_id):
+        # One coalesced resync instead of a tree update per container
         try:
-            container = self.docker_client.containers.get(container_id)
-            container.stop()
-            self.container_queue.put(('success', f"Successfully stopped container {container_id}"))
-            self.container_queue.put(('refresh', None))
-        except docker.errors.NotFound:
-            self.container_queue.put(('error', f"Container {container_id} no longer exists"))
-        except Exception as e:
-            self.container_queue.put(('error', f"Error stopping container: {str(e)}"))
-        finally:
-            self.container_queue.put(('done', None))
+            rows = self.fetch_container_rows() if self.docker_manager.connected else None
+        except Exception:
+            rows = None
+        self.ui_pump.post('containers', ('bulk_done', (action, container_ids, failed, rows)))
+
+    def run_container_action(self, action, container_id, timeout):
+        # `timeout` is the grace period given to the container before SIGKILL
+        api = self.docker_manager.api
+        if action == 'stop':
+            api.stop(container_id, timeout=timeout)
+        elif action == 'restart':
+            api.restart(container_id, timeout=timeout)
+        elif action == 'kill':
+            api.kill(container_id)
+        elif action == 'remove':
+            api.remove_container(container_id, force=True)
+        else:
+            raise ValueError(f"Unknown container action: {action}")
+
+    def on_container_bulk_done(self, action, container_ids, failed, rows):
+        self.container_bulk_ids.difference_update(container_ids)
+        if rows is not None:
+            self.apply_container_snapshot(rows)
+        self.on_container_tree_select(None)
+        summary = f"{action.capitalize()}: {len(container_ids) - len(failed)} succeeded, {len(failed)} failed"
+        if failed:
+            summary += " (" + ", ".join(fid[:12] for fid in failed) + ")"
+        self.container_status_var.set(summary)
+
+    # ----- Container Event Stream -----
+    def start_container_event_watch(self):
+        self.container_event_thread = threading.Thread(target=self.watch_container_events, daemon=True)
+        self.container_event_thread.start()
+
+    def watch_container_events(self):
+        # Keeps container_tree and the image index current from the daemon's
+        # event stream. After a dropped stream, events missed during a short gap
+        # are replayed with `since`; a longer gap (or the first subscription)
+        # does a full resync. Drops and errors are reported on the containers
+        # tab; an unexpected error (a malformed event, a failed lookup) also
+        # forces a full resync, so the same event is not replayed into it.
+        import requests
+        import urllib3
+        synced_until = None
+        backoff = 1
+        lost = False
+        while True:
+            if not self.docker_manager.wait_connected(CONTAINER_EVENT_MAX_BACKOFF):
+                continue
+            connected = False
+            try:
+                replay = synced_until is not None and time.time() - synced_until <= CONTAINER_EVENT_REPLAY_WINDOW
+                events = self.docker_manager.api.events(
+                    since=int(synced_until) - 1 if replay else None,
+                    filters={'type': ['container', 'image'], 'event': CONTAINER_EVENTS + IMAGE_EVENTS},
+                    decode=True
+                )
+                # Subscribe before resyncing so nothing falls between the two
+                if not replay:
+                    self.refresh_image_index()
+                    self.ui_pump.post('containers', ('snapshot', self.fetch_container_rows()))
+                if lost:
+                    self.ui_pump.post('containers', ('watch', "Container events: reconnected"))
+                    lost = False
+                connected = True
+                backoff = 1
+                for event in events:
+                    if event.get('Type') == 'image':
+                        self.apply_image_event(event)
+                    else:
+                        self.apply_container_event(event)
+                self.ui_pump.post('containers', ('watch', "Container events: stream closed by the daemon, reconnecting"))
+            except docker.errors.APIError as e:
+                self.ui_pump.post('containers', ('watch', f"Container events: daemon error: {e.explanation or e}"))
+            except (ConnectionError, requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+                self.ui_pump.post('containers', ('watch', f"Container events: connection lost ({e}), retrying in {backoff}s"))
+            except Exception as e:
+                self.ui_pump.post('containers', (
+                    'watch', f"Container events: {type(e).__name__}: {e}, resyncing in {backoff}s"
+                ))
+                connected = False
+                synced_until = None
+            lost = True
+            if connected:
+                synced_until = time.time()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, CONTAINER_EVENT_MAX_BACKOFF)
+
+    def apply_image_event(self, event):
+        action = event.get('Action', '')
+        reference = event.get('Actor', {}).get('ID') or event.get('id')
+        if not reference:
+            return
+        if action == 'delete':
+            self.image_index.remove(reference)
+        else:
+            self.image_index.update(self.docker_manager.api, reference)
+        self.ui_pump.post('images', None)
+
+    def apply_container_event(self, event):
+        action = event.get('Action') or event.get('status', '')
+        container_id = event.get('id') or event.get('Actor', {}).get('ID')
+        attributes = event.get('Actor', {}).get('Attributes', {})
+        if not container_id or container_id in self.container_bulk_ids:
+            return
+        if action in ('start', 'unpause'):
+            rows = self.fetch_container_rows({'id': container_id})
+            for iid, values in rows.items():
+                self.ui_pump.post('containers', ('upsert', (iid, values)))
+        elif action in ('die', 'stop', 'destroy'):
+            self.ui_pump.post('containers', ('remove', container_id))
+        elif action == 'pause':
+            self.ui_pump.post('containers', ('patch', (container_id, 'status', 'paused')))
+        elif action == 'rename' and 'name' in attributes:
+            self.ui_pump.post('containers', ('patch', (container_id, 'name', attributes['name'].lstrip('/'))))
+        elif action.startswith('health_status'):
+            health = action.split(':', 1)[1].strip() if ':' in action else 'unknown'
+            self.ui_pump.post('containers', ('patch', (container_id, 'status', f"running ({health})")))
+
+
+    # ----- Background Tasks -----
+    def create_tasks_ui(self):
+        self.tasks_status_var = tk.StringVar()
+        ttk.Label(self.tasks_tab, textvariable=self.tasks_status_var, relief=tk.SUNKEN).pack(side=tk.BOTTOM, fill=tk.X)
+
+        main_frame = ttk.Frame(self.tasks_tab)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        control_frame = ttk.Frame(main_frame)
+        control_frame.pack(fill=tk.X, pady=5)
+        self.task_cancel_button = ttk.Button(
+            control_frame, text="Cancel", command=self.cancel_selected_tasks, state=tk.DISABLED
+        )
+        self.task_cancel_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Clear Finished", command=self.clear_finished_tasks).pack(side=tk.LEFT)
+        limits = ", ".join(f"{category} {limit}" for category, limit in TASK_CATEGORY_LIMITS.items())
+        ttk.Label(control_frame, text=f"At once: {limits}").pack(side=tk.RIGHT, padx=5)
+
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.tasks_tree = VirtualTable(
+            tree_frame,
+            columns=('id', 'category', 'task', 'state', 'time'),
+            selectmode='extended'
+        )
+
+        columns = {
+            'id': ('#', 50),
+            'category': ('Category', 90),
+            'task': ('Task', 400),
+            'state': ('State', 250),
+            'time': ('Time', 100)
+        }
+
+        for col, (heading, width) in columns.items():
+            self.tasks_tree.heading(col, text=heading)
+            self.tasks_tree.column(col, width=width, anchor='w')
+
+        self.tasks_tree.pack(fill=tk.BOTH, expand=True)
+        self.tasks_tree.bind_select(self.on_task_select)
+
+        # Updates are dropped until this tab exists; start from the engine's own list
+        for task in self.task_engine.snapshot():
+            self.update_task_row(task)
+        self.update_task_summary()
+
+    def task_values(self, task):
+        now = task['finished'] or time.monotonic()
+        if task['started'] is None:
+            duration = f"waited {now - task['created']:.0f}s"
+        else:
+            duration = f"{now - task['started']:.1f}s"
+        state = f"{task['state']}: {task['error']}" if task['error'] else task['state']
+        return (task['id'], task['category'], task['label'], state, duration)
+
+    def handle_task_message(self, item):
+        if not self.tab_built(self.tasks_tab):
+            return
+        kind, task = item
+        if kind == 'removed':
+            if self.task_rows.pop(task, None) is not None:
+                self.tasks_tree.delete(str(task))
+        else:
+            self.update_task_row(task)
+        self.update_task_summary()
+
+    def update_task_row(self, task):
+        if task['id'] in self.task_rows:
+            self.tasks_tree.item(str(task['id']), values=self.task_values(task))
+        else:
+            self.tasks_tree.insert('', tk.END, iid=str(task['id']), values=self.task_values(task))
+        self.task_rows[task['id']] = task
+
+    def update_task_summary(self):
+        active = [task for task in self.task_rows.values() if task['finished'] is None]
+        running = sum(task['state'] == 'running' for task in active)
+        self.tasks_status_var.set(
+            f"{running} running, {len(active) - running} waiting or cancelling, {len(self.task_rows) - len(active)} finished"
+        )
+        # Durations of unfinished tasks tick while there are any
+        if active and self.task_tick is None:
+            self.task_tick = self.root.after(TASK_TICK_MS, self.tick_tasks)
+        self.on_task_select(None)
+
+    def tick_tasks(self):
+        self.task_tick = None
+        for task in self.task_rows.values():
+            if task['finished'] is None:
+                self.tasks_tree.item(str(task['id']), values=self.task_values(task))
+        self.update_task_summary()
+
+    def on_task_select(self, event):
+        selected = [self.task_rows.get(int(iid)) for iid in self.tasks_tree.selection()]
+        cancellable = any(task and task['finished'] is None and not task['cancel_requested'] for task in selected)
+        self.task_cancel_button.config(state=tk.NORMAL if cancellable else tk.DISABLED)
+
+    def cancel_selected_tasks(self):
+        for iid in self.tasks_tree.selection():
+            self.task_engine.cancel(int(iid))
+
+    def clear_finished_tasks(self):
+        self.task_engine.clear_finished()
+        finished = [task_id for task_id, task in self.task_rows.items() if task['finished'] is not None]
+        for task_id in finished:
+            del self.task_rows[task_id]
+        if finished:
+            self.tasks_tree.delete(*(str(task_id) for task_id in finished))
+        self.update_task_summary()
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = QEMUManager(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
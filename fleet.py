@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from qmp import QMPClient, QMPError
+from vmcore import (
+    APP_DIR, VM_PROFILES, allocate_qmp_address, build_disk_command, build_overlay_command,
+    build_vm_command, disk_size_bytes, format_command
+)
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+FLEET_LOG_DIR = APP_DIR / 'fleet'
+FLEET_DEFAULT_CONCURRENCY = 4
+FLEET_QMP_TIMEOUT = 30
+FLEET_STOP_TIMEOUT = 10
+
+# Example spec (YAML or JSON):
+#
+#   concurrency: 4
+#   defaults: {cpu: 2, memory: 2048, profile: Balanced, display: none}
+#   vms:
+#     - name: web1
+#       disk: /vms/web1.qcow2
+#       base: /golden/ubuntu.qcow2   # create disk as a linked clone if missing
+#       pin: [2, 3]                  # host cores for the vCPUs, or "auto"
+#     - name: scratch
+#       disk: /vms/scratch.qcow2
+#       size: 20G                    # create an empty disk if missing
+#       iso: /iso/installer.iso
+
+def load_spec(path):
+    with open(path, encoding='utf-8') as f:
+        if Path(path).suffix in ('.yaml', '.yml'):
+            if yaml is None:
+                raise SystemExit("PyYAML is required for YAML specs (pip install pyyaml), or use JSON")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+
+    defaults = spec.get('defaults', {})
+    vms = []
+    for index, entry in enumerate(spec.get('vms', [])):
+        vm = {'cpu': 1, 'memory': 1024, 'profile': 'Balanced', 'disk_format': 'qcow2',
+              'iso': '', 'display': 'none', 'pin': None, **defaults, **entry}
+        vm.setdefault('name', Path(vm.get('disk', f'vm{index}')).stem)
+        if 'disk' not in vm:
+            raise SystemExit(f"VM {vm['name']}: 'disk' is required")
+        if vm['profile'] not in VM_PROFILES:
+            raise SystemExit(f"VM {vm['name']}: unknown profile {vm['profile']!r} (one of {', '.join(VM_PROFILES)})")
+        vms.append(vm)
+    names = [vm['name'] for vm in vms]
+    if len(set(names)) != len(names):
+        raise SystemExit("VM names in the spec must be unique")
+    return vms, spec.get('concurrency', FLEET_DEFAULT_CONCURRENCY)
+
+def assign_cores(vms):
+    # "auto" pinning hands out host cores round-robin, skipping explicitly pinned ones
+    if not hasattr(os, 'sched_getaffinity'):
+        return
+    available = sorted(os.sched_getaffinity(0))
+    taken = {core for vm in vms if isinstance(vm['pin'], list) for core in vm['pin']}
+    free = [core for core in available if core not in taken] or available
+    next_core = 0
+    for vm in vms:
+        if vm['pin'] == 'auto':
+            vm['pin'] = [free[(next_core + i) % len(free)] for i in range(int(vm['cpu']))]
+            next_core += int(vm['cpu'])
+
+def provision_command(vm):
+    # Returns the qemu-img command that creates the disk, or None if it exists
+    if os.path.exists(vm['disk']):
+        return None
+    if vm.get('base'):
+        base_format = vm.get('base_format', 'qcow2')
+        return build_overlay_command(vm['base'], base_format, vm['disk'])
+    if vm.get('size'):
+        size = str(vm['size'])
+        size_bytes = disk_size_bytes(size[:-1], size[-1].upper()) if size[-1].upper() in 'GM' else int(size)
+        return build_disk_command(vm['disk'], size_bytes, vm['disk_format'], 'off')
+    raise RuntimeError(f"{vm['disk']} does not exist and neither 'base' nor 'size' is given")
+
+async def run_command(cmd):
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"{cmd[0]} failed: {stderr.decode(errors='replace').strip()}")
+
+async def connect_qmp(address, process):
+    deadline = time.monotonic() + FLEET_QMP_TIMEOUT
+    while True:
+        if process.returncode is not None:
+            raise RuntimeError(f"QEMU exited with code {process.returncode}")
+        client = QMPClient(address)
+        try:
+            await client.connect()
+            return client
+        except (OSError, ValueError, asyncio.TimeoutError):
+            if time.monotonic() > deadline:
+                raise RuntimeError("timed out waiting for the QMP socket")
+            await asyncio.sleep(0.1)
+
+async def stop_process(process):
+    # A VM whose launch failed after spawning must not outlive the launcher
+    if process.returncode is not None:
+        return
+    process.terminate()
+    try:
+        await asyncio.wait_for(process.wait(), FLEET_STOP_TIMEOUT)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+async def pin_vcpus(client, cores):
+    # vCPU threads are ordinary host threads; pin each to one core
+    cpus = await client.execute('query-cpus-fast')
+    pinned = []
+    for cpu in sorted(cpus, key=lambda cpu: cpu['cpu-index']):
+        core = cores[cpu['cpu-index'] % len(cores)]
+        os.sched_setaffinity(cpu['thread-id'], {core})
+        pinned.append((cpu['cpu-index'], cpu['thread-id'], core))
+    return pinned
+
+async def launch(vm, semaphore, dry_run):
+    result = {'name': vm['name'], 'ok': False, 'provision': 0.0, 'spawn': 0.0, 'total': 0.0, 'pinned': [], 'error': None}
+    async with semaphore:
+        started = time.monotonic()
+        try:
+            provision = provision_command(vm)
+            qmp_address = allocate_qmp_address(vm['name'])
+            cmd, notes = build_vm_command(
+                vm['cpu'], vm['memory'], vm['disk'], vm['disk_format'], vm['iso'], VM_PROFILES[vm['profile']],
+                name=vm['name'], qmp_address=qmp_address, display=vm['display']
+            )
+            if dry_run:
+                for line in ([format_command(provision)] if provision else []) + [format_command(cmd)] + notes:
+                    print(f"{vm['name']}: {line}")
+                result['ok'] = True
+                return result
+
+            if provision:
+                await run_command(provision)
+            result['provision'] = time.monotonic() - started
+
+            FLEET_LOG_DIR.mkdir(parents=True, exist_ok=True)
+            with open(FLEET_LOG_DIR / f"{vm['name']}.log", 'ab') as log:
+                # Own session so the VMs outlive the launcher
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdin=asyncio.subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True
+                )
+            spawned = time.monotonic()
+            try:
+                client = await connect_qmp(qmp_address, process)
+                try:
+                    status = await client.execute('query-status')
+                    if vm['pin'] and hasattr(os, 'sched_setaffinity'):
+                        result['pinned'] = await pin_vcpus(client, vm['pin'])
+                finally:
+                    await client.close()
+            except BaseException:
+                await stop_process(process)
+                raise
+            result['spawn'] = time.monotonic() - spawned
+            result['total'] = time.monotonic() - started
+            result['pid'] = process.pid
+            result['qmp'] = qmp_address
+            result['status'] = status['status']
+            result['ok'] = True
+        except (OSError, RuntimeError, KeyError, ValueError, QMPError, asyncio.TimeoutError) as e:
+            result['error'] = str(e) or type(e).__name__
+            result['total'] = time.monotonic() - started
+        return result
+
+async def launch_fleet(vms, concurrency, dry_run):
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results = await asyncio.gather(*(launch(vm, semaphore, dry_run) for vm in vms), return_exceptions=True)
+    # Anything launch() did not expect still fails only its own VM
+    return [
+        {'name': vm['name'], 'ok': False, 'provision': 0.0, 'spawn': 0.0, 'total': 0.0, 'pinned': [],
+         'error': f"{type(result).__name__}: {result}"} if isinstance(result, BaseException) else result
+        for vm, result in zip(vms, results)
+    ]
+
+def print_report(results, wall):
+    print(f"{'VM':<20} {'Result':<8} {'Provision':>10} {'QEMU->QMP':>10} {'Total':>8}  Details")
+    for result in results:
+        if result['ok']:
+            details = f"pid {result.get('pid', '-')}"
+            if result['pinned']:
+                details += ", vCPU->core " + " ".join(f"{index}->{core}" for index, _, core in result['pinned'])
+        else:
+            details = result['error']
+        print(f"{result['name']:<20} {'ok' if result['ok'] else 'FAILED':<8} "
+              f"{result['provision'] * 1000:>8.0f}ms {result['spawn'] * 1000:>8.0f}ms {result['total']:>7.2f}s  {details}")
+    launched = sum(result['ok'] for result in results)
+    print(f"\n{launched}/{len(results)} VMs launched in {wall:.2f}s wall clock")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Provision and launch a fleet of QEMU VMs from a YAML/JSON spec")
+    parser.add_argument('spec', help="fleet spec (.yaml/.yml or .json)")
+    parser.add_argument('-j', '--concurrency', type=int, help="VMs provisioned/started at once (overrides the spec)")
+    parser.add_argument('--dry-run', action='store_true', help="print the commands without running them")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    vms, concurrency = load_spec(args.spec)
+    assign_cores(vms)
+    started = time.monotonic()
+    results = asyncio.run(launch_fleet(vms, args.concurrency or concurrency, args.dry_run))
+    wall = time.monotonic() - started
+
+    if args.json:
+        print(json.dumps({'wall_seconds': wall, 'vms': results}, indent=2))
+    elif args.dry_run:
+        for result in results:
+            if not result['ok']:
+                print(f"{result['name']}: error: {result['error']}")
+    else:
+        print_report(results, wall)
+    return 0 if all(result['ok'] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
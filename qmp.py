@@ -0,0 +1,127 @@
+import asyncio
+import itertools
+import json
+
+
+class QMPError(Exception):
+    def __init__(self, command, error):
+        super().__init__(f"{command}: {error.get('desc', error)}")
+        self.command = command
+        self.error_class = error.get('class')
+
+
+class QMPClient:
+    # Minimal asyncio client for the QEMU Machine Protocol. `address` is a
+    # unix socket path or a (host, port) tuple. Replies are matched to
+    # requests by id, so several commands can be in flight at once; async
+    # events (STOP, RESUME, SHUTDOWN, ...) are passed to on_event(event).
+    def __init__(self, address, on_event=None):
+        self.address = address
+        self.on_event = on_event
+        self.reader = None
+        self.writer = None
+        self.reader_task = None
+        self.pending = {}
+        self.ids = itertools.count(1)
+        self.greeting = None
+        self.closed = True
+
+    async def connect(self, timeout=5):
+        if isinstance(self.address, tuple):
+            connection = asyncio.open_connection(*self.address)
+        else:
+            connection = asyncio.open_unix_connection(self.address)
+        self.reader, self.writer = await asyncio.wait_for(connection, timeout)
+        self.closed = False
+        try:
+            self.greeting = json.loads(await asyncio.wait_for(self.reader.readline(), timeout))
+            if 'QMP' not in self.greeting:
+                raise ConnectionError(f"Unexpected QMP greeting: {self.greeting}")
+            self.reader_task = asyncio.ensure_future(self.read_messages())
+            await asyncio.wait_for(self.execute('qmp_capabilities'), timeout)
+        except BaseException:
+            await self.close()
+            raise
+
+    async def execute(self, command, arguments=None):
+        if self.closed:
+            raise ConnectionError("QMP connection is closed")
+        request_id = next(self.ids)
+        message = {'execute': command, 'id': request_id}
+        if arguments:
+            message['arguments'] = arguments
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = (command, future)
+        try:
+            self.writer.write(json.dumps(message).encode() + b'\n')
+            await self.writer.drain()
+            return await future
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def read_messages(self):
+        error = ConnectionError("QMP connection closed")
+        try:
+            while line := await self.reader.readline():
+                message = json.loads(line)
+                if 'event' in message:
+                    if self.on_event:
+                        self.on_event(message)
+                    continue
+                command, future = self.pending.get(message.get('id'), (None, None))
+                if future is None or future.done():
+                    continue
+                if 'error' in message:
+                    future.set_exception(QMPError(command, message['error']))
+                else:
+                    future.set_result(message.get('return'))
+        except (OSError, ValueError) as e:
+            error = ConnectionError(f"QMP connection lost: {e}")
+        finally:
+            for _, future in self.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.closed = True
+
+    async def close(self):
+        self.closed = True
+        writer, self.writer = self.writer, None
+        if self.reader_task:
+            self.reader_task.cancel()
+            try:
+                await self.reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if writer:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    @property
+    def connected(self):
+        return not self.closed
+
+
+async def guest_ping(address, timeout=1):
+    # True once the guest agent (qemu-ga) behind a virtio-serial chardev
+    # answers. QEMU accepts the connection even while nothing in the guest
+    # is listening, so only a reply counts.
+    try:
+        if isinstance(address, tuple):
+            connection = asyncio.open_connection(*address)
+        else:
+            connection = asyncio.open_unix_connection(address)
+        reader, writer = await asyncio.wait_for(connection, timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    try:
+        writer.write(b'{"execute": "guest-ping"}\n')
+        await writer.drain()
+        reply = json.loads(await asyncio.wait_for(reader.readline(), timeout) or b'{}')
+        return 'return' in reply
+    except (OSError, ValueError, asyncio.TimeoutError):
+        return False
+    finally:
+        writer.close()
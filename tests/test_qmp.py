@@ -0,0 +1,324 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+import Everthing
+from qmp import QMPClient, QMPError, guest_ping
+
+
+class StandInQMP:
+    # Minimal QMP server: greets, records every command and answers from
+    # `replies` (command -> return value, or callable(arguments) returning
+    # a full reply dict). Events queued in `events_before` are written
+    # ahead of the reply to the named command; commands in `ignore` are
+    # never answered.
+    def __init__(self, path):
+        self.path = path
+        self.commands = []
+        self.replies = {'qmp_capabilities': {}}
+        self.events_before = {}
+        self.close_on = set()
+        self.ignore = set()
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_unix_server(self.handle, self.path)
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        greeting = {'QMP': {'version': {'qemu': {'major': 8, 'minor': 2, 'micro': 0}}, 'capabilities': []}}
+        writer.write(json.dumps(greeting).encode() + b'\n')
+        while line := await reader.readline():
+            message = json.loads(line)
+            command = message['execute']
+            self.commands.append(command)
+            if command in self.close_on:
+                writer.close()
+                return
+            if command in self.ignore:
+                continue
+            for event in self.events_before.get(command, []):
+                writer.write(json.dumps({'event': event, 'timestamp': {'seconds': 0, 'microseconds': 0}}).encode() + b'\n')
+            reply = self.replies.get(command, {})
+            if callable(reply):
+                reply = reply(message.get('arguments'))
+            else:
+                reply = {'return': reply}
+            reply['id'] = message['id']
+            writer.write(json.dumps(reply).encode() + b'\n')
+            await writer.drain()
+        writer.close()
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'qmp.sock')
+
+
+def test_connect_negotiates_capabilities(socket_path):
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        client = QMPClient(socket_path)
+        await client.connect()
+        assert client.connected
+        assert client.greeting['QMP']['version']['qemu']['major'] == 8
+        assert server.commands == ['qmp_capabilities']
+        await client.close()
+        assert not client.connected
+        await server.stop()
+
+    run(scenario())
+
+
+def test_execute_returns_result(socket_path):
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        server.replies['query-status'] = {'status': 'running', 'running': True}
+        client = QMPClient(socket_path)
+        await client.connect()
+        assert await client.execute('query-status') == {'status': 'running', 'running': True}
+        await client.close()
+        await server.stop()
+
+    run(scenario())
+
+
+def test_execute_raises_qmp_error(socket_path):
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        server.replies['bogus'] = lambda arguments: {
+            'error': {'class': 'CommandNotFound', 'desc': 'The command bogus has not been found'}
+        }
+        client = QMPClient(socket_path)
+        await client.connect()
+        with pytest.raises(QMPError) as error:
+            await client.execute('bogus')
+        assert error.value.error_class == 'CommandNotFound'
+        assert error.value.command == 'bogus'
+        # The connection survives a failed command
+        assert await client.execute('query-status') == {}
+        await client.close()
+        await server.stop()
+
+    run(scenario())
+
+
+def test_events_between_replies_go_to_on_event(socket_path):
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        server.replies['stop'] = {}
+        server.events_before['stop'] = ['STOP', 'BLOCK_JOB_READY']
+        events = []
+        client = QMPClient(socket_path, on_event=events.append)
+        await client.connect()
+        assert await client.execute('stop') == {}
+        assert [event['event'] for event in events] == ['STOP', 'BLOCK_JOB_READY']
+        await client.close()
+        await server.stop()
+
+    run(scenario())
+
+
+def test_concurrent_commands_are_matched_by_id(socket_path):
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        server.replies['query-status'] = {'status': 'running'}
+        server.replies['query-cpus-fast'] = [{'cpu-index': 0}]
+        client = QMPClient(socket_path)
+        await client.connect()
+        status, cpus = await asyncio.gather(client.execute('query-status'), client.execute('query-cpus-fast'))
+        assert status == {'status': 'running'}
+        assert cpus == [{'cpu-index': 0}]
+        await client.close()
+        await server.stop()
+
+    run(scenario())
+
+
+def test_disconnect_fails_pending_and_later_commands(socket_path):
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        server.close_on.add('quit')
+        client = QMPClient(socket_path)
+        await client.connect()
+        with pytest.raises(ConnectionError):
+            await client.execute('quit')
+        await asyncio.sleep(0)
+        assert not client.connected
+        with pytest.raises(ConnectionError):
+            await client.execute('query-status')
+        await client.close()
+        await server.stop()
+
+    run(scenario())
+
+
+def test_connect_rejects_non_qmp_greeting(socket_path):
+    async def scenario():
+        async def handle(reader, writer):
+            writer.write(b'{"hello": 1}\n')
+            await writer.drain()
+
+        server = await asyncio.start_unix_server(handle, socket_path)
+        client = QMPClient(socket_path)
+        with pytest.raises(ConnectionError):
+            await client.connect(timeout=1)
+        assert not client.connected
+        server.close()
+        await server.wait_closed()
+
+    run(scenario())
+
+
+def test_guest_ping(socket_path, tmp_path):
+    async def scenario():
+        async def agent(reader, writer):
+            json.loads(await reader.readline())
+            writer.write(b'{"return": {}}\n')
+            await writer.drain()
+
+        async def silent(reader, writer):
+            await reader.readline()
+
+        answering = await asyncio.start_unix_server(agent, socket_path)
+        quiet_path = str(tmp_path / 'quiet.sock')
+        quiet = await asyncio.start_unix_server(silent, quiet_path)
+        assert await guest_ping(socket_path)
+        assert not await guest_ping(quiet_path, timeout=0.2)
+        assert not await guest_ping(str(tmp_path / 'missing.sock'))
+        for server in (answering, quiet):
+            server.close()
+            await server.wait_closed()
+
+    run(scenario())
+
+
+def test_vm_monitor_polls_metrics_and_rates(socket_path, monkeypatch):
+    clock = iter([0.0, 10.0, 12.0])
+    monkeypatch.setattr(Everthing, 'time', types.SimpleNamespace(monotonic=lambda: next(clock)))
+
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        read = {'bytes': 0}
+
+        def blockstats(arguments):
+            read['bytes'] += 4 * 1024 * 1024
+            stats = {'rd_bytes': read['bytes'], 'wr_bytes': 0, 'rd_operations': read['bytes'] // 4096, 'wr_operations': 0}
+            return {'return': [{'device': 'disk0', 'stats': stats}]}
+
+        server.replies['query-status'] = {'status': 'running', 'running': True}
+        server.replies['query-blockstats'] = blockstats
+        server.replies['query-cpus-fast'] = [{'cpu-index': 0, 'thread-id': 101}, {'cpu-index': 1, 'thread-id': 102}]
+
+        items = []
+        monitor = Everthing.VMMonitor(items.append, interval=3600, loop=asyncio.get_running_loop())
+        # attach() connects and takes the first sample at t=10
+        await monitor.attach(1, socket_path)
+        await monitor.poll(1, monitor.clients[1])
+        await monitor.detach(1)
+        await server.stop()
+        return items
+
+    items = run(scenario())
+    kinds = [kind for kind, _, _ in items]
+    assert kinds == ['connected', 'metrics', 'metrics']
+    first, second = items[1][2], items[2][2]
+    assert first['rates'] == {}
+    assert second['status'] == 'running'
+    assert second['vcpus'] == [(0, 101), (1, 102)]
+    assert second['totals']['rd_bytes'] == 8 * 1024 * 1024
+    # 4 MiB more over the 2 s between samples
+    assert second['rates']['rd_bytes'] == pytest.approx(2 * 1024 * 1024)
+    assert second['rates']['rd_operations'] == pytest.approx(512)
+
+
+def test_vm_monitor_reports_qmp_events(socket_path):
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        server.events_before['stop'] = ['STOP']
+        server.replies['query-status'] = {'status': 'paused', 'running': False}
+        server.replies['query-blockstats'] = []
+        server.replies['query-cpus-fast'] = []
+        items = []
+        monitor = Everthing.VMMonitor(items.append, interval=3600, loop=asyncio.get_running_loop())
+        await monitor.attach(1, socket_path)
+        await monitor.run_command(1, 'stop', None)
+        await monitor.detach(1)
+        await server.stop()
+        return items
+
+    items = run(scenario())
+    events = [data['event'] for kind, _, data in items if kind == 'event']
+    assert events == ['STOP']
+
+
+def test_vm_monitor_resumes_vm_restored_from_state_file(socket_path):
+    async def scenario():
+        server = await StandInQMP(socket_path).start()
+        statuses = ['inmigrate', 'inmigrate', 'paused']
+
+        def query_status(arguments):
+            if 'cont' in server.commands:
+                status = 'running'
+            else:
+                status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+            return {'return': {'status': status, 'running': status == 'running'}}
+
+        server.replies['query-status'] = query_status
+        server.replies['query-blockstats'] = []
+        server.replies['query-cpus-fast'] = []
+        items = []
+        monitor = Everthing.VMMonitor(items.append, interval=3600, loop=asyncio.get_running_loop())
+        await monitor.attach(1, socket_path, incoming=True)
+        await monitor.detach(1)
+        await server.stop()
+        return server.commands, items
+
+    commands, items = run(scenario())
+    # cont only once the incoming migration has finished loading
+    assert commands.count('cont') == 1
+    assert [c for c in commands[:commands.index('cont')] if c == 'query-status'] == ['query-status'] * 3
+    metrics = [data for kind, _, data in items if kind == 'metrics']
+    assert metrics[-1]['status'] == 'running'
+
+
+def test_vm_monitor_marks_unresponsive_vm_stale(tmp_path, monkeypatch):
+    monkeypatch.setattr(Everthing, 'VM_POLL_TIMEOUT', 0.3)
+
+    async def scenario():
+        servers = []
+        for name in ('good', 'hung'):
+            server = await StandInQMP(str(tmp_path / f'{name}.sock')).start()
+            server.replies['query-status'] = {'status': 'running', 'running': True}
+            server.replies['query-blockstats'] = []
+            server.replies['query-cpus-fast'] = []
+            servers.append(server)
+        servers[1].ignore.add('query-blockstats')
+        items = []
+        monitor = Everthing.VMMonitor(items.append, interval=3600, loop=asyncio.get_running_loop())
+        await monitor.attach(1, servers[0].path)
+        await monitor.attach(2, servers[1].path)
+        items.clear()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*(monitor.poll(vm_id, client) for vm_id, client in monitor.clients.items()))
+        elapsed = loop.time() - started
+        for vm_id in (1, 2):
+            await monitor.detach(vm_id)
+        for server in servers:
+            await server.stop()
+        return items, elapsed
+
+    items, elapsed = run(scenario())
+    assert elapsed < 1
+    assert sorted((kind, vm_id) for kind, vm_id, _ in items) == [('metrics', 1), ('stale', 2)]
@@ -0,0 +1,56 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+import Everthing
+
+
+def test_timeout_releases_caller_while_blocking_function_runs():
+    engine = Everthing.TaskEngine(lambda kind, task: None, limits={'query': 1})
+    release = threading.Event()
+    finished = threading.Event()
+
+    def stuck():
+        # A daemon call that does not come back until the socket gives up
+        release.wait(10)
+        finished.set()
+
+    started = time.monotonic()
+    future = engine.submit('query', "Stuck query", stuck, timeout=0.3)
+    with pytest.raises(TimeoutError):
+        future.result(5)
+    assert time.monotonic() - started < 1.5
+    assert not finished.is_set()
+    assert engine.state(future.task_id) == 'timed out'
+
+    # The slot stays taken until the function returns
+    follower = engine.submit('query', "Next query", time.monotonic)
+    time.sleep(0.3)
+    assert engine.state(follower.task_id) == 'queued'
+    release.set()
+    assert follower.result(5) >= started
+    assert finished.is_set()
+
+
+def test_cancel_releases_caller_while_blocking_function_runs():
+    engine = Everthing.TaskEngine(lambda kind, task: None, limits={'query': 1})
+    release = threading.Event()
+    cancelled = []
+
+    def stuck():
+        release.wait(10)
+        cancelled.append(engine.cancelled())
+
+    future = engine.submit('query', "Stuck query", stuck, on_cancel=release.set)
+    time.sleep(0.2)
+    engine.cancel(future.task_id)
+    with pytest.raises(CancelledError):
+        future.result(5)
+    deadline = time.monotonic() + 5
+    while engine.state(future.task_id) != 'cancelled' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert engine.state(future.task_id) == 'cancelled'
+    assert engine.submit('query', "Next query", lambda: 'ran').result(5) == 'ran'
+    assert cancelled == [True]
@@ -0,0 +1,300 @@
+import json
+import os
+import re
+import shlex
+import socket
+import subprocess
+import time
+from collections import deque
+from pathlib import Path
+
+# Per-user state (spilled logs, caches) lives here
+APP_DIR = Path.home() / '.qemu_manager'
+
+QMP_SOCKET_DIR = APP_DIR / 'qmp'
+
+def atomic_write_json(path, data, indent=None):
+    # Write to a sibling temp file and rename over `path`, so a crash mid-write
+    # never leaves a truncated store behind. OSError is left to the caller.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp, path)
+
+# VM launch profiles. "Compatible" keeps the emulated IDE disk and default CPU
+# model so guests without virtio drivers (e.g. Windows installers) still boot.
+VM_PROFILES = {
+    'Max Performance': {'cpu_host': True, 'disk_bus': 'virtio-blk', 'iothread': True,
+                        'cache': 'none', 'aio': 'native', 'hugepages': True},
+    'Balanced': {'cpu_host': True, 'disk_bus': 'virtio-blk', 'iothread': True,
+                 'cache': 'writeback', 'aio': 'threads', 'hugepages': False},
+    'Compatible': {'cpu_host': False, 'disk_bus': 'ide', 'iothread': False,
+                   'cache': 'writeback', 'aio': 'threads', 'hugepages': False}
+}
+VM_DISK_BUSES = ['virtio-blk', 'virtio-scsi', 'ide']
+VM_CACHE_MODES = ['none', 'writeback', 'writethrough', 'directsync', 'unsafe']
+VM_AIO_MODES = ['threads', 'native', 'io_uring']
+HUGEPAGES_PATH = '/dev/hugepages'
+
+def kvm_available():
+    return os.path.exists('/dev/kvm') and os.access('/dev/kvm', os.R_OK | os.W_OK)
+
+def read_meminfo():
+    # /proc/meminfo as {field: [value, unit]}; empty where it does not exist
+    try:
+        with open('/proc/meminfo') as f:
+            return {line.split(':')[0]: line.split(':')[1].split() for line in f}
+    except OSError:
+        return {}
+
+def hugepages_available(memory_mb):
+    # Enough free huge pages mounted at HUGEPAGES_PATH to back the whole guest
+    info = read_meminfo()
+    try:
+        free_mb = int(info['HugePages_Free'][0]) * int(info['Hugepagesize'][0]) // 1024
+    except (KeyError, ValueError, IndexError):
+        return False
+    return os.path.isdir(HUGEPAGES_PATH) and free_mb >= memory_mb
+
+def build_vm_command(cpu, memory, disk_path, disk_format, iso_path, settings, name=None, qmp_address=None,
+                     agent_address=None, display='gtk'):
+    # Returns the QEMU argv plus notes about settings that had to be adjusted
+    notes = []
+    cmd = ['qemu-system-x86_64', '-smp', str(cpu), '-m', str(memory)]
+    if name:
+        cmd += ['-name', name]
+    if isinstance(qmp_address, tuple):
+        cmd += ['-qmp', f'tcp:{qmp_address[0]}:{qmp_address[1]},server=on,wait=off']
+    elif qmp_address:
+        cmd += ['-qmp', f'unix:{qmp_address},server=on,wait=off']
+
+    machine = 'type=q35'
+    if kvm_available():
+        cmd += ['-accel', 'kvm']
+        if settings['cpu_host']:
+            cmd += ['-cpu', 'host']
+    else:
+        notes.append("KVM not available (/dev/kvm); falling back to TCG emulation")
+        cmd += ['-accel', 'tcg']
+        if settings['cpu_host']:
+            cmd += ['-cpu', 'max']
+
+    if settings['hugepages']:
+        if hugepages_available(memory):
+            cmd += ['-object', f'memory-backend-file,id=mem0,size={memory}M,mem-path={HUGEPAGES_PATH},share=on,prealloc=on']
+            machine += ',memory-backend=mem0'
+        else:
+            notes.append(f"Not enough free huge pages at {HUGEPAGES_PATH}; using normal memory")
+    cmd += ['-machine', machine]
+
+    cache, aio = settings['cache'], settings['aio']
+    if aio == 'native' and cache not in ('none', 'directsync'):
+        # Linux native AIO needs O_DIRECT, which only these cache modes use
+        notes.append(f"aio=native requires cache=none or directsync; using aio=threads with cache={cache}")
+        aio = 'threads'
+
+    # QEMU option values escape a literal comma by doubling it
+    drive = f"file={str(disk_path).replace(',', ',,')},format={disk_format},cache={cache},aio={aio}"
+    bus = settings['disk_bus']
+    iothread = settings['iothread'] and bus != 'ide'
+    if iothread:
+        cmd += ['-object', 'iothread,id=io0']
+    if bus == 'virtio-blk':
+        cmd += ['-drive', f'{drive},if=none,id=disk0',
+                '-device', 'virtio-blk-pci,drive=disk0' + (',iothread=io0' if iothread else '')]
+    elif bus == 'virtio-scsi':
+        cmd += ['-drive', f'{drive},if=none,id=disk0',
+                '-device', 'virtio-scsi-pci,id=scsi0' + (',iothread=io0' if iothread else ''),
+                '-device', 'scsi-hd,drive=disk0,bus=scsi0.0']
+    else:
+        cmd += ['-drive', drive]
+
+    if agent_address:
+        # Guest agent channel; its first reply marks the guest as ready
+        cmd += ['-chardev', f'socket,path={agent_address},server=on,wait=off,id=qga0',
+                '-device', 'virtio-serial',
+                '-device', 'virtserialport,chardev=qga0,name=org.qemu.guest_agent.0']
+
+    # Linked clones boot an installed system, so the ISO is optional
+    if iso_path:
+        cmd += ['-cdrom', iso_path]
+    cmd += ['-boot', 'menu=on', '-display', display, '-usbdevice', 'tablet']
+    return cmd, notes
+
+def format_command(cmd):
+    return subprocess.list2cmdline(cmd) if os.name == 'nt' else shlex.join(cmd)
+
+# Preallocation modes per disk format. "full" writes every byte up front (slow
+# but no allocation cost at guest write time), "falloc" reserves the blocks
+# with fallocate(), "metadata" only lays out qcow2 tables.
+DISK_PREALLOCATION = {
+    'qcow2': ['off', 'metadata', 'falloc', 'full'],
+    'raw': ['off', 'falloc', 'full'],
+    'vdi': ['off', 'full'],
+    'vmdk': ['off', 'full']
+}
+DISK_CLUSTER_SIZES = ['4K', '16K', '32K', '64K', '128K', '256K', '512K', '1M', '2M']
+DISK_PROGRESS_INTERVAL = 0.25
+
+def build_disk_command(filename, size_bytes, disk_format, preallocation,
+                       cluster_size=None, lazy_refcounts=False, extended_l2=False):
+    options = []
+    if disk_format in ('qcow2', 'raw'):
+        options.append(f'preallocation={preallocation}')
+    elif disk_format == 'vdi' and preallocation == 'full':
+        options.append('static=on')
+    elif disk_format == 'vmdk' and preallocation == 'full':
+        # Flat extent is allocated in full at creation time
+        options.append('subformat=monolithicFlat')
+    if disk_format == 'qcow2':
+        if cluster_size:
+            options.append(f'cluster_size={cluster_size}')
+        if lazy_refcounts:
+            options += ['compat=1.1', 'lazy_refcounts=on']
+        if extended_l2:
+            options.append('extended_l2=on')
+    cmd = ['qemu-img', 'create', '-f', disk_format]
+    if options:
+        cmd += ['-o', ','.join(options)]
+    return cmd + [filename, str(size_bytes)]
+
+# qemu-img convert -p prints "    (12.34/100%)" and redraws it with \r
+CONVERT_PROGRESS_RE = re.compile(r'\((\d+(?:\.\d+)?)/100%\)')
+
+def build_convert_command(source, target, target_format, compress=False, sparse_size='4k',
+                          coroutines=8, out_of_order=True):
+    # -S 0 writes zeroes out in full; any other size turns zeroed runs of that
+    # length into holes (or unallocated clusters), which is what compacts an image
+    cmd = ['qemu-img', 'convert', '-p', '-O', target_format, '-m', str(coroutines), '-S', sparse_size or '0']
+    if compress and target_format == 'qcow2':
+        cmd.append('-c')
+    elif out_of_order:
+        # Compressed clusters must be written in order
+        cmd.append('-W')
+    return cmd + [source, target]
+
+def disk_size_bytes(size, unit):
+    return int(float(size) * {'G': 1024 ** 3, 'M': 1024 ** 2}[unit])
+
+def qemu_img_info(path, backing_chain=False):
+    cmd = ['qemu-img', 'info', '--output=json', '-U']
+    if backing_chain:
+        cmd.append('--backing-chain')
+    result = subprocess.run(cmd + [path], check=True, capture_output=True, text=True)
+    return json.loads(result.stdout)
+
+def build_overlay_command(base, base_format, overlay):
+    # Thin qcow2 overlay: only a header is written, reads fall through to the base
+    return ['qemu-img', 'create', '-f', 'qcow2', '-b', os.path.abspath(base), '-F', base_format, overlay]
+
+def allocate_qmp_address(name):
+    # Unix sockets where QEMU supports them, a free loopback port elsewhere
+    if os.name == 'nt':
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            return s.getsockname()
+    QMP_SOCKET_DIR.mkdir(parents=True, exist_ok=True)
+    path = QMP_SOCKET_DIR / f"{name}-{os.getpid()}-{time.monotonic_ns()}.sock"
+    return str(path)
+
+# Admission policy defaults: memory kept back for the host itself, and how far
+# guest reservations may exceed physical RAM / host cores
+ADMISSION_HOST_RESERVE_MB = 1024
+ADMISSION_MEMORY_OVERCOMMIT = 1.0
+ADMISSION_CPU_OVERCOMMIT = 4.0
+
+def read_host_memory():
+    # (total, available) in MiB; either is None when the platform does not say
+    info = read_meminfo()
+    try:
+        return int(info['MemTotal'][0]) // 1024, int(info['MemAvailable'][0]) // 1024
+    except (KeyError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // 1024 ** 2, None
+    except (AttributeError, ValueError, OSError):
+        return None, None
+
+class AdmissionScheduler:
+    # Decides whether a VM launch may start now, has to wait, or can never
+    # fit. Reservations are the -m/-smp of admitted VMs; queued requests are
+    # admitted in FIFO order as reservations are released.
+    def __init__(self, memory_overcommit=ADMISSION_MEMORY_OVERCOMMIT, cpu_overcommit=ADMISSION_CPU_OVERCOMMIT,
+                 host_reserve_mb=ADMISSION_HOST_RESERVE_MB, host_memory=read_host_memory, cpu_count=os.cpu_count):
+        self.memory_overcommit = memory_overcommit
+        self.cpu_overcommit = cpu_overcommit
+        self.host_reserve_mb = host_reserve_mb
+        self.host_memory = host_memory
+        self.cpu_count = cpu_count
+        self.reservations = {}
+        self.queue = deque()
+
+    def capacity(self):
+        total, available = self.host_memory()
+        memory = None if total is None else total * self.memory_overcommit - self.host_reserve_mb
+        return memory, total, available, (self.cpu_count() or 1) * self.cpu_overcommit
+
+    def reserved(self):
+        return (sum(memory for _, memory in self.reservations.values()),
+                sum(vcpus for vcpus, _ in self.reservations.values()))
+
+    def check(self, vcpus, memory):
+        # Returns ('start' | 'queue' | 'reject', reason)
+        memory_capacity, total, available, cpu_capacity = self.capacity()
+        reserved_memory, reserved_vcpus = self.reserved()
+        if memory_capacity is not None and memory > memory_capacity:
+            return 'reject', (f"{memory} MiB exceeds the {memory_capacity:.0f} MiB this host can ever give guests "
+                              f"({self.memory_overcommit:g}x RAM minus {self.host_reserve_mb} MiB host reserve)")
+        if vcpus > cpu_capacity:
+            return 'reject', f"{vcpus} vCPUs exceeds the limit of {cpu_capacity:g} ({self.cpu_overcommit:g}x host cores)"
+        if memory_capacity is not None:
+            # Memory in use that our reservations do not explain belongs to other processes
+            external = max(0, total - available - reserved_memory) if available is not None else 0
+            free = memory_capacity - reserved_memory - external
+            if memory > free:
+                return 'queue', (f"needs {memory} MiB but only {max(0, free):.0f} MiB is free "
+                                 f"({reserved_memory} MiB reserved by {len(self.reservations)} VM(s), "
+                                 f"{external} MiB used by other processes)")
+        if reserved_vcpus + vcpus > cpu_capacity:
+            return 'queue', f"needs {vcpus} vCPUs but only {cpu_capacity - reserved_vcpus:g} are unreserved"
+        return 'start', "resources available"
+
+    def request(self, key, vcpus, memory):
+        decision, reason = self.check(vcpus, memory)
+        if decision == 'start' and self.queue:
+            # Do not overtake launches that are already waiting
+            decision, reason = 'queue', f"waiting behind {len(self.queue)} queued launch(es)"
+        if decision == 'start':
+            self.reservations[key] = (vcpus, memory)
+        elif decision == 'queue':
+            self.queue.append((key, vcpus, memory))
+        return decision, reason
+
+    def release(self, key):
+        self.reservations.pop(key, None)
+        self.queue = deque(entry for entry in self.queue if entry[0] != key)
+
+    def admit_queued(self):
+        # Returns (admitted keys, [(key, reason)] of queued requests that can no longer ever fit)
+        admitted, rejected = [], []
+        while self.queue:
+            key, vcpus, memory = self.queue[0]
+            decision, reason = self.check(vcpus, memory)
+            if decision == 'queue':
+                break
+            self.queue.popleft()
+            if decision == 'start':
+                self.reservations[key] = (vcpus, memory)
+                admitted.append(key)
+            else:
+                rejected.append((key, reason))
+        return admitted, rejected
+
+    def summary(self):
+        memory_capacity, total, available, cpu_capacity = self.capacity()
+        reserved_memory, reserved_vcpus = self.reserved()
+        memory = f"{reserved_memory} MiB reserved" + (f" of {memory_capacity:.0f} MiB" if memory_capacity is not None else "")
+        if available is not None:
+            memory += f" ({available} MiB free on host)"
+        return f"Memory: {memory} | vCPUs: {reserved_vcpus} of {cpu_capacity:g} | Queued: {len(self.queue)}"